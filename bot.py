@@ -5,12 +5,22 @@ All bots merged into one for Railway deployment
 Uses ! prefix commands (NOT slash commands)
 """
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+import aiohttp
+import asyncio
 import os
 import logging
+import signal
+import time
 from datetime import datetime
 import pytz
 
+from utils.bars import BarCache
+from utils.guild_config import GuildConfig, ROLES
+from utils.intake import CommandIntake
+from utils.quotes import QuoteClient
+from utils import snapshot
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,18 +33,13 @@ TOKEN = os.environ.get('DISCORD_BOT_TOKEN')
 if not TOKEN:
     raise SystemExit("Missing DISCORD_BOT_TOKEN environment variable")
 
-# Channel IDs (set via environment or defaults)
-CHANNELS = {
-    'news_headlines': int(os.environ.get('CHANNEL_NEWS_HEADLINES', '1420078847629590608')),
-    'daily_bias': int(os.environ.get('CHANNEL_DAILY_BIAS', '1358534746879037642')),
-    'breaking_news': int(os.environ.get('CHANNEL_BREAKING_NEWS', '1347337500380893296')),
-    'live_trades': int(os.environ.get('CHANNEL_LIVE_TRADES', '1347337979751829659')),
-    'trade_setups': int(os.environ.get('CHANNEL_TRADE_SETUPS', '1347337927637602365')),
-    'chart_setups': int(os.environ.get('CHANNEL_CHART_SETUPS', '1367383497689268286')),
-    'trading_glossary': int(os.environ.get('CHANNEL_TRADING_GLOSSARY', '1358534448332935420')),
-    'economic_calendar': int(os.environ.get('CHANNEL_ECONOMIC_CALENDAR', '1359875411470716959')),
-    'trade_alerts': int(os.environ.get('CHANNEL_TRADE_ALERTS', '1358534900780630067')),
-}
+# Warm-restart snapshot (mount a Railway volume here so it survives deploys)
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', 'data/snapshot.bin')
+SNAPSHOT_MINUTES = float(os.environ.get('SNAPSHOT_MINUTES', '5'))
+
+PREFIX = "!"
+# Commands accepted outside a guild's command channel allowlist, so admins can always fix it
+ALWAYS_ALLOWED = {"commandchannels"}
 
 # Bot setup
 intents = discord.Intents.default()
@@ -42,23 +47,142 @@ intents.message_content = True
 
 class JustTradesBot(commands.Bot):
     def __init__(self):
-        super().__init__(command_prefix="!", intents=intents)
+        super().__init__(command_prefix=PREFIX, intents=intents)
         self.ct = pytz.timezone('America/Chicago')
+        # Shared OHLCV bar cache used by chart/analysis commands
+        self.bars = BarCache()
+        # Per-guild channel roles (daily_bias, trade_alerts, ...) with cached channel lookups
+        self.guild_config = GuildConfig(self).load()
+        # Pre-filter + parse cache in front of the command parser, with drop/dispatch counters
+        self.intake = CommandIntake(PREFIX)
+        self.started_at = time.monotonic()
+        # Set when state was restored from a snapshot: {'age': seconds, 'restore_ms': ms}
+        self.warm_start = None
+        self.first_response_logged = False
 
     async def setup_hook(self):
+        # One pooled keep-alive HTTP session shared by every cog (the webhook fan-out has its own)
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300)
+        )
+        self.quotes = QuoteClient(self.http_session)
+
+        restore_started = time.perf_counter()
+        saved = await asyncio.to_thread(snapshot.read, SNAPSHOT_PATH)
+        if saved:
+            snapshot.restore_caches(self, saved)
+
         # Load all cogs
         await self.load_extension('cogs.market_data')
         await self.load_extension('cogs.education')
         await self.load_extension('cogs.analysis')
         await self.load_extension('cogs.trade_relay')
         await self.load_extension('cogs.calendar')
+        await self.load_extension('cogs.digest')
+        await self.load_extension('cogs.charts')
+        await self.load_extension('cogs.watch')
+        await self.load_extension('cogs.diagnostics')
         logger.info("All cogs loaded successfully")
 
+        if saved:
+            snapshot.restore_cogs(self, saved)
+            self.warm_start = {
+                'age': time.time() - saved['saved_at'],
+                'restore_ms': (time.perf_counter() - restore_started) * 1000,
+            }
+            logger.info(f"Restored snapshot from {self.warm_start['age']:.0f}s ago "
+                        f"in {self.warm_start['restore_ms']:.0f}ms")
+        else:
+            logger.info("No usable snapshot, starting cold")
+
+        self.snapshot_loop.start()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:
+            pass  # Windows
+
+    async def save_snapshot(self):
+        """Collect and pickle state on the loop, compress and write it in a thread"""
+        try:
+            raw = snapshot.serialize(snapshot.collect(self))
+            blob = await asyncio.to_thread(snapshot.compress, raw)
+            await asyncio.to_thread(snapshot.write, SNAPSHOT_PATH, blob)
+        except Exception as e:
+            logger.error(f"Snapshot failed: {e}")
+
+    @tasks.loop(minutes=SNAPSHOT_MINUTES)
+    async def snapshot_loop(self):
+        await self.save_snapshot()
+
+    @snapshot_loop.before_loop
+    async def before_snapshot_loop(self):
+        # Skip the immediate first iteration, the restored snapshot is still current
+        await asyncio.sleep(SNAPSHOT_MINUTES * 60)
+
+    async def on_message(self, message):
+        """Only prefixed messages from people, for known commands in allowed channels, reach invoke()"""
+        # Bots (including this one) never run commands and don't belong in the intake metrics
+        if message.author.bot:
+            return
+        counts = self.intake.counts
+        counts['seen'] += 1
+        content = message.content
+        if not content.startswith(PREFIX):
+            counts['not_prefixed'] += 1
+            return
+
+        invoker, view = self.intake.parse(content)
+        command = self.all_commands.get(invoker)
+        if command is None:
+            counts['unknown_command'] += 1
+            return
+
+        if message.guild and command.name not in ALWAYS_ALLOWED:
+            allowed = self.guild_config.allowed_channels(message.guild.id)
+            channel = message.channel
+            # Threads follow their parent channel
+            if allowed and channel.id not in allowed and getattr(channel, 'parent_id', None) not in allowed:
+                counts['channel_blocked'] += 1
+                return
+
+        self.intake.remember(content, invoker, view)
+        counts['dispatched'] += 1
+        ctx = commands.Context(prefix=PREFIX, view=view, bot=self, message=message,
+                               invoked_with=invoker, command=command)
+        # Name the task running the command so profiles and tracebacks are readable
+        task = asyncio.current_task()
+        previous = task.get_name()
+        task.set_name(f"command: !{command.qualified_name}")
+        try:
+            await self.invoke(ctx)
+        finally:
+            task.set_name(previous)
+
+    async def on_command_completion(self, ctx):
+        if not self.first_response_logged:
+            self.first_response_logged = True
+            start = "warm" if self.warm_start else "cold"
+            logger.info(f"First command (!{ctx.command}) served {time.monotonic() - self.started_at:.1f}s "
+                        f"after process start ({start} start)")
+
+    async def close(self):
+        if self.snapshot_loop.is_running() and not self.snapshot_loop.is_being_cancelled():
+            self.snapshot_loop.cancel()
+            await self.save_snapshot()
+        await super().close()
+        if getattr(self, 'http_session', None):
+            await self.http_session.close()
+
     async def on_ready(self):
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
         logger.info(f"Connected to {len(self.guilds)} guild(s)")
         logger.info("All commands use ! prefix")
 
+        # Map CHANNEL_* defaults onto their guilds and drop lookups cached before the guilds were ready
+        self.guild_config.seed_defaults()
+        if self.guild_config.dirty:
+            await self.guild_config.persist()
+
         # Set bot status
         await self.change_presence(
             activity=discord.Activity(
@@ -67,6 +191,26 @@ class JustTradesBot(commands.Bot):
             )
         )
 
+    async def on_guild_channel_delete(self, channel):
+        self.guild_config.invalidate_channel(channel.id)
+        if self.guild_config.disallow_channel(channel.guild.id, channel.id):
+            await self.guild_config.persist()
+
+    async def on_guild_channel_update(self, before, after):
+        self.guild_config.invalidate_channel(before.id)
+
+    async def on_guild_join(self, guild):
+        self.guild_config.invalidate_guild(guild.id)
+
+    async def on_guild_remove(self, guild):
+        self.guild_config.invalidate_guild(guild.id)
+
+    async def on_guild_available(self, guild):
+        self.guild_config.invalidate_guild(guild.id)
+
+    async def on_guild_unavailable(self, guild):
+        self.guild_config.invalidate_guild(guild.id)
+
 bot = JustTradesBot()
 
 @bot.command(name="bothelp")
@@ -80,13 +224,13 @@ async def bot_help(ctx):
 
     embed.add_field(
         name="Market Data",
-        value="`!market` - Live futures prices\n`!price <symbol>` - Any symbol price\n`!bias <direction> <notes>` - Post daily bias\n`!markethelp` - Market commands help",
+        value="`!market` - Live futures prices\n`!price <symbol>` - Any symbol price\n`!bias <direction> <notes>` - Post daily bias\n`!session [symbol]` - Market open/closed & next open\n`!markethelp` - Market commands help",
         inline=False
     )
 
     embed.add_field(
         name="Analysis",
-        value="`!setup <symbol> <long/short> <entry> <stop> <target>` - Chart setup\n`!levels <symbol> <S1> <R1>` - S/R levels\n`!dailybias` - AI daily bias with live data",
+        value="`!setup <symbol> <long/short> <entry> <stop> <target>` - Chart setup\n`!levels <symbol> <S1> <R1>` - S/R levels\n`!levels <symbol> auto` / `!levels all` - Computed pivots & ranges\n`!dailybias` - AI daily bias with live data\n`!chart <symbol> [interval] [lookback]` - Candlestick chart\n`!heatmap [lookback] [interval]` - Cross-asset correlation\n`!biasbacktest [years]` - Backtest the daily bias rule",
         inline=False
     )
 
@@ -98,7 +242,7 @@ async def bot_help(ctx):
 
     embed.add_field(
         name="Trade Relay",
-        value="`!alert <symbol> <BUY/SELL> <entry> <stop> <target>` - Trade alert\n`!close <symbol> <WIN/LOSS> <pnl>` - Trade result\n`!update <symbol> <text>` - Trade update\n`!tradehelp` - Trade commands help",
+        value="`!alert <symbol> <BUY/SELL> <entry> <stop> <target>` - Trade alert\n`!close <symbol> <WIN/LOSS> <pnl>` - Trade result\n`!update <symbol> <text>` - Trade update\n`!relaystats` - Webhook mirror delivery stats\n`!tradehelp` - Trade commands help",
         inline=False
     )
 
@@ -108,9 +252,15 @@ async def bot_help(ctx):
         inline=False
     )
 
+    embed.add_field(
+        name="Watches",
+        value="`!watch <symbol> <above/below> <price> [dm]` - Price alert\n`!watches` - Your active watches\n`!unwatch <id|all>` - Remove watches",
+        inline=False
+    )
+
     embed.add_field(
         name="Auto-Posting",
-        value="**Daily Bias:** 8:30 AM CT (weekdays)\n**Weekly Calendar:** Mondays 6:00 AM CT",
+        value="**Daily Bias:** 8:30 AM CT (CME trading days)\n**Weekly Calendar:** 6:00 AM CT, first trading day of the week\n**End of Day Digest:** 4:00 PM CT (`!digest` to preview)\nPosted to every server's configured channel (`!channels`, `!setchannel`)",
         inline=False
     )
 
@@ -131,24 +281,124 @@ async def bot_status(ctx):
     embed.add_field(name="Guilds", value=str(len(bot.guilds)), inline=True)
     embed.add_field(name="Time (CT)", value=now.strftime("%I:%M %p"), inline=True)
     embed.add_field(name="Prefix", value="`!`", inline=True)
+    if bot.warm_start:
+        embed.add_field(
+            name="Warm Start",
+            value=f"Snapshot from {bot.warm_start['age'] / 60:.1f} min before restart, restored in {bot.warm_start['restore_ms']:.0f}ms",
+            inline=False
+        )
+    intake = bot.intake.stats()
+    embed.add_field(
+        name="Message Intake",
+        value=f"Seen {intake['seen']:,} | Dispatched {intake['dispatched']:,} | Dropped early {intake['dropped']:,} "
+              f"({intake['dropped_pct']:.1f}%)\n"
+              f"Not prefixed {intake['not_prefixed']:,} | Unknown command {intake['unknown_command']:,} | "
+              f"Channel not allowed {intake['channel_blocked']:,} | Parse cache hits {intake['cache_hits']:,}",
+        inline=False
+    )
     embed.set_footer(text="JustTrades Bot | Railway Deployment")
 
     await ctx.send(embed=embed)
 
 @bot.command(name="channels")
+@commands.guild_only()
 async def channels_command(ctx):
-    """Show configured channels"""
+    """Show this server's configured channels"""
     embed = discord.Embed(
         title="Configured Channels",
+        description="Change with `!setchannel <role> #channel` (or `none` to clear)",
         color=discord.Color.blue()
     )
 
-    for name, channel_id in CHANNELS.items():
-        channel = bot.get_channel(channel_id)
-        status = f"<#{channel_id}>" if channel else f"Not found ({channel_id})"
-        embed.add_field(name=name.replace('_', ' ').title(), value=status, inline=True)
+    for role in ROLES:
+        channel_id = bot.guild_config.get(ctx.guild.id, role)
+        channel = bot.guild_config.channel(ctx.guild, role)
+        if channel:
+            status = channel.mention
+        elif channel_id:
+            status = f"Not found ({channel_id})"
+        else:
+            status = "Not set"
+        embed.add_field(name=role.replace('_', ' ').title(), value=status, inline=True)
 
     await ctx.send(embed=embed)
 
+@bot.command(name="setchannel")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def set_channel_command(ctx, role: str = None, channel: str = None):
+    """Point a channel role at a channel in this server"""
+    if role not in ROLES or not channel:
+        await ctx.send("**Usage:** `!setchannel <role> #channel` or `!setchannel <role> none`\n"
+                       f"**Roles:** {', '.join(ROLES)}")
+        return
+
+    if channel.lower() == "none":
+        removed = bot.guild_config.unset(ctx.guild.id, role)
+        message = f"Cleared **{role}**." if removed else f"**{role}** was not set."
+    else:
+        try:
+            target = await commands.TextChannelConverter().convert(ctx, channel)
+        except commands.BadArgument:
+            await ctx.send(f"Channel '{channel}' not found in this server.")
+            return
+        bot.guild_config.set(ctx.guild.id, role, target.id)
+        message = f"**{role}** now posts to {target.mention}."
+
+    if bot.guild_config.dirty:
+        await bot.guild_config.persist()
+    await ctx.send(message)
+
+@set_channel_command.error
+async def set_channel_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("You need the Manage Server permission to change channels.")
+    elif isinstance(error, commands.NoPrivateMessage):
+        await ctx.send("`!setchannel` only works in a server.")
+    else:
+        raise error
+
+@bot.command(name="commandchannels")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def command_channels_command(ctx, action: str = "list", channel: discord.TextChannel = None):
+    """Limit which channels accept ! commands in this server"""
+    action = action.lower()
+    guild_id = ctx.guild.id
+    if action in ("add", "remove") and channel is None:
+        channel = ctx.channel
+
+    if action == "add":
+        bot.guild_config.allow_channel(guild_id, channel.id)
+        message = f"Commands are now accepted in {channel.mention}."
+    elif action == "remove":
+        removed = bot.guild_config.disallow_channel(guild_id, channel.id)
+        message = f"Removed {channel.mention}." if removed else f"{channel.mention} was not on the list."
+    elif action == "clear":
+        bot.guild_config.clear_allowlist(guild_id)
+        message = "Commands are accepted in every channel again."
+    elif action == "list":
+        allowed = bot.guild_config.allowed_channels(guild_id)
+        message = ("Commands are accepted in: " + ", ".join(f"<#{c}>" for c in sorted(allowed))
+                   if allowed else "Commands are accepted in every channel.")
+    else:
+        await ctx.send("**Usage:** `!commandchannels [list|add|remove|clear] [#channel]`")
+        return
+
+    if bot.guild_config.dirty:
+        await bot.guild_config.persist()
+    await ctx.send(message)
+
+@command_channels_command.error
+async def command_channels_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("You need the Manage Server permission to change command channels.")
+    elif isinstance(error, commands.NoPrivateMessage):
+        await ctx.send("`!commandchannels` only works in a server.")
+    elif isinstance(error, commands.BadArgument):
+        await ctx.send(f"{error}")
+    else:
+        raise error
+
 if __name__ == "__main__":
     bot.run(TOKEN)
@@ -6,60 +6,86 @@ import discord
 from discord.ext import commands, tasks
 from datetime import datetime, time
 import pytz
-import os
-
-try:
-    import yfinance as yf
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFINANCE_AVAILABLE = False
-
-CHART_SETUPS_CHANNEL = int(os.environ.get('CHANNEL_CHART_SETUPS', '1367383497689268286'))
-DAILY_BIAS_CHANNEL = int(os.environ.get('CHANNEL_DAILY_BIAS', '1358534746879037642'))
+import asyncio
+import math
+
+from cogs.market_data import FUTURES_SYMBOLS
+from utils.bars import resolve_symbol
+from utils.levels import compute_levels
+from utils.sessions import is_trading_day
+from utils.backtest import (
+    bias_codes, run_backtest, format_sensitivity, BIAS_LABELS,
+    BULLISH, BEARISH, NEUTRAL, CAUTIOUS, RANGE_THRESHOLD, VIX_CUTOFF,
+)
+
+BIAS_COLORS = {
+    BULLISH: discord.Color.green,
+    BEARISH: discord.Color.red,
+    NEUTRAL: discord.Color.gold,
+    CAUTIOUS: discord.Color.orange,
+}
+
+def fmt_level(value):
+    """Format a computed level, NaN means the bars were missing"""
+    return "n/a" if math.isnan(value) else f"{value:,.2f}"
 
 class AnalysisCog(commands.Cog, name="Analysis"):
     def __init__(self, bot):
         self.bot = bot
         self.ct = pytz.timezone('America/Chicago')
+        # Last levels posted with !levels, keyed by resolved symbol (used by !chart)
+        self.posted_levels = {}
+        # Most recent computed bias: {'bias': str, 'data': dict, 'time': epoch}
+        self.last_bias = None
         # Start auto-posting task
         self.daily_bias_post.start()
 
     def cog_unload(self):
         self.daily_bias_post.cancel()
 
-    def get_market_data(self):
-        """Fetch real market data using yfinance"""
-        if not YFINANCE_AVAILABLE:
-            return None
+    def snapshot_state(self):
+        return {'posted_levels': self.posted_levels, 'last_bias': self.last_bias}
+
+    def restore_state(self, state):
+        self.posted_levels.update(state.get('posted_levels', {}))
+        self.last_bias = self.last_bias or state.get('last_bias')
 
+    def remember_bias(self, bias, data, now, guild_id=None):
+        """Keep the latest call; guild_id None is the scheduled post every server received"""
+        self.last_bias = {'bias': bias, 'data': data, 'time': now.timestamp()}
+        self.bot.dispatch("bias_posted", bias, data, now, guild_id)
+
+    async def get_market_data(self):
+        """Read SPY/VIX/NQ/ES from the shared bar cache (ring-buffer views, no DataFrames)"""
         try:
-            spy = yf.Ticker("SPY")
-            spy_hist = spy.history(period="1mo")
-            if spy_hist.empty:
+            spy, vix, nq, es = await asyncio.gather(
+                self.bot.bars.get("SPY", "1d", "1mo"),
+                self.bot.bars.get("^VIX", "1d", "5d"),
+                self.bot.bars.get("NQ=F", "1d", "5d"),
+                self.bot.bars.get("ES=F", "1d", "5d"),
+            )
+            if spy is None or not len(spy['close']):
                 return None
 
-            spy_price = spy_hist['Close'].iloc[-1]
-            spy_prev = spy_hist['Close'].iloc[-2] if len(spy_hist) > 1 else spy_price
+            spy_close = spy['close']
+            spy_price = float(spy_close[-1])
+            spy_prev = float(spy_close[-2]) if len(spy_close) > 1 else spy_price
             spy_change = spy_price - spy_prev
             spy_change_pct = (spy_change / spy_prev) * 100 if spy_prev else 0
-            spy_high_20 = spy_hist['High'].tail(20).max()
-            spy_low_20 = spy_hist['Low'].tail(20).min()
+            spy_high_20 = float(spy['high'][-20:].max())
+            spy_low_20 = float(spy['low'][-20:].min())
 
-            vix = yf.Ticker("^VIX")
-            vix_hist = vix.history(period="5d")
-            vix_price = vix_hist['Close'].iloc[-1] if not vix_hist.empty else 0
+            vix_price = float(vix['close'][-1]) if vix is not None and len(vix['close']) else 0
 
-            nq = yf.Ticker("NQ=F")
-            nq_hist = nq.history(period="5d")
-            nq_price = nq_hist['Close'].iloc[-1] if not nq_hist.empty else 0
-            nq_prev = nq_hist['Close'].iloc[-2] if len(nq_hist) > 1 else nq_price
-            nq_change = nq_price - nq_prev
+            def last_and_change(bars):
+                if bars is None or not len(bars['close']):
+                    return 0, 0
+                price = float(bars['close'][-1])
+                prev = float(bars['close'][-2]) if len(bars['close']) > 1 else price
+                return price, price - prev
 
-            es = yf.Ticker("ES=F")
-            es_hist = es.history(period="5d")
-            es_price = es_hist['Close'].iloc[-1] if not es_hist.empty else 0
-            es_prev = es_hist['Close'].iloc[-2] if len(es_hist) > 1 else es_price
-            es_change = es_price - es_prev
+            nq_price, nq_change = last_and_change(nq)
+            es_price, es_change = last_and_change(es)
 
             return {
                 'spy_price': spy_price, 'spy_change': spy_change, 'spy_change_pct': spy_change_pct,
@@ -81,35 +107,23 @@ class AnalysisCog(commands.Cog, name="Analysis"):
         resistance = data['spy_resistance']
         vix = data['vix']
 
-        range_size = resistance - support
-        mid_point = support + (range_size / 2)
-
-        if vix > 25:
-            return "CAUTIOUS", discord.Color.orange()
-        if spy_price > mid_point + (range_size * 0.3):
-            return ("BULLISH", discord.Color.green()) if data['spy_change'] > 0 else ("NEUTRAL", discord.Color.gold())
-        elif spy_price < mid_point - (range_size * 0.3):
-            return ("BEARISH", discord.Color.red()) if data['spy_change'] < 0 else ("NEUTRAL", discord.Color.gold())
-        else:
-            if data['spy_change'] > 0:
-                return "BULLISH", discord.Color.green()
-            elif data['spy_change'] < 0:
-                return "BEARISH", discord.Color.red()
-            return "NEUTRAL", discord.Color.gold()
+        code = int(bias_codes(spy_price, data['spy_change'], support, resistance, vix))
+        return BIAS_LABELS[code], BIAS_COLORS[code]()
 
     @tasks.loop(time=time(hour=8, minute=30, tzinfo=pytz.timezone('America/Chicago')))
     async def daily_bias_post(self):
-        """Auto-post daily bias at 8:30 AM CT (weekdays only)"""
+        """Auto-post daily bias at 8:30 AM CT (US stock market trading days only)"""
         now = datetime.now(self.ct)
-        if now.weekday() >= 5:
+        # The bias is read off SPY: on stock holidays CME still trades, but SPY data is a day old
+        if not is_trading_day("stocks", now.date()):
             return
 
-        channel = self.bot.get_channel(DAILY_BIAS_CHANNEL)
-        if not channel:
+        if not self.bot.guild_config.channels('daily_bias'):
             return
 
-        data = self.get_market_data()
+        data = await self.get_market_data()
         bias, color = self.determine_bias(data)
+        self.remember_bias(bias, data, now)
 
         embed = discord.Embed(title=f"Daily Market Bias: {bias}", color=color, timestamp=now)
 
@@ -133,7 +147,7 @@ class AnalysisCog(commands.Cog, name="Analysis"):
             )
 
         embed.set_footer(text="Analysis Cog | Auto-posted at 8:30 AM CT")
-        await channel.send(embed=embed)
+        await self.bot.guild_config.broadcast('daily_bias', embed=embed)
 
     @daily_bias_post.before_loop
     async def before_daily_bias(self):
@@ -165,20 +179,37 @@ class AnalysisCog(commands.Cog, name="Analysis"):
             embed.add_field(name="Notes", value=notes, inline=False)
         embed.set_footer(text=f"Posted by {ctx.author.name}")
 
-        channel = self.bot.get_channel(CHART_SETUPS_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'chart_setups')
         if channel and channel.id != ctx.channel.id:
             await channel.send(embed=embed)
-            await ctx.send(f"Chart setup posted to <#{CHART_SETUPS_CHANNEL}>!")
+            await ctx.send(f"Chart setup posted to {channel.mention}!")
         else:
             await ctx.send(embed=embed)
 
-    @commands.command(name="levels", help="Post S/R levels. Usage: !levels NQ 21400 21600 [21350] [21650] [notes]")
-    async def levels_command(self, ctx, symbol: str = None, support1: float = None, resistance1: float = None, support2: float = None, resistance2: float = None, *, notes: str = ""):
+    @commands.command(name="levels", help="Post S/R levels. Usage: !levels NQ 21400 21600 [21350] [21650] [notes] | !levels NQ auto | !levels all")
+    async def levels_command(self, ctx, symbol: str = None, support1: str = None, resistance1: float = None, support2: float = None, resistance2: float = None, *, notes: str = ""):
         """!levels <symbol> <support1> <resistance1> [support2] [resistance2] [notes]"""
+        if symbol and symbol.lower() == "all":
+            await self.post_auto_levels(ctx, list(FUTURES_SYMBOLS))
+            return
+        if symbol and support1 and support1.lower() == "auto":
+            await self.post_auto_levels(ctx, [resolve_symbol(symbol)])
+            return
+
+        try:
+            support1 = float(support1) if support1 else None
+        except ValueError:
+            support1 = None
+
         if not all([symbol, support1, resistance1]):
-            await ctx.send("**Usage:** `!levels <symbol> <support1> <resistance1> [support2] [resistance2] [notes]`")
+            await ctx.send("**Usage:** `!levels <symbol> <support1> <resistance1> [support2] [resistance2] [notes]`\n"
+                           "**Auto:** `!levels <symbol> auto` or `!levels all`")
             return
 
+        self.posted_levels[resolve_symbol(symbol)] = {
+            "S1": support1, "R1": resistance1, "S2": support2, "R2": resistance2
+        }
+
         now = datetime.now(self.ct)
         embed = discord.Embed(title=f"{symbol.upper()} Key Levels", color=discord.Color.blue(), timestamp=now)
 
@@ -195,10 +226,49 @@ class AnalysisCog(commands.Cog, name="Analysis"):
             embed.add_field(name="Notes", value=notes, inline=False)
         embed.set_footer(text=f"Posted by {ctx.author.name}")
 
-        channel = self.bot.get_channel(CHART_SETUPS_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'chart_setups')
         if channel and channel.id != ctx.channel.id:
             await channel.send(embed=embed)
-            await ctx.send(f"Levels posted to <#{CHART_SETUPS_CHANNEL}>!")
+            await ctx.send(f"Levels posted to {channel.mention}!")
+        else:
+            await ctx.send(embed=embed)
+
+    async def post_auto_levels(self, ctx, symbols):
+        """Compute pivots, prior day, overnight and 20-day levels and post them"""
+        async with ctx.typing():
+            bars = await asyncio.gather(
+                *(self.bot.bars.get(s, "1d", "3mo") for s in symbols),
+                *(self.bot.bars.get(s, "5m", "5d") for s in symbols),
+            )
+            now = datetime.now(self.ct)
+            levels = compute_levels(symbols, bars[:len(symbols)], bars[len(symbols):], now)
+
+        embed = discord.Embed(
+            title="Key Levels - Futures Board" if len(symbols) > 1 else f"{symbols[0]} Key Levels",
+            color=discord.Color.blue(),
+            timestamp=now
+        )
+        for symbol, lv in levels.items():
+            if math.isnan(lv['pivot']):
+                embed.add_field(name=FUTURES_SYMBOLS.get(symbol, symbol), value="No data", inline=False)
+                continue
+
+            self.posted_levels[symbol] = {"S1": lv['s1'], "R1": lv['r1'], "S2": lv['s2'], "R2": lv['r2']}
+            embed.add_field(
+                name=FUTURES_SYMBOLS.get(symbol, symbol),
+                value=f"**Pivot:** {lv['pivot']:,.2f} | **R1** {lv['r1']:,.2f} **R2** {lv['r2']:,.2f} | "
+                      f"**S1** {lv['s1']:,.2f} **S2** {lv['s2']:,.2f}\n"
+                      f"**PDH/PDL/PDC:** {fmt_level(lv['pdh'])} / {fmt_level(lv['pdl'])} / {fmt_level(lv['pdc'])}\n"
+                      f"**ON High/Low:** {fmt_level(lv['onh'])} / {fmt_level(lv['onl'])}\n"
+                      f"**20-Day Range:** {fmt_level(lv['low_20'])} - {fmt_level(lv['high_20'])}",
+                inline=False
+            )
+        embed.set_footer(text=f"Auto levels | Requested by {ctx.author.name}")
+
+        channel = self.bot.guild_config.channel(ctx.guild, 'chart_setups')
+        if channel and channel.id != ctx.channel.id:
+            await channel.send(embed=embed)
+            await ctx.send(f"Levels posted to {channel.mention}!")
         else:
             await ctx.send(embed=embed)
 
@@ -208,8 +278,10 @@ class AnalysisCog(commands.Cog, name="Analysis"):
         now = datetime.now(self.ct)
 
         async with ctx.typing():
-            data = self.get_market_data()
+            data = await self.get_market_data()
             bias, color = self.determine_bias(data)
+            if ctx.guild:
+                self.remember_bias(bias, data, now, ctx.guild.id)
 
             embed = discord.Embed(title=f"Daily Market Bias: {bias}", color=color, timestamp=now)
 
@@ -236,12 +308,52 @@ class AnalysisCog(commands.Cog, name="Analysis"):
 
             embed.set_footer(text=f"Requested by {ctx.author.name}")
 
-        channel = self.bot.get_channel(DAILY_BIAS_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'daily_bias')
         if channel and channel.id != ctx.channel.id:
             await channel.send(embed=embed)
-            await ctx.send(f"Daily bias posted to <#{DAILY_BIAS_CHANNEL}>!")
+            await ctx.send(f"Daily bias posted to {channel.mention}!")
         else:
             await ctx.send(embed=embed)
 
+    @commands.command(name="biasbacktest", help="Backtest the daily bias rule. Usage: !biasbacktest [years]")
+    async def bias_backtest_command(self, ctx, years: float = 20):
+        """!biasbacktest [years] - Hit rate of determine_bias over SPY/VIX daily history"""
+        if not 0 < years < float("inf"):
+            await ctx.send("Usage: `!biasbacktest [years]` with years greater than 0 (default 20).")
+            return
+
+        async with ctx.typing():
+            spy = await self.bot.bars.get("SPY", "1d", "max")
+            vix = await self.bot.bars.get("^VIX", "1d", "max")
+            if spy is None or vix is None:
+                await ctx.send("Unable to fetch daily history for the backtest.")
+                return
+
+            report = run_backtest(spy, vix, years)
+            if report is None:
+                await ctx.send("No overlapping SPY/VIX history to backtest.")
+                return
+
+        start = datetime.fromtimestamp(report['start'], self.ct).strftime('%Y-%m-%d')
+        end = datetime.fromtimestamp(report['end'], self.ct).strftime('%Y-%m-%d')
+        embed = discord.Embed(
+            title=f"Daily Bias Backtest - {report['days']:,} days",
+            description=f"{start} to {end}\n**Hit rate (BULLISH/BEARISH):** {report['hit_rate']:.1f}%",
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="Next-Day Move by Bias",
+            value="\n".join(f"**{label}:** {stats['days']:,} days, avg {stats['avg_move']:+.3f}%, up {stats['up_pct']:.0f}%"
+                            for label, stats in report['by_bias'].items()),
+            inline=False
+        )
+        embed.add_field(
+            name=f"Hit Rate Sensitivity (live: {RANGE_THRESHOLD} range, VIX {VIX_CUTOFF})",
+            value=f"```\n{format_sensitivity(report)}\n```",
+            inline=False
+        )
+        embed.set_footer(text=f"Requested by {ctx.author.name} | Computed in {report['elapsed_ms']:.1f} ms")
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(AnalysisCog(bot))
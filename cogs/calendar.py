@@ -9,7 +9,17 @@ import pytz
 import json
 import os
 
-ECONOMIC_CALENDAR_CHANNEL = int(os.environ.get('CHANNEL_ECONOMIC_CALENDAR', '1359875411470716959'))
+from utils.impact import IMPACT_HORIZONS, event_epochs, event_type, impact_stats
+from utils.sessions import is_open, is_trading_day
+
+# Past releases (same schema as DEFAULT_EVENTS) used for the impact study, optional
+EVENT_HISTORY_PATH = os.environ.get('EVENT_HISTORY_PATH', 'data/event_history.json')
+
+# Intraday bars used to measure post-release moves (5m bars reach back ~60 days on Yahoo)
+IMPACT_SYMBOLS = {"NQ=F": "NQ", "ES=F": "ES"}
+IMPACT_INTERVAL = "5m"
+IMPACT_PERIOD = "60d"
+IMPACT_BAR_SECONDS = 300
 
 # Default economic events
 DEFAULT_EVENTS = [
@@ -28,25 +38,81 @@ class CalendarCog(commands.Cog, name="Calendar"):
         self.bot = bot
         self.ct = pytz.timezone('America/Chicago')
         self.events = DEFAULT_EVENTS.copy()
+        # {symbol: {event type: stats}} from utils.impact, refreshed in the background
+        self.impact = {}
         # Start auto-posting task
         self.weekly_calendar_post.start()
+        self.refresh_impact_stats.start()
 
     def cog_unload(self):
         self.weekly_calendar_post.cancel()
+        self.refresh_impact_stats.cancel()
+
+    def snapshot_state(self):
+        return {'events': self.events, 'impact': self.impact}
+
+    def restore_state(self, state):
+        self.events = state.get('events', self.events)
+        self.impact = self.impact or state.get('impact', {})
+
+    def load_event_history(self):
+        """Past releases from EVENT_HISTORY_PATH, empty if the file is missing"""
+        try:
+            with open(EVENT_HISTORY_PATH) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            print(f"Could not read event history {EVENT_HISTORY_PATH}: {e}")
+            return []
+
+    @tasks.loop(hours=6)
+    async def refresh_impact_stats(self):
+        """Precompute post-release NQ/ES moves per event type so !calendar stays instant"""
+        now = datetime.now(self.ct)
+        # No new bars arrive while the market is closed; only fetch then if we have nothing yet
+        if self.impact and not is_open("equity", now):
+            return
+        past = [e for e in self.load_event_history() + self.events
+                if e.get('date', '') <= now.strftime('%Y-%m-%d')]
+        epochs = event_epochs(past, self.ct)
+        if not epochs:
+            return
+
+        impact = {}
+        for symbol in IMPACT_SYMBOLS:
+            bars = await self.bot.bars.get(symbol, IMPACT_INTERVAL, IMPACT_PERIOD)
+            impact[symbol] = impact_stats(bars, epochs, IMPACT_BAR_SECONDS)
+        self.impact = impact
+
+    @refresh_impact_stats.before_loop
+    async def before_refresh_impact(self):
+        await self.bot.wait_until_ready()
+
+    def impact_line(self, event):
+        """Measured history for this event type, e.g. 'NQ avg/worst 15m 42/110', or ''"""
+        key = event_type(event['event'])
+        lines = []
+        for symbol, short in IMPACT_SYMBOLS.items():
+            stats = self.impact.get(symbol, {}).get(key)
+            if not stats:
+                continue
+            moves = " | ".join(f"{h}m {stats['avg'][h]:,.0f}/{stats['worst'][h]:,.0f}" for h in IMPACT_HORIZONS)
+            lines.append(f"{short} avg/worst pts: {moves} (n={stats['count']})")
+        return "\n" + "\n".join(lines) if lines else ""
 
     @tasks.loop(time=time(hour=6, minute=0, tzinfo=pytz.timezone('America/Chicago')))
     async def weekly_calendar_post(self):
-        """Auto-post weekly calendar at 6:00 AM CT (Mondays only)"""
+        """Auto-post weekly calendar at 6:00 AM CT on the first trading day of the week"""
         now = datetime.now(self.ct)
-        # Skip weekends
-        if now.weekday() >= 5:
+        today = now.date()
+        if not is_trading_day("equity", today):
             return
-        # Only post on Mondays
-        if now.weekday() != 0:
+        # Monday, or Tuesday after a Monday holiday closure, etc.
+        if any(is_trading_day("equity", today - timedelta(days=d)) for d in range(1, today.weekday() + 1)):
             return
 
-        channel = self.bot.get_channel(ECONOMIC_CALENDAR_CHANNEL)
-        if not channel:
+        if not self.bot.guild_config.channels('economic_calendar'):
             return
 
         cutoff = now + timedelta(days=7)
@@ -71,14 +137,14 @@ class CalendarCog(commands.Cog, name="Calendar"):
             for event in sorted(upcoming, key=lambda x: x['date']):
                 embed.add_field(
                     name=f"[{event.get('impact', 'MED')}] {event['event']}",
-                    value=f"{event['date']} at {event.get('time', 'TBD')} CT\nForecast: {event.get('forecast', 'N/A')}",
+                    value=f"{event['date']} at {event.get('time', 'TBD')} CT\nForecast: {event.get('forecast', 'N/A')}{self.impact_line(event)}",
                     inline=False
                 )
         else:
             embed.description += "\n\n*No major economic events this week.*"
 
         embed.set_footer(text="Calendar Cog | Trade carefully around high-impact events!")
-        await channel.send(embed=embed)
+        await self.bot.guild_config.broadcast('economic_calendar', embed=embed)
 
     @weekly_calendar_post.before_loop
     async def before_weekly_post(self):
@@ -113,7 +179,7 @@ class CalendarCog(commands.Cog, name="Calendar"):
         for event in sorted(upcoming, key=lambda x: x['date']):
             embed.add_field(
                 name=f"[{event.get('impact', 'MED')}] {event['event']}",
-                value=f"{event['date']} at {event.get('time', 'TBD')} CT\nForecast: {event.get('forecast', 'N/A')}",
+                value=f"{event['date']} at {event.get('time', 'TBD')} CT\nForecast: {event.get('forecast', 'N/A')}{self.impact_line(event)}",
                 inline=False
             )
 
@@ -152,6 +218,7 @@ class CalendarCog(commands.Cog, name="Calendar"):
             "forecast": forecast
         }
         self.events.append(new_event)
+        self.bot.dispatch("calendar_changed")
 
         await ctx.send(f"Added: **{event_name}** on {date} at {event_time} CT (Impact: {impact})")
 
@@ -167,6 +234,7 @@ class CalendarCog(commands.Cog, name="Calendar"):
         removed_count = original_count - len(self.events)
 
         if removed_count > 0:
+            self.bot.dispatch("calendar_changed")
             await ctx.send(f"Removed {removed_count} event(s) matching '{event_name}'")
         else:
             await ctx.send(f"No events found matching '{event_name}'")
@@ -198,7 +266,7 @@ class CalendarCog(commands.Cog, name="Calendar"):
             for event in sorted(upcoming, key=lambda x: x['date']):
                 embed.add_field(
                     name=f"[{event.get('impact', 'MED')}] {event['event']}",
-                    value=f"{event['date']} at {event.get('time', 'TBD')} CT\nForecast: {event.get('forecast', 'N/A')}",
+                    value=f"{event['date']} at {event.get('time', 'TBD')} CT\nForecast: {event.get('forecast', 'N/A')}{self.impact_line(event)}",
                     inline=False
                 )
         else:
@@ -206,10 +274,10 @@ class CalendarCog(commands.Cog, name="Calendar"):
 
         embed.set_footer(text="Trade carefully around high-impact events!")
 
-        channel = self.bot.get_channel(ECONOMIC_CALENDAR_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'economic_calendar')
         if channel and channel.id != ctx.channel.id:
             await channel.send(embed=embed)
-            await ctx.send(f"Calendar posted to <#{ECONOMIC_CALENDAR_CHANNEL}>!")
+            await ctx.send(f"Calendar posted to {channel.mention}!")
         else:
             await ctx.send(embed=embed)
 
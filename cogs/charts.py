@@ -0,0 +1,341 @@
+"""
+Charts Cog - Candlestick charts with S/R levels and bias overlay
+Uses ! prefix commands (NOT slash commands)
+"""
+import discord
+from discord.ext import commands
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import asyncio
+import io
+import multiprocessing
+import os
+
+import numpy as np
+import pytz
+
+from cogs.market_data import FUTURES_SYMBOLS
+from utils.bars import resolve_symbol, period_seconds
+from utils.correlation import heatmap_stats
+
+CHART_WORKERS = int(os.environ.get('CHART_WORKERS', '2'))
+CHART_CACHE_SIZE = int(os.environ.get('CHART_CACHE_SIZE', '128'))
+# Extra symbols for !heatmap beyond the futures board, comma separated
+HEATMAP_WATCHLIST = [resolve_symbol(s.strip()) for s in
+                     os.environ.get('HEATMAP_WATCHLIST', 'SPY,QQQ,IWM,TLT,^VIX,DX-Y.NYB,BTC-USD').split(',') if s.strip()]
+HEATMAP_MAX_SYMBOLS = int(os.environ.get('HEATMAP_MAX_SYMBOLS', '200'))
+
+# Supported intervals and their default lookback (yfinance period)
+CHART_INTERVALS = {
+    "1m": "1d",
+    "5m": "5d",
+    "15m": "5d",
+    "30m": "1mo",
+    "1h": "1mo",
+    "1d": "6mo",
+    "1wk": "2y",
+}
+
+MAX_CANDLES = 150
+
+# Bar length per interval, used to line up bars across exchanges
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "1d": 86400, "1wk": 7 * 86400}
+
+BIAS_COLORS = {
+    "BULLISH": "#2ecc71",
+    "BEARISH": "#e74c3c",
+    "CAUTIOUS": "#e67e22",
+    "NEUTRAL": "#f1c40f",
+}
+
+
+def render_candlestick(title, bars, levels, bias):
+    """Draw a candlestick chart and return PNG bytes (runs in a worker process)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    ct = pytz.timezone('America/Chicago')
+    opens, highs, lows, closes = bars['open'], bars['high'], bars['low'], bars['close']
+    x = np.arange(len(closes))
+    up = closes >= opens
+    colors = np.where(up, "#26a69a", "#ef5350")
+
+    fig, ax = plt.subplots(figsize=(10, 5), dpi=100)
+    fig.patch.set_facecolor("#1e1f22")
+    ax.set_facecolor("#1e1f22")
+
+    ax.vlines(x, lows, highs, colors=colors, linewidth=0.8)
+    bodies = np.maximum(np.abs(closes - opens), (highs.max() - lows.min()) * 0.001)
+    ax.bar(x, bodies, bottom=np.minimum(opens, closes), width=0.6, color=colors)
+
+    for label, price in levels:
+        color = "#3498db" if label.startswith("R") else "#9b59b6"
+        ax.axhline(price, color=color, linestyle="--", linewidth=0.9)
+        ax.text(len(x) - 0.5, price, f" {label} {price:,.2f}", color=color,
+                va="center", fontsize=8)
+
+    ticks = np.linspace(0, len(x) - 1, num=min(6, len(x)), dtype=int)
+    ax.set_xticks(ticks)
+    intraday = len(x) > 1 and bars['time'][-1] - bars['time'][-2] < 86400
+    fmt = "%m/%d %H:%M" if intraday else "%Y-%m-%d"
+    ax.set_xticklabels([datetime.fromtimestamp(int(bars['time'][i]), ct).strftime(fmt) for i in ticks])
+    ax.set_xlim(-1, len(x) + len(x) * 0.12)
+
+    ax.tick_params(colors="#b5bac1", labelsize=8)
+    for spine in ax.spines.values():
+        spine.set_color("#4e5058")
+    ax.grid(color="#2b2d31", linewidth=0.5)
+    ax.set_title(f"{title}  |  Bias: {bias}", color=BIAS_COLORS.get(bias, "#ffffff"), fontsize=11)
+
+    buf = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format="png", facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def render_heatmap(title, bars_by_symbol, bar_seconds):
+    """Correlation heatmap + relative strength bars; returns (PNG bytes, stats) (runs in a worker process)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    stats = heatmap_stats(bars_by_symbol, bar_seconds)
+    if stats is None:
+        return None, None
+
+    labels = [s.replace("=F", "") for s in stats['symbols']]
+    n = len(labels)
+    fontsize = max(4, min(9, 360 / n))
+    side = min(6 + n * 0.1, 16)
+    show_labels = n <= 80  # past this tick labels are unreadable and dominate render time
+
+    fig, (ax, rs_ax) = plt.subplots(1, 2, figsize=(side * 1.3, side), dpi=100,
+                                    gridspec_kw={'width_ratios': [4, 1]})
+    fig.patch.set_facecolor("#1e1f22")
+    for a in (ax, rs_ax):
+        a.set_facecolor("#1e1f22")
+        a.tick_params(colors="#b5bac1", labelsize=fontsize)
+        for spine in a.spines.values():
+            spine.set_color("#4e5058")
+
+    image = ax.imshow(stats['corr'], cmap="RdYlGn", vmin=-1, vmax=1, interpolation="nearest")
+    if show_labels:
+        ax.set_xticks(np.arange(n))
+        ax.set_yticks(np.arange(n))
+        ax.set_xticklabels(labels, rotation=90)
+        ax.set_yticklabels(labels)
+    if n <= 15:
+        for (i, j), value in np.ndenumerate(stats['corr']):
+            ax.text(j, i, f"{value:.2f}", ha="center", va="center", fontsize=fontsize - 1, color="#1e1f22")
+    bar = fig.colorbar(image, ax=ax, fraction=0.046, pad=0.02)
+    bar.ax.tick_params(colors="#b5bac1", labelsize=8)
+
+    strength = stats['strength']
+    rs_ax.barh(np.arange(n), strength, color=np.where(strength >= 0, "#26a69a", "#ef5350"))
+    if show_labels:
+        rs_ax.set_yticks(np.arange(n))
+        rs_ax.set_yticklabels(labels)
+    rs_ax.set_ylim(n - 0.5, -0.5)
+    rs_ax.axvline(0, color="#4e5058", linewidth=0.8)
+    rs_ax.set_title("Rel. strength (%)", color="#b5bac1", fontsize=10)
+    ax.set_title(f"{title}  |  {stats['bars']} bars", color="#ffffff", fontsize=11)
+
+    buf = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format="png", facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buf.getvalue(), stats
+
+
+class ChartsCog(commands.Cog, name="Charts"):
+    def __init__(self, bot):
+        self.bot = bot
+        self.ct = pytz.timezone('America/Chicago')
+        # Workers start lazily, once the bot already runs threads (to_thread, aiohttp); forking
+        # a threaded process can deadlock, so they come from a clean forkserver instead
+        self.pool = ProcessPoolExecutor(max_workers=CHART_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+        # (symbol, interval, lookback, last bar time, levels) -> PNG bytes, LRU ordered
+        # ("heatmap", interval, lookback, last bar time, symbols) -> (PNG bytes, stats)
+        self.cache = OrderedDict()
+        # Same key -> executor future, so identical concurrent requests render once
+        self.pending = {}
+
+    def cog_unload(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot_state(self):
+        return {'cache': list(self.cache.items())}
+
+    def restore_state(self, state):
+        for key, png in state.get('cache', []):
+            self.cache.setdefault(key, png)
+
+    def chart_levels(self, symbol, bars):
+        """Levels posted with !levels, falling back to the 20-bar range"""
+        analysis = self.bot.get_cog("Analysis")
+        posted = analysis.posted_levels.get(symbol) if analysis else None
+        if posted:
+            return tuple((label, price) for label, price in posted.items() if price)
+
+        support = float(bars['low'][-20:].min())
+        resistance = float(bars['high'][-20:].max())
+        return (("S1", support), ("R1", resistance))
+
+    async def chart_bias(self, bars, levels):
+        """Run determine_bias on the charted symbol instead of SPY"""
+        analysis = self.bot.get_cog("Analysis")
+        if not analysis:
+            return "NEUTRAL"
+
+        supports = [p for label, p in levels if label.startswith("S")]
+        resistances = [p for label, p in levels if label.startswith("R")]
+        vix_bars = await self.bot.bars.get("^VIX", "1d", "5d")
+
+        closes = bars['close']
+        price = float(closes[-1])
+        prev = float(closes[-2]) if len(closes) > 1 else price
+        data = {
+            'spy_price': price,
+            'spy_change': price - prev,
+            'spy_support': min(supports) if supports else float(bars['low'][-20:].min()),
+            'spy_resistance': max(resistances) if resistances else float(bars['high'][-20:].max()),
+            'vix': float(vix_bars['close'][-1]) if vix_bars is not None else 0,
+        }
+        bias, _ = analysis.determine_bias(data)
+        return bias
+
+    async def render(self, key, draw, *args):
+        """Return the cached result of draw(*args), rendering in the process pool on a miss"""
+        png = self.cache.get(key)
+        if png is not None:
+            self.cache.move_to_end(key)
+            return png
+
+        future = self.pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, draw, *args)
+            self.pending[key] = future
+            future.add_done_callback(lambda _: self.pending.pop(key, None))
+
+        png = await asyncio.shield(future)
+        # Failed renders (None, or (None, stats) from render_heatmap) are retried next time
+        if png is None or (isinstance(png, tuple) and png[0] is None):
+            return png
+        self.cache[key] = png
+        self.cache.move_to_end(key)
+        while len(self.cache) > CHART_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return png
+
+    @commands.command(name="chart", help="Candlestick chart with levels. Usage: !chart NQ [5m] [5d]")
+    async def chart_command(self, ctx, symbol: str = None, interval: str = "1d", lookback: str = None):
+        """!chart <symbol> [interval] [lookback]"""
+        if not symbol:
+            await ctx.send("**Usage:** `!chart <symbol> [interval] [lookback]`\n"
+                           f"**Intervals:** {', '.join(CHART_INTERVALS)}\n"
+                           "**Example:** `!chart NQ 5m 5d`")
+            return
+
+        interval = interval.lower()
+        if interval not in CHART_INTERVALS:
+            await ctx.send(f"Unknown interval '{interval}'. Use one of: {', '.join(CHART_INTERVALS)}")
+            return
+
+        lookback = (lookback or CHART_INTERVALS[interval]).lower()
+        try:
+            period_seconds(lookback)
+        except ValueError:
+            await ctx.send(f"Unknown lookback '{lookback}'. Use e.g. 1d, 5d, 1mo, 6mo, 1y, max.")
+            return
+        symbol = resolve_symbol(symbol)
+
+        async with ctx.typing():
+            bars = await self.bot.bars.get(symbol, interval, lookback)
+            if bars is None or len(bars['close']) < 2:
+                await ctx.send(f"No chart data for {symbol}.")
+                return
+
+            # Copies: ring views can change under the pool's background pickling
+            bars = {name: column[-MAX_CANDLES:].copy() for name, column in bars.items()}
+            levels = self.chart_levels(symbol, bars)
+            bias = await self.chart_bias(bars, levels)
+            key = (symbol, interval, lookback, int(bars['time'][-1]), levels)
+
+            try:
+                png = await self.render(key, render_candlestick, f"{symbol} {interval}", bars, levels, bias)
+            except Exception as e:
+                await ctx.send(f"Error rendering chart for {symbol}: {str(e)}")
+                return
+
+        filename = f"{symbol.replace('=', '').replace('^', '')}_{interval}.png"
+        embed = discord.Embed(title=f"{symbol} - {interval} ({lookback})", color=discord.Color.blue(),
+                              timestamp=datetime.now(self.ct))
+        embed.add_field(name="Bias", value=f"**{bias}**", inline=True)
+        embed.add_field(name="Levels", value=" | ".join(f"{label} {price:,.2f}" for label, price in levels), inline=True)
+        embed.set_image(url=f"attachment://{filename}")
+        embed.set_footer(text=f"Requested by {ctx.author.name}")
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(png), filename=filename))
+
+    @commands.command(name="heatmap", help="Correlation heatmap across the futures board + watchlist. Usage: !heatmap [3mo] [1d]")
+    async def heatmap_command(self, ctx, lookback: str = "3mo", interval: str = "1d"):
+        """!heatmap [lookback] [interval]"""
+        interval, lookback = interval.lower(), lookback.lower()
+        if interval not in INTERVAL_SECONDS:
+            await ctx.send(f"Unknown interval '{interval}'. Use one of: {', '.join(INTERVAL_SECONDS)}")
+            return
+        try:
+            period_seconds(lookback)
+        except ValueError:
+            await ctx.send(f"Unknown lookback '{lookback}'. Use e.g. 5d, 1mo, 3mo, 1y.")
+            return
+
+        symbols = tuple(dict.fromkeys([*FUTURES_SYMBOLS, *HEATMAP_WATCHLIST]))[:HEATMAP_MAX_SYMBOLS]
+
+        async with ctx.typing():
+            fetched = await asyncio.gather(*(self.bot.bars.get(s, interval, lookback) for s in symbols))
+            # Copies: ring views can change under the pool's background pickling
+            bars_by_symbol = {s: {'time': bars['time'].copy(), 'close': bars['close'].astype(np.float64)}
+                              for s, bars in zip(symbols, fetched) if bars is not None and len(bars['close'])}
+            if len(bars_by_symbol) < 2:
+                await ctx.send("Not enough data to build a heatmap.")
+                return
+
+            # The newest bar on the board only changes once a bar closes, so it keys the cache
+            latest = max(int(bars['time'][-1]) for bars in bars_by_symbol.values())
+            key = ("heatmap", interval, lookback, latest, symbols)
+            try:
+                png, stats = await self.render(key, render_heatmap, f"Correlation - {interval} ({lookback})",
+                                               bars_by_symbol, INTERVAL_SECONDS[interval])
+            except Exception as e:
+                await ctx.send(f"Error rendering heatmap: {str(e)}")
+                return
+
+        if png is None:
+            await ctx.send(f"Not enough overlapping {interval} history to correlate over {lookback}.")
+            return
+
+        labels = [s.replace("=F", "") for s in stats['symbols']]
+        order = sorted(range(len(labels)), key=lambda i: stats['strength'][i], reverse=True)
+        strongest = ", ".join(f"{labels[i]} {stats['strength'][i]:+.1f}%" for i in order[:5])
+        weakest = ", ".join(f"{labels[i]} {stats['strength'][i]:+.1f}%" for i in reversed(order[-5:]))
+
+        filename = f"heatmap_{interval}_{lookback}.png"
+        embed = discord.Embed(title=f"Cross-Asset Correlation - {interval} ({lookback})", color=discord.Color.blue(),
+                              timestamp=datetime.now(self.ct))
+        embed.add_field(name="Strongest vs board", value=strongest, inline=False)
+        embed.add_field(name="Weakest vs board", value=weakest, inline=False)
+        skipped = [s for s in symbols if s not in bars_by_symbol] + stats['dropped']
+        if skipped:
+            embed.add_field(name="Skipped (missing or too little history)", value=", ".join(skipped)[:1024], inline=False)
+        embed.set_image(url=f"attachment://{filename}")
+        embed.set_footer(text=f"{len(labels)} symbols, {stats['bars']} aligned bars | Requested by {ctx.author.name}")
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(png), filename=filename))
+
+async def setup(bot):
+    await bot.add_cog(ChartsCog(bot))
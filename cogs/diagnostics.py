@@ -0,0 +1,58 @@
+"""
+Diagnostics Cog - Live profiling for the bot owner
+Uses ! prefix commands (NOT slash commands)
+"""
+import discord
+from discord.ext import commands
+from datetime import datetime
+import asyncio
+import io
+import os
+import pytz
+
+from utils.profiler import profile_cpu, profile_memory
+
+PROFILE_MAX_SECONDS = int(os.environ.get('PROFILE_MAX_SECONDS', '120'))
+
+class DiagnosticsCog(commands.Cog, name="Diagnostics"):
+    def __init__(self, bot):
+        self.bot = bot
+        self.ct = pytz.timezone('America/Chicago')
+        # One profile at a time keeps overhead bounded
+        self.profile_lock = asyncio.Lock()
+
+    @commands.command(name="profile", help="Owner only. Profile the live bot. Usage: !profile 30 [cpu|mem]")
+    @commands.is_owner()
+    async def profile_command(self, ctx, seconds: int = 30, mode: str = "cpu"):
+        """!profile <seconds> [cpu|mem] - Upload hot functions or allocation sites"""
+        mode = mode.lower()
+        if mode not in ("cpu", "mem") or not 1 <= seconds <= PROFILE_MAX_SECONDS:
+            await ctx.send(f"**Usage:** `!profile <1-{PROFILE_MAX_SECONDS}> [cpu|mem]`")
+            return
+        if self.profile_lock.locked():
+            await ctx.send("A profile is already running.")
+            return
+
+        async with self.profile_lock:
+            await ctx.send(f"Profiling {mode.upper()} for {seconds}s...")
+            if mode == "cpu":
+                report = await profile_cpu(seconds)
+            else:
+                report = await profile_memory(seconds)
+
+        now = datetime.now(self.ct)
+        filename = f"profile_{mode}_{now.strftime('%Y%m%d_%H%M%S')}.txt"
+        await ctx.send(
+            f"{mode.upper()} profile ({seconds}s) finished.",
+            file=discord.File(io.BytesIO(report.encode()), filename=filename)
+        )
+
+    @profile_command.error
+    async def profile_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("Only the bot owner can run `!profile`.")
+        else:
+            raise error
+
+async def setup(bot):
+    await bot.add_cog(DiagnosticsCog(bot))
@@ -0,0 +1,206 @@
+"""
+Digest Cog - End-of-day recap for the daily bias channel
+Uses ! prefix commands (NOT slash commands)
+"""
+import discord
+from discord.ext import commands, tasks
+from datetime import datetime, time, timedelta
+import asyncio
+import os
+import pytz
+
+from cogs.market_data import FUTURES_SYMBOLS
+from utils.digest import DayDigest, trade_date_for
+from utils.sessions import is_open, is_trading_day
+
+DIGEST_SAMPLE_SECONDS = int(os.environ.get('DIGEST_SAMPLE_SECONDS', '60'))
+
+# SPY is sampled too so the morning bias (called on SPY) can be scored at the close
+DIGEST_SYMBOLS = [*FUTURES_SYMBOLS, "SPY"]
+
+class DigestCog(commands.Cog, name="Digest"):
+    def __init__(self, bot):
+        self.bot = bot
+        self.ct = pytz.timezone('America/Chicago')
+        self.trade_date = trade_date_for(datetime.now(self.ct))
+        self.tomorrow = []
+        self.digests = {}  # guild_id -> DayDigest, so one server's trades never show up in another's recap
+        self.sample_quotes.start()
+        self.publish_digest.start()
+
+    async def cog_load(self):
+        self.refresh_tomorrow()
+
+    def cog_unload(self):
+        self.sample_quotes.cancel()
+        self.publish_digest.cancel()
+
+    def snapshot_state(self):
+        return {'digests': {guild_id: digest.to_state() for guild_id, digest in self.digests.items()}}
+
+    def restore_state(self, state):
+        for guild_id, saved in state.get('digests', {}).items():
+            if saved['trade_date'] == self.trade_date and guild_id not in self.digests:
+                self.digests[guild_id] = DayDigest.from_state(saved)
+
+    def roll(self, now=None):
+        """Drop every server's digest when the trade date rolls"""
+        trade_date = trade_date_for(now or datetime.now(self.ct))
+        if trade_date != self.trade_date:
+            self.trade_date = trade_date
+            self.digests.clear()
+            self.refresh_tomorrow()
+
+    def current(self, guild_id, now=None):
+        """A server's digest for today, started on first use"""
+        self.roll(now)
+        digest = self.digests.get(guild_id)
+        if digest is None:
+            digest = self.digests[guild_id] = DayDigest(self.trade_date)
+            digest.tomorrow = self.tomorrow
+        return digest
+
+    def targets(self, guild_id, now=None):
+        """Digests an event belongs to: one server's, or every configured server's when guild_id is None"""
+        if guild_id is not None:
+            return [self.current(guild_id, now)]
+        return [self.current(g, now) for g in self.bot.guild_config.guilds]
+
+    def refresh_tomorrow(self):
+        """Cache the next trading day's calendar events (on roll-over and when events change)"""
+        calendar = self.bot.get_cog("Calendar")
+        day = self.trade_date + timedelta(days=1)
+        while not is_trading_day("equity", day):
+            day += timedelta(days=1)
+        events = [e for e in calendar.events if e.get('date') == day.isoformat()] if calendar else []
+        self.tomorrow = [day.isoformat(), sorted(events, key=lambda e: e.get('time', ''))]
+        for digest in self.digests.values():
+            digest.tomorrow = self.tomorrow
+
+    # Live updates from the other cogs; guild_id None means the event went to every server
+
+    @commands.Cog.listener()
+    async def on_trade_alert(self, symbol, side, entry, guild_id):
+        for digest in self.targets(guild_id):
+            digest.record_alert(symbol, side, entry)
+
+    @commands.Cog.listener()
+    async def on_trade_close(self, symbol, result, pnl, guild_id):
+        for digest in self.targets(guild_id):
+            digest.record_close(symbol, result, pnl)
+
+    @commands.Cog.listener()
+    async def on_trade_update(self, symbol, guild_id):
+        for digest in self.targets(guild_id):
+            digest.record_update()
+
+    @commands.Cog.listener()
+    async def on_bias_posted(self, bias, data, now, guild_id):
+        for digest in self.targets(guild_id, now):
+            digest.record_bias(bias, data['spy_price'] if data else None, now)
+            if data:
+                digest.observe("SPY", data['spy_price'])
+
+    @commands.Cog.listener()
+    async def on_calendar_changed(self):
+        self.refresh_tomorrow()
+
+    @tasks.loop(seconds=DIGEST_SAMPLE_SECONDS)
+    async def sample_quotes(self):
+        """Fold the latest futures quotes into the running high/low while the session is open"""
+        now = datetime.now(self.ct)
+        if not is_open("equity", now):
+            return
+        quotes = await self.bot.quotes.quotes(DIGEST_SYMBOLS)
+        # Every configured server plus any that recorded activity without a digest channel set up
+        self.roll(now)
+        digests = [self.current(g, now) for g in {*self.bot.guild_config.guilds, *self.digests}]
+        for symbol, quote in quotes.items():
+            if quote and quote.get('lastPrice'):
+                for digest in digests:
+                    digest.observe(symbol, quote['lastPrice'], quote.get('previousClose'))
+
+    @sample_quotes.before_loop
+    async def before_sample_quotes(self):
+        await self.bot.wait_until_ready()
+
+    def build_embed(self, digest):
+        """Render the digest; reads only the running totals, never the day's history"""
+        embed = discord.Embed(
+            title=f"End of Day Digest - {digest.trade_date.strftime('%a %b %d')}",
+            color=discord.Color.dark_blue(),
+            timestamp=datetime.now(self.ct)
+        )
+
+        lines = []
+        for symbol, name in FUTURES_SYMBOLS.items():
+            move = digest.moves.get(symbol)
+            if not move:
+                continue
+            base = move['prev'] or move['first']
+            change = move['last'] - base
+            pct = change / base * 100 if base else 0
+            lines.append(f"**{name}:** {move['last']:,.2f} ({change:+,.2f}, {pct:+.2f}%) "
+                         f"H {move['high']:,.2f} / L {move['low']:,.2f}")
+        embed.add_field(name="Futures", value="\n".join(lines) or "No quotes sampled this session.", inline=False)
+
+        if digest.bias:
+            outcome = digest.bias_outcome()
+            called = datetime.fromtimestamp(digest.bias['time'], self.ct).strftime('%I:%M %p')
+            value = f"**{digest.bias['bias']}** at {called} CT"
+            if outcome:
+                label, change = outcome
+                value += f"\nSPY {change:+,.2f} since the call - **{label}**"
+        else:
+            value = "No bias posted today."
+        embed.add_field(name="Morning Bias", value=value, inline=False)
+
+        closed = digest.wins + digest.losses
+        value = (f"Alerts: **{digest.alerts}** | Updates: {digest.updates} | Closed: **{closed}** "
+                 f"({digest.wins}W / {digest.losses}L)")
+        if closed:
+            value += f"\nNet: **{digest.points:+,.2f} pts** | Win rate {digest.wins / closed * 100:.0f}%"
+        if digest.by_symbol:
+            busiest = sorted(digest.by_symbol.items(), key=lambda item: -(item[1][0] + item[1][1]))[:5]
+            value += "\n" + " | ".join(f"{symbol}: {a}A/{c}C {pts:+,.1f}" for symbol, (a, c, pts) in busiest)
+        if digest.recent:
+            value += "\n" + "\n".join(f"- {line}" for line in digest.recent)
+        embed.add_field(name="Trades", value=value[:1024], inline=False)
+
+        day, events = digest.tomorrow or ("", [])
+        if events:
+            value = "\n".join(f"[{e.get('impact', 'MED')}] {e.get('time', 'TBD')} CT - {e['event']}" for e in events[:10])
+        else:
+            value = "No scheduled events."
+        embed.add_field(name=f"Next Session Events ({day})" if day else "Next Session Events", value=value[:1024], inline=False)
+
+        embed.set_footer(text="Digest Cog | Auto-posted at 4:00 PM CT")
+        return embed
+
+    @tasks.loop(time=time(hour=16, minute=0, tzinfo=pytz.timezone('America/Chicago')))
+    async def publish_digest(self):
+        """Auto-post the digest at the 4:00 PM CT close (CME equity trading days only)"""
+        now = datetime.now(self.ct)
+        if not is_trading_day("equity", now.date()):
+            return
+        # Each server gets its own recap
+        channels = self.bot.guild_config.channels('daily_bias')
+        results = await asyncio.gather(
+            *(channel.send(embed=self.build_embed(self.current(channel.guild.id, now))) for channel in channels),
+            return_exceptions=True)
+        for channel, result in zip(channels, results):
+            if isinstance(result, Exception):
+                print(f"Could not post digest to {channel.guild.name}/#{channel.name}: {result}")
+
+    @publish_digest.before_loop
+    async def before_publish_digest(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command(name="digest", help="Preview today's end-of-day digest")
+    @commands.guild_only()
+    async def digest_command(self, ctx):
+        """!digest - Show this server's digest so far"""
+        await ctx.send(embed=self.build_embed(self.current(ctx.guild.id)))
+
+async def setup(bot):
+    await bot.add_cog(DigestCog(bot))
@@ -4,9 +4,6 @@ Education Cog - Trading terms and tips
 import discord
 from discord.ext import commands
 import random
-import os
-
-TRADING_GLOSSARY_CHANNEL = int(os.environ.get('CHANNEL_TRADING_GLOSSARY', '1358534448332935420'))
 
 TRADING_TERMS = {
     "support": {
@@ -161,7 +158,7 @@ class EducationCog(commands.Cog, name="Education"):
         embed.add_field(name="Example", value=info['example'], inline=False)
         embed.set_footer(text=f"Posted by {ctx.author.name}")
 
-        channel = self.bot.get_channel(TRADING_GLOSSARY_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'trading_glossary')
         if channel:
             await channel.send(embed=embed)
             await ctx.send(f"Posted '{term}' to glossary channel!")
@@ -3,12 +3,13 @@ Market Data Cog - Live prices and daily bias
 """
 import discord
 from discord.ext import commands
-import yfinance as yf
 from datetime import datetime
+import asyncio
 import pytz
-import os
 
-DAILY_BIAS_CHANNEL = int(os.environ.get('CHANNEL_DAILY_BIAS', '1358534746879037642'))
+from utils.bars import resolve_symbol
+from utils.quotes import fast_info_quote
+from utils.sessions import MARKETS, market_for_symbol, session_state
 
 FUTURES_SYMBOLS = {
     "NQ=F": "NQ (Nasdaq)",
@@ -24,32 +25,38 @@ class MarketDataCog(commands.Cog, name="Market Data"):
         self.bot = bot
         self.ct = pytz.timezone('America/Chicago')
 
-    def get_market_data(self):
+    async def get_quote(self, symbol):
+        """lastPrice/previousClose via the async quote client, falling back to fast_info"""
+        quote = await self.bot.quotes.quote(symbol)
+        if quote is None:
+            quote = await asyncio.to_thread(fast_info_quote, symbol)
+        return quote
+
+    async def get_market_data(self):
         """Fetch current market data"""
         data = {}
-        for symbol, name in FUTURES_SYMBOLS.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.fast_info
-                price = info.get('lastPrice', 0)
-                prev_close = info.get('previousClose', price)
-                change = price - prev_close if prev_close else 0
-                change_pct = (change / prev_close * 100) if prev_close else 0
-                data[symbol] = {
-                    'name': name,
-                    'price': price,
-                    'change': change,
-                    'change_pct': change_pct
-                }
-            except Exception as e:
-                print(f"Error fetching {symbol}: {e}")
+        quotes = await asyncio.gather(*(self.get_quote(s) for s in FUTURES_SYMBOLS), return_exceptions=True)
+        for (symbol, name), quote in zip(FUTURES_SYMBOLS.items(), quotes):
+            if isinstance(quote, Exception):
+                print(f"Error fetching {symbol}: {quote}")
+                continue
+            price = quote['lastPrice']
+            prev_close = quote['previousClose']
+            change = price - prev_close if prev_close else 0
+            change_pct = (change / prev_close * 100) if prev_close else 0
+            data[symbol] = {
+                'name': name,
+                'price': price,
+                'change': change,
+                'change_pct': change_pct
+            }
         return data
 
     @commands.command(name="market", help="Get live prices for major futures")
     async def market_command(self, ctx):
         """!market - Get live market data"""
         async with ctx.typing():
-            data = self.get_market_data()
+            data = await self.get_market_data()
             now = datetime.now(self.ct)
 
             embed = discord.Embed(
@@ -78,10 +85,9 @@ class MarketDataCog(commands.Cog, name="Market Data"):
 
         async with ctx.typing():
             try:
-                ticker = yf.Ticker(symbol.upper())
-                info = ticker.fast_info
-                price = info.get('lastPrice', 0)
-                prev_close = info.get('previousClose', price)
+                quote = await self.get_quote(symbol.upper())
+                price = quote['lastPrice']
+                prev_close = quote['previousClose']
                 change = price - prev_close if prev_close else 0
                 change_pct = (change / prev_close * 100) if prev_close else 0
 
@@ -123,12 +129,40 @@ class MarketDataCog(commands.Cog, name="Market Data"):
         )
         embed.set_footer(text=f"Posted by {ctx.author.name}")
 
-        channel = self.bot.get_channel(DAILY_BIAS_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'daily_bias')
         if channel:
             await channel.send(embed=embed)
             await ctx.send("Daily bias posted to #daily-bias channel!")
         else:
             await ctx.send(embed=embed)
 
+    @commands.command(name="session", help="Market session status. Usage: !session [symbol]")
+    async def session_command(self, ctx, symbol: str = None):
+        """!session [symbol] - Open/closed state and next open for CME and US stock sessions"""
+        now = datetime.now(self.ct)
+        markets = [market_for_symbol(resolve_symbol(symbol))] if symbol else list(MARKETS)
+
+        embed = discord.Embed(
+            title="Market Sessions" if not symbol else f"{symbol.upper()} Session",
+            description=f"Now: {now.strftime('%a %b %d, %I:%M %p CT')}",
+            color=discord.Color.blue(),
+            timestamp=now
+        )
+        for market in markets:
+            state = session_state(market, now)
+            note = state['session'][2] if state['session'] else ""
+            if state['open']:
+                value = f"**OPEN** - closes {state['next_close'].strftime('%a %I:%M %p CT')}"
+            elif state['next_open']:
+                value = f"**CLOSED** - opens {state['next_open'].strftime('%a %b %d, %I:%M %p CT')}"
+            else:
+                value = "**CLOSED**"
+            if note:
+                value += f"\n{note}"
+            embed.add_field(name=MARKETS[market]['name'], value=value, inline=False)
+
+        embed.set_footer(text="CME hours: Sun-Fri 5:00 PM - 4:00 PM CT | Holidays computed per CME/NYSE rules")
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(MarketDataCog(bot))
@@ -7,12 +7,110 @@ from datetime import datetime
 import pytz
 import os
 
-TRADE_ALERTS_CHANNEL = int(os.environ.get('CHANNEL_TRADE_ALERTS', '1358534900780630067'))
+from utils.fanout import WebhookFanout
+from utils.ingest import IngestServer, BATCH_WINDOW, QUEUE_SIZE
+
+# Extra destinations (other channels / partner servers), comma-separated webhook URLs
+TRADE_RELAY_WEBHOOKS = [url.strip() for url in os.environ.get('TRADE_RELAY_WEBHOOKS', '').split(',') if url.strip()]
+
+# Strategy webhook intake; the server only starts when a token is set
+INGEST_TOKEN = os.environ.get('INGEST_TOKEN', '')
+INGEST_HOST = os.environ.get('INGEST_HOST', '0.0.0.0')
+INGEST_PORT = int(os.environ.get('INGEST_PORT', os.environ.get('PORT', '8080')))
+INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', str(QUEUE_SIZE)))
+INGEST_BATCH_SECONDS = float(os.environ.get('INGEST_BATCH_SECONDS', str(BATCH_WINDOW)))
+
+def alert_embed(symbol, action, price, stop, target, notes, author, now):
+    """Trade alert embed shared by !alert and webhook intake"""
+    # Calculate R:R
+    risk = abs(price - stop)
+    reward = abs(target - price)
+    rr_ratio = reward / risk if risk > 0 else 0
+
+    if action.upper() == "BUY":
+        color = discord.Color.green()
+        action_text = "LONG"
+    else:
+        color = discord.Color.red()
+        action_text = "SHORT"
+
+    embed = discord.Embed(
+        title=f"TRADE ALERT: {symbol.upper()}",
+        color=color,
+        timestamp=now
+    )
+    embed.add_field(name="Action", value=f"**{action_text}**", inline=True)
+    embed.add_field(name="Entry", value=f"**{price:,.2f}**", inline=True)
+    embed.add_field(name="\u200b", value="\u200b", inline=True)
+    embed.add_field(name="Stop Loss", value=f"**{stop:,.2f}**", inline=True)
+    embed.add_field(name="Target", value=f"**{target:,.2f}**", inline=True)
+    embed.add_field(name="R:R", value=f"**1:{rr_ratio:.1f}**", inline=True)
+
+    if notes:
+        embed.add_field(name="Notes", value=notes, inline=False)
+
+    embed.set_footer(text=f"Alert by {author} | {now.strftime('%I:%M %p CT')}")
+    return embed
 
 class TradeRelayCog(commands.Cog, name="Trade Relay"):
     def __init__(self, bot):
         self.bot = bot
         self.ct = pytz.timezone('America/Chicago')
+        self.fanout = None
+        self.ingest = None
+
+    async def cog_load(self):
+        self.fanout = WebhookFanout(TRADE_RELAY_WEBHOOKS)
+        self.fanout.start()
+        if INGEST_TOKEN:
+            self.ingest = IngestServer(self.relay_ingested, INGEST_TOKEN, INGEST_HOST, INGEST_PORT,
+                                       queue_size=INGEST_QUEUE_SIZE, batch_window=INGEST_BATCH_SECONDS)
+            try:
+                await self.ingest.start()
+                print(f"Alert ingest listening on {INGEST_HOST}:{INGEST_PORT}/webhook")
+            except OSError as e:
+                print(f"Could not start alert ingest on port {INGEST_PORT}: {e}")
+                self.ingest = None
+
+    async def cog_unload(self):
+        if self.ingest:
+            await self.ingest.stop()
+        if self.fanout:
+            await self.fanout.stop()
+
+    def mirror(self, embed):
+        """Queue an embed for every webhook destination, returns how many"""
+        if not self.fanout:
+            return 0
+        return self.fanout.publish(embed, username="JustTrades Alerts")
+
+    def mirror_note(self, count):
+        return f" (mirrored to {count} destination{'s' if count != 1 else ''})" if count else ""
+
+    async def relay_ingested(self, batch):
+        """Post a batch of webhook alerts (up to 10 embeds per message) to every server and mirror it"""
+        await self.bot.wait_until_ready()
+        embeds = [alert_embed(a['symbol'], a['side'], a['entry'], a['stop'], a['target'], a['notes'], "Strategy",
+                              datetime.fromtimestamp(a['received_at'], self.ct))
+                  for a in batch]
+        mirrored = self.fanout.publish_many(embeds, username="JustTrades Alerts") if self.fanout else 0
+        # Webhook alerts go to every server, so no guild_id
+        for a in batch:
+            self.bot.dispatch("trade_alert", a['symbol'], a['side'], a['entry'], None)
+
+        channels = len(self.bot.guild_config.channels('trade_alerts'))
+        delivered = 0
+        for start in range(0, len(embeds), 10):
+            delivered += await self.bot.guild_config.broadcast('trade_alerts', embeds=embeds[start:start + 10])
+
+        # Raise only when the batch reached nowhere; otherwise the mirror/digest already have it
+        if not delivered and not mirrored:
+            raise RuntimeError("no trade_alerts channel configured in any server" if not channels
+                               else "trade_alerts posts failed in every server")
+        expected = channels * -(-len(embeds) // 10)
+        if delivered < expected:
+            print(f"Webhook batch of {len(batch)} partially delivered: {delivered}/{expected} server posts"
+                  f"{self.mirror_note(mirrored)}")
 
     @commands.command(name="alert", help="Post a trade alert. Usage: !alert NQ BUY 21500 21480 21560 [notes]")
     async def alert_command(self, ctx, symbol: str = None, action: str = None, price: float = None, stop: float = None, target: float = None, *, notes: str = ""):
@@ -21,41 +119,16 @@ class TradeRelayCog(commands.Cog, name="Trade Relay"):
             await ctx.send("Usage: `!alert <symbol> <BUY/SELL> <entry> <stop> <target> [notes]`\nExample: `!alert NQ BUY 21500 21480 21560 Breaking resistance`")
             return
 
-        now = datetime.now(self.ct)
-
-        # Calculate R:R
-        risk = abs(price - stop)
-        reward = abs(target - price)
-        rr_ratio = reward / risk if risk > 0 else 0
-
-        if action.upper() == "BUY":
-            color = discord.Color.green()
-            action_text = "LONG"
-        else:
-            color = discord.Color.red()
-            action_text = "SHORT"
+        embed = alert_embed(symbol, action, price, stop, target, notes, ctx.author.name, datetime.now(self.ct))
 
-        embed = discord.Embed(
-            title=f"TRADE ALERT: {symbol.upper()}",
-            color=color,
-            timestamp=now
-        )
-        embed.add_field(name="Action", value=f"**{action_text}**", inline=True)
-        embed.add_field(name="Entry", value=f"**{price:,.2f}**", inline=True)
-        embed.add_field(name="\u200b", value="\u200b", inline=True)
-        embed.add_field(name="Stop Loss", value=f"**{stop:,.2f}**", inline=True)
-        embed.add_field(name="Target", value=f"**{target:,.2f}**", inline=True)
-        embed.add_field(name="R:R", value=f"**1:{rr_ratio:.1f}**", inline=True)
+        if ctx.guild:
+            self.bot.dispatch("trade_alert", symbol, action, price, ctx.guild.id)
+        mirrored = self.mirror(embed)
 
-        if notes:
-            embed.add_field(name="Notes", value=notes, inline=False)
-
-        embed.set_footer(text=f"Alert by {ctx.author.name} | {now.strftime('%I:%M %p CT')}")
-
-        channel = self.bot.get_channel(TRADE_ALERTS_CHANNEL)
+        channel = self.bot.guild_config.channel(ctx.guild, 'trade_alerts')
         if channel:
             await channel.send(embed=embed)
-            await ctx.send("Trade alert posted to #trade-alerts!")
+            await ctx.send(f"Trade alert posted to #trade-alerts!{self.mirror_note(mirrored)}")
         else:
             await ctx.send(embed=embed)
 
@@ -89,10 +162,14 @@ class TradeRelayCog(commands.Cog, name="Trade Relay"):
 
         embed.set_footer(text=f"Closed by {ctx.author.name}")
 
-        channel = self.bot.get_channel(TRADE_ALERTS_CHANNEL)
+        if ctx.guild:
+            self.bot.dispatch("trade_close", symbol, result, pnl, ctx.guild.id)
+        mirrored = self.mirror(embed)
+
+        channel = self.bot.guild_config.channel(ctx.guild, 'trade_alerts')
         if channel:
             await channel.send(embed=embed)
-            await ctx.send("Trade close posted to #trade-alerts!")
+            await ctx.send(f"Trade close posted to #trade-alerts!{self.mirror_note(mirrored)}")
         else:
             await ctx.send(embed=embed)
 
@@ -114,12 +191,44 @@ class TradeRelayCog(commands.Cog, name="Trade Relay"):
 
         embed.set_footer(text=f"Update by {ctx.author.name}")
 
-        channel = self.bot.get_channel(TRADE_ALERTS_CHANNEL)
+        if ctx.guild:
+            self.bot.dispatch("trade_update", symbol, ctx.guild.id)
+        mirrored = self.mirror(embed)
+
+        channel = self.bot.guild_config.channel(ctx.guild, 'trade_alerts')
         if channel:
             await channel.send(embed=embed)
-            await ctx.send("Update posted to #trade-alerts!")
+            await ctx.send(f"Update posted to #trade-alerts!{self.mirror_note(mirrored)}")
         else:
             await ctx.send(embed=embed)
 
+    @commands.command(name="relaystats", help="Show webhook mirror delivery stats")
+    async def relay_stats_command(self, ctx):
+        """!relaystats - Per-destination delivery latency for mirrored alerts"""
+        stats = self.fanout.stats() if self.fanout else []
+        if not stats and not self.ingest:
+            await ctx.send("No webhook destinations configured (set `TRADE_RELAY_WEBHOOKS`).")
+            return
+
+        embed = discord.Embed(title="Trade Relay Fan-out", color=discord.Color.blue())
+        if self.ingest:
+            ingest = self.ingest.stats()
+            embed.description = (
+                f"**Webhook intake:** {ingest['accepted']:,} accepted | {ingest['duplicate']:,} duplicate | "
+                f"{ingest['rejected'] + ingest['unauthorized']:,} rejected | {ingest['queue_full']:,} queue full\n"
+                f"Relayed {ingest['relayed']:,} in {ingest['batches']:,} posts (avg {ingest['avg_batch']:.1f}/post) | "
+                f"Queued {ingest['queued']:,}/{ingest['maxsize']:,} | Failed {ingest['failed']:,}"
+            )
+        for dest in stats[:25]:
+            embed.add_field(
+                name=dest['name'],
+                value=f"Sent: {dest['sent']} | Failed: {dest['failed']} | Queued: {dest['queued']}\n"
+                      f"Last: {dest['last']:.0f}ms | Avg: {dest['avg']:.0f}ms | p95: {dest['p95']:.0f}ms",
+                inline=True
+            )
+        if len(stats) > 25:
+            embed.set_footer(text=f"Showing 25 of {len(stats)} destinations")
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(TradeRelayCog(bot))
@@ -0,0 +1,190 @@
+"""
+Watch Cog - Price-threshold alerts (!watch NQ above 21500)
+Uses ! prefix commands (NOT slash commands)
+"""
+import discord
+from discord.ext import commands, tasks
+from collections import defaultdict
+from datetime import datetime
+import asyncio
+import math
+import os
+import pytz
+
+from utils.bars import resolve_symbol
+from utils.sessions import symbol_is_open
+from utils.watch import WatchIndex, ABOVE, BELOW
+
+WATCH_STORE_PATH = os.environ.get('WATCH_STORE_PATH', 'data/watches.json')
+WATCH_POLL_SECONDS = int(os.environ.get('WATCH_POLL_SECONDS', '15'))
+WATCH_MAX_PER_USER = int(os.environ.get('WATCH_MAX_PER_USER', '50'))
+MESSAGE_LIMIT = 1900
+
+def chunk_lines(lines, limit=MESSAGE_LIMIT):
+    """Pack lines into as few messages as fit under Discord's length limit"""
+    chunk = []
+    size = 0
+    for line in lines:
+        if chunk and size + len(line) + 1 > limit:
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line) + 1
+    if chunk:
+        yield "\n".join(chunk)
+
+class WatchCog(commands.Cog, name="Watch"):
+    def __init__(self, bot):
+        self.bot = bot
+        self.ct = pytz.timezone('America/Chicago')
+        self.index = WatchIndex.load(WATCH_STORE_PATH)
+        self.refresh_watches.start()
+
+    def cog_unload(self):
+        self.refresh_watches.cancel()
+        if self.index.dirty:
+            try:
+                self.index.save(WATCH_STORE_PATH)
+            except OSError as e:
+                print(f"Could not save watches to {WATCH_STORE_PATH}: {e}")
+
+    def snapshot_state(self):
+        # Alerts persist in WATCH_STORE_PATH; last prices let crossings during downtime fire on the first tick
+        return {'last_price': self.index.last_price}
+
+    def restore_state(self, state):
+        for symbol, price in state.get('last_price', {}).items():
+            self.index.last_price.setdefault(symbol, price)
+
+    @tasks.loop(seconds=WATCH_POLL_SECONDS)
+    async def refresh_watches(self):
+        """Pull quotes for watched symbols whose market is open and fire every crossed alert"""
+        now = datetime.now(self.ct)
+        symbols = [s for s in self.index.symbols() if symbol_is_open(s, now)]
+        if symbols:
+            quotes = await self.bot.quotes.quotes(symbols)
+            fired = []
+            for symbol, quote in quotes.items():
+                if quote:
+                    fired.extend((alert, quote['lastPrice']) for alert in self.index.update(symbol, quote['lastPrice']))
+            if fired:
+                try:
+                    await self.notify(fired)
+                finally:
+                    # Drop fired alerts only once delivery was attempted
+                    for alert, _ in fired:
+                        self.index.remove(alert['id'])
+
+        if self.index.dirty:
+            # Serialize here; only the file write leaves the loop
+            text = self.index.dumps()
+            try:
+                await asyncio.to_thread(WatchIndex.write, WATCH_STORE_PATH, text)
+            except OSError as e:
+                self.index.dirty = True  # try again next tick
+                print(f"Could not save watches to {WATCH_STORE_PATH}: {e}")
+
+    @refresh_watches.before_loop
+    async def before_refresh_watches(self):
+        await self.bot.wait_until_ready()
+
+    async def notify(self, fired):
+        """Send fired alerts batched per channel and per DM recipient"""
+        by_channel = defaultdict(list)
+        by_user = defaultdict(list)
+        for alert, price in fired:
+            line = (f"**{alert['symbol']}** crossed {alert['direction']} **{alert['threshold']:,.2f}** "
+                    f"(now {price:,.2f})")
+            if alert['dm']:
+                by_user[alert['user_id']].append(line)
+            else:
+                by_channel[alert['channel_id']].append(f"<@{alert['user_id']}> {line}")
+
+        async def send_channel(channel_id, lines):
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                return
+            try:
+                for chunk in chunk_lines(lines):
+                    await channel.send(chunk, allowed_mentions=discord.AllowedMentions(users=True))
+            except discord.HTTPException as e:
+                print(f"Could not post watch alerts to channel {channel_id}: {e}")
+
+        async def send_dm(user_id, lines):
+            try:
+                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+                for chunk in chunk_lines(lines):
+                    await user.send(chunk)
+            except discord.HTTPException as e:
+                print(f"Could not DM watch alerts to {user_id}: {e}")
+
+        results = await asyncio.gather(
+            *(send_channel(channel_id, lines) for channel_id, lines in by_channel.items()),
+            *(send_dm(user_id, lines) for user_id, lines in by_user.items()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Watch notification failed: {result!r}")
+
+    @commands.command(name="watch", help="Alert when price crosses a level. Usage: !watch NQ above 21500 [dm]")
+    async def watch_command(self, ctx, symbol: str = None, direction: str = None, price: float = None, delivery: str = ""):
+        """!watch <symbol> <above/below> <price> [dm]"""
+        if (not symbol or not direction or price is None or not math.isfinite(price)
+                or direction.lower() not in (ABOVE, BELOW)):
+            await ctx.send("**Usage:** `!watch <symbol> <above/below> <price> [dm]`\n"
+                           "**Example:** `!watch NQ above 21500` or `!watch ES below 6000 dm`")
+            return
+
+        if len(self.index.for_user(ctx.author.id)) >= WATCH_MAX_PER_USER:
+            await ctx.send(f"You already have {WATCH_MAX_PER_USER} active watches. Remove some with `!unwatch`.")
+            return
+
+        alert = self.index.add(
+            resolve_symbol(symbol), direction.lower(), price,
+            user_id=ctx.author.id, channel_id=ctx.channel.id, dm=delivery.lower() == "dm"
+        )
+        where = "by DM" if alert['dm'] else "in this channel"
+        await ctx.send(f"Watch #{alert['id']}: **{alert['symbol']}** {alert['direction']} "
+                       f"**{alert['threshold']:,.2f}** - you'll be notified {where}.")
+
+    @commands.command(name="watches", help="List your active price watches")
+    async def watches_command(self, ctx):
+        """!watches - List your active watches"""
+        alerts = self.index.for_user(ctx.author.id)
+        if not alerts:
+            await ctx.send("You have no active watches. Add one with `!watch NQ above 21500`.")
+            return
+
+        embed = discord.Embed(title="Your Price Watches", color=discord.Color.blue(), timestamp=datetime.now(self.ct))
+        embed.description = "\n".join(
+            f"`#{a['id']}` **{a['symbol']}** {a['direction']} {a['threshold']:,.2f}{' (DM)' if a['dm'] else ''}"
+            for a in sorted(alerts, key=lambda a: a['id'])
+        )
+        embed.set_footer(text=f"{len(self.index):,} watches active server-wide")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="unwatch", help="Remove a price watch. Usage: !unwatch <id|all>")
+    async def unwatch_command(self, ctx, target: str = None):
+        """!unwatch <id|all> - Remove one or all of your watches"""
+        if not target:
+            await ctx.send("**Usage:** `!unwatch <id>` or `!unwatch all`")
+            return
+
+        if target.lower() == "all":
+            alerts = self.index.for_user(ctx.author.id)
+            for alert in alerts:
+                self.index.remove(alert['id'])
+            await ctx.send(f"Removed {len(alerts)} watch(es).")
+            return
+
+        alert = self.index.alerts.get(int(target.lstrip('#'))) if target.lstrip('#').isdigit() else None
+        if not alert or alert['user_id'] != ctx.author.id:
+            await ctx.send(f"No watch #{target.lstrip('#')} found for you.")
+            return
+
+        self.index.remove(alert['id'])
+        await ctx.send(f"Removed watch #{alert['id']} ({alert['symbol']} {alert['direction']} {alert['threshold']:,.2f}).")
+
+async def setup(bot):
+    await bot.add_cog(WatchCog(bot))
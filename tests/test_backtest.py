@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from utils.backtest import BEARISH, BIAS_LABELS, BULLISH, CAUTIOUS, LEVEL_WINDOW, NEUTRAL, align_daily, bias_codes, run_backtest
+
+DAY = 86400
+START = 1_700_000_000 // DAY * DAY
+
+
+def daily_bars(days, offset, close=None):
+    """Daily bars stamped `offset` seconds after UTC midnight (exchange-local midnight)"""
+    close = np.linspace(100, 130, days) if close is None else close
+    return {
+        'time': START + np.arange(days, dtype=np.int64) * DAY + offset,
+        'open': close - 0.5,
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close,
+        'volume': np.full(days, 1e6),
+    }
+
+
+def test_bias_codes():
+    # Range 100-110: mid 105, breakout bands at 102 / 108 with the 0.3 threshold
+    assert int(bias_codes(109, 1.0, 100, 110, 15)) == BULLISH
+    assert int(bias_codes(109, -1.0, 100, 110, 15)) == NEUTRAL
+    assert int(bias_codes(101, 1.0, 100, 110, 15)) == NEUTRAL
+    assert int(bias_codes(101, -1.0, 100, 110, 15)) == BEARISH
+    assert int(bias_codes(105, -0.5, 100, 110, 15)) == BEARISH
+    assert int(bias_codes(105, 0.0, 100, 110, 15)) == NEUTRAL
+    assert int(bias_codes(109, 1.0, 100, 110, 30)) == CAUTIOUS
+
+
+def test_bias_codes_non_finite_change_is_neutral():
+    codes = bias_codes(np.array([105.0, 105.0, 105.0]), np.array([np.nan, np.inf, -np.inf]), 100, 110, 15)
+    assert codes.tolist() == [NEUTRAL, NEUTRAL, NEUTRAL]
+    assert BIAS_LABELS[int(bias_codes(105, float("nan"), 100, 110, 15))] == "NEUTRAL"
+
+
+def test_align_daily_joins_on_calendar_date_across_exchange_timezones():
+    spy = daily_bars(5, 4 * 3600)   # midnight New York
+    vix = daily_bars(5, 5 * 3600, close=np.arange(10.0, 15.0))  # midnight Chicago
+    vix = {name: np.delete(col, 2) for name, col in vix.items()}
+
+    bars, vix_close = align_daily(spy, vix)
+
+    assert list(bars['time']) == list(spy['time'][[0, 1, 3, 4]])
+    assert list(vix_close) == [10.0, 11.0, 13.0, 14.0]
+
+
+def test_run_backtest_with_mismatched_timestamps():
+    days = 120
+    spy = daily_bars(days, 4 * 3600)
+    vix = daily_bars(days, 5 * 3600, close=np.full(days, 15.0))
+
+    report = run_backtest(spy, vix, years=1)
+
+    # First usable day has a full 20-day window; the last has no next-day outcome
+    assert report['days'] == days - LEVEL_WINDOW
+    assert report['start'] == spy['time'][LEVEL_WINDOW - 1]
+    assert report['end'] == spy['time'][-2]
+    # A steady rally with low VIX: every directional call is BULLISH and right
+    assert report['by_bias']['BEARISH']['days'] == 0
+    assert report['by_bias']['CAUTIOUS']['days'] == 0
+    assert report['hit_rate'] == 100.0
+    assert report['sensitivity'].shape == (len(report['thresholds']), len(report['vix_cutoffs']))
+
+
+def test_run_backtest_high_vix_is_cautious():
+    days = 60
+    report = run_backtest(daily_bars(days, 0), daily_bars(days, 0, close=np.full(days, 40.0)))
+    assert report['by_bias']['CAUTIOUS']['days'] == report['days']
+    assert report['hit_rate'] == 0.0
+
+
+@pytest.mark.parametrize("years", [0, -1, float("inf"), float("nan")])
+def test_run_backtest_rejects_bad_years(years):
+    with pytest.raises(ValueError):
+        run_backtest(daily_bars(60, 0), daily_bars(60, 0), years=years)
+
+
+def test_run_backtest_without_overlap_returns_none():
+    spy = daily_bars(60, 0)
+    vix = daily_bars(60, 0)
+    vix['time'] = vix['time'] + 365 * DAY
+    assert run_backtest(spy, vix) is None
+
+
+def test_run_backtest_too_short_returns_none():
+    assert run_backtest(daily_bars(LEVEL_WINDOW, 0), daily_bars(LEVEL_WINDOW, 0)) is None
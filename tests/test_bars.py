@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+import utils.bars
+from utils.bars import BarCache, BarRing, period_seconds
+
+DAY = 86400
+
+
+def make_bars(times, offset=0.0):
+    times = np.asarray(times, dtype=np.int64)
+    close = times / DAY + offset
+    return {'time': times, 'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+            'volume': np.ones(len(times))}
+
+
+def test_extend_appends_and_replaces_last_bar():
+    ring = BarRing(8, slack=4)
+    ring.extend(make_bars(np.arange(5) * DAY))
+    ring.extend(make_bars(np.arange(4, 7) * DAY, offset=0.5))
+
+    view = ring.view()
+    assert list(view['time']) == list(np.arange(7) * DAY)
+    # The overlapping bar is replaced by the newer data
+    assert view['close'][4] == 4.5
+    assert view['close'][3] == 3.0
+
+
+def test_extend_keeps_newest_capacity_bars_across_compaction():
+    ring = BarRing(8, slack=4)
+    for start in range(0, 40, 3):
+        ring.extend(make_bars(np.arange(start, start + 3) * DAY))
+        assert len(ring) <= ring.capacity
+        assert list(ring.view()['time']) == list(np.arange(max(0, start + 3 - 8), start + 3) * DAY)
+
+
+def test_extend_larger_than_capacity():
+    ring = BarRing(8, slack=4)
+    ring.extend(make_bars(np.arange(3) * DAY))
+    ring.extend(make_bars(np.arange(3, 23) * DAY))
+    assert list(ring.view()['time']) == list(np.arange(15, 23) * DAY)
+
+
+def test_views_survive_compaction_and_overflow():
+    ring = BarRing(8, slack=4)
+    ring.extend(make_bars(np.arange(8) * DAY))
+    view = ring.view()
+    held = {name: column.copy() for name, column in view.items()}
+
+    ring.extend(make_bars(np.arange(8, 13) * DAY))   # runs out of slack and compacts
+    ring.extend(make_bars(np.arange(13, 40) * DAY))  # more than capacity at once
+    for name in held:
+        assert np.array_equal(view[name], held[name])
+    assert list(ring.view()['time']) == list(np.arange(32, 40) * DAY)
+
+
+def test_view_since():
+    ring = BarRing(16)
+    ring.extend(make_bars(np.arange(10) * DAY))
+    assert list(ring.view(since=6 * DAY)['time']) == list(np.arange(6, 10) * DAY)
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """Fake fetch_bars over daily history ending today; records the periods requested"""
+    today = int(time.time()) // DAY * DAY
+    calls = []
+
+    def fetch_bars(symbol, interval="1d", period="3mo"):
+        calls.append(period)
+        span = min(period_seconds(period), 5 * 366 * DAY)
+        return make_bars(np.arange(today - span + DAY, today + DAY, DAY))
+
+    monkeypatch.setattr(utils.bars, "fetch_bars", fetch_bars)
+    return calls
+
+
+def test_get_longer_period_after_shorter_one_refetches_history(history):
+    cache = BarCache()
+    short = asyncio.run(cache.get("SPY", "1d", "1mo"))
+    assert len(short['time']) == 31
+
+    longer = asyncio.run(cache.get("SPY", "1d", "6mo"))
+    assert len(longer['time']) == 186
+
+    # Shorter windows are then served from the same ring without fetching
+    assert len(asyncio.run(cache.get("SPY", "1d", "3mo"))['time']) == 94
+    assert history == ["1mo", "6mo"]
+
+
+def test_get_tops_up_a_stale_ring_with_a_small_period(history):
+    cache = BarCache()
+    first = len(asyncio.run(cache.get("SPY", "1d", "3mo"))['time'])
+    fetched_at, covered = cache._fetched[("SPY", "1d")]
+    cache._fetched[("SPY", "1d")] = (fetched_at - 3600, covered)
+
+    bars = asyncio.run(cache.get("SPY", "1d", "3mo"))
+    assert history == ["3mo", "1d"]
+    assert len(bars['time']) == first
+
+
+def test_get_returns_stale_bars_when_fetch_fails(history, monkeypatch):
+    cache = BarCache()
+    asyncio.run(cache.get("SPY", "1d", "1mo"))
+    monkeypatch.setattr(utils.bars, "fetch_bars", lambda *args: None)
+    cache._fetched[("SPY", "1d")] = (0.0, cache._fetched[("SPY", "1d")][1])
+
+    assert len(asyncio.run(cache.get("SPY", "1d", "1mo"))['time']) == 31
+    assert asyncio.run(cache.get("QQQ", "1d", "1mo")) is None
@@ -0,0 +1,95 @@
+import asyncio
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cogs.charts import ChartsCog, render_candlestick, render_heatmap
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def daily_bars(n=60, start=100.0, end=110.0):
+    close = np.linspace(start, end, n)
+    return {
+        'time': np.arange(n, dtype=np.int64) * 86400 + 1_700_000_000,
+        'open': close - 0.5,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': np.full(n, 1000.0),
+    }
+
+
+def make_cog():
+    cog = ChartsCog(types.SimpleNamespace())
+    # Threads instead of the forkserver pool: the cache logic is what is under test here
+    cog.pool.shutdown()
+    cog.pool = ThreadPoolExecutor(max_workers=2)
+    return cog
+
+
+def test_render_candlestick_returns_png():
+    png = render_candlestick("NQ 1d", daily_bars(), (("S1", 99.0), ("R1", 111.0)), "BULLISH")
+    assert png.startswith(PNG_MAGIC)
+
+
+def test_render_heatmap_returns_png_and_stats():
+    bars = {"A": daily_bars(), "B": daily_bars(start=50, end=40)}
+    png, stats = render_heatmap("Heatmap", bars, 86400)
+    assert png.startswith(PNG_MAGIC)
+    assert list(stats['symbols']) == ["A", "B"]
+
+
+def test_render_heatmap_without_enough_symbols_fails():
+    assert render_heatmap("Heatmap", {"A": daily_bars()}, 86400) == (None, None)
+
+
+def test_render_caches_successes_and_shares_concurrent_requests():
+    cog = make_cog()
+    calls = []
+
+    def draw(value):
+        calls.append(value)
+        return b"png"
+
+    async def main():
+        first, second = await asyncio.gather(cog.render(("k",), draw, 1), cog.render(("k",), draw, 1))
+        third = await cog.render(("k",), draw, 1)
+        return first, second, third
+
+    assert asyncio.run(main()) == (b"png", b"png", b"png")
+    assert calls == [1]
+    assert cog.pending == {}
+    cog.cog_unload()
+
+
+def test_render_does_not_cache_failures():
+    cog = make_cog()
+    calls = []
+
+    def draw():
+        calls.append(1)
+        return None, None
+
+    async def main():
+        await cog.render(("heatmap",), draw)
+        return await cog.render(("heatmap",), draw)
+
+    assert asyncio.run(main()) == (None, None)
+    assert len(calls) == 2
+    assert ("heatmap",) not in cog.cache
+    cog.cog_unload()
+
+
+def test_render_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr("cogs.charts.CHART_CACHE_SIZE", 2)
+    cog = make_cog()
+
+    async def main():
+        for key in ("a", "b", "a", "c"):
+            await cog.render((key,), lambda k=key: k.encode())
+
+    asyncio.run(main())
+    assert list(cog.cache) == [("a",), ("c",)]
+    cog.cog_unload()
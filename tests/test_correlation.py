@@ -0,0 +1,76 @@
+import numpy as np
+
+from utils.backtest import calendar_days
+from utils.correlation import MIN_BARS, align_closes, bucket_times, correlation_matrix, heatmap_stats
+
+HOUR = 3600
+T0 = 1_770_000_000 // HOUR * HOUR
+
+
+def hourly(indices, scale=1.0):
+    indices = np.asarray(indices)
+    return {'time': T0 + indices * HOUR, 'close': 100 + indices * scale}
+
+
+def test_align_closes_drops_sparse_symbols_and_fills_gaps():
+    n = 50
+    bars = {
+        "A": hourly(np.arange(n)),
+        "B": hourly(np.delete(np.arange(n), [10, 11]), scale=2.0),  # 96% coverage, gap filled
+        "C": hourly(np.arange(0, n, 2)),                            # 50% coverage, dropped
+        "D": None,
+        "E": hourly(np.arange(MIN_BARS - 1)),                       # too few bars, dropped
+        "F": hourly(np.arange(5, n)),                               # 90% coverage, late start
+    }
+    symbols, times, closes, dropped = align_closes(bars, HOUR)
+
+    assert symbols == ["A", "B", "F"]
+    assert sorted(dropped) == ["C", "D", "E"]
+    # The timeline starts once every kept symbol has printed
+    assert list(times) == list((T0 + np.arange(5, n) * HOUR) // HOUR)
+    assert closes.shape == (n - 5, 3)
+    # B's missing bars carry its previous close forward
+    assert closes[10 - 5, 1] == closes[11 - 5, 1] == 100 + 9 * 2.0
+    assert closes[12 - 5, 1] == 100 + 12 * 2.0
+
+
+def test_align_closes_lines_up_daily_bars_from_different_exchanges():
+    days = np.arange(30)
+    spy = {'time': T0 // 86400 * 86400 + days * 86400 + 4 * HOUR, 'close': 100.0 + days}
+    cl = {'time': T0 // 86400 * 86400 + days * 86400 + 5 * HOUR, 'close': 50.0 + days}
+    symbols, times, closes, dropped = align_closes({"SPY": spy, "CL": cl}, 86400)
+    assert symbols == ["SPY", "CL"] and dropped == []
+    assert len(times) == 30
+    assert not np.isnan(closes).any()
+
+
+def test_daily_buckets_match_the_backtest_calendar():
+    # Midnight Tokyo (15:00 UTC the day before) and midnight New York are the same trading day
+    tokyo = np.array([1_770_000_000 // 86400 * 86400 + 86400 - 9 * HOUR])
+    new_york = tokyo + 13 * HOUR
+    assert bucket_times(tokyo, 86400) == bucket_times(new_york, 86400) == calendar_days(new_york)
+    assert list(bucket_times(np.array([0, 3599, 3600]), HOUR)) == [0, 0, 1]
+
+
+def test_align_closes_with_nothing_usable():
+    symbols, times, closes, dropped = align_closes({"A": None, "B": hourly(np.arange(3))}, HOUR)
+    assert symbols == [] and len(times) == 0 and closes.shape == (0, 0)
+    assert dropped == ["A", "B"]
+
+
+def test_correlation_matrix_signs():
+    rng = np.random.default_rng(0)
+    base = np.exp(np.cumsum(rng.normal(0, 0.01, 100)))
+    closes = np.column_stack([base, base * 2, 1 / base, np.full(100, 5.0)])
+    corr = correlation_matrix(closes)
+    assert np.allclose(corr[0, 1], 1.0)
+    assert np.allclose(corr[0, 2], -1.0)
+    # A flat series has no defined correlation; it reads as 0 against everything else
+    assert corr[0, 3] == 0.0 and corr[3, 3] == 1.0
+
+
+def test_heatmap_stats_needs_two_symbols():
+    assert heatmap_stats({"A": hourly(np.arange(40))}, HOUR) is None
+    stats = heatmap_stats({"A": hourly(np.arange(40)), "B": hourly(np.arange(40), scale=2.0)}, HOUR)
+    assert stats['symbols'] == ["A", "B"] and stats['bars'] == 40
+    assert abs(stats['strength']).sum() > 0
@@ -0,0 +1,111 @@
+import asyncio
+import types
+from datetime import date, datetime
+
+import pytz
+
+from cogs.digest import DigestCog
+from utils.digest import DayDigest, trade_date_for
+
+CT = pytz.timezone('America/Chicago')
+MORNING = CT.localize(datetime(2026, 2, 12, 8, 30))
+EVENING = CT.localize(datetime(2026, 2, 12, 17, 0))
+
+
+def make_cog(guilds=(1, 2), now=None):
+    """Cog for `now`'s trade date (trade listeners use the real clock, so default to it)"""
+    now = now or datetime.now(CT)
+    calendar = types.SimpleNamespace(events=[{'date': "2026-02-13", 'time': "07:30", 'event': "CPI"}])
+    bot = types.SimpleNamespace(guild_config=types.SimpleNamespace(guilds={g: {} for g in guilds}),
+                                get_cog=lambda name: calendar if name == "Calendar" else None)
+    cog = DigestCog.__new__(DigestCog)
+    cog.bot, cog.ct = bot, CT
+    cog.trade_date, cog.tomorrow, cog.digests = trade_date_for(now), [], {}
+    cog.refresh_tomorrow()
+    return cog
+
+
+def test_trade_date_rolls_at_five_pm():
+    assert trade_date_for(CT.localize(datetime(2026, 2, 12, 16, 59))) == date(2026, 2, 12)
+    assert trade_date_for(EVENING) == date(2026, 2, 13)
+
+
+def test_guilds_keep_separate_trades():
+    cog = make_cog()
+
+    async def events():
+        await cog.on_trade_alert("NQ", "BUY", 21500.0, 1)
+        await cog.on_trade_close("NQ", "WIN", 20.0, 1)
+        await cog.on_trade_alert("ES", "SELL", 6000.0, None)  # webhook alert, every server
+
+    asyncio.run(events())
+    one, two = cog.current(1), cog.current(2)
+    assert (one.alerts, one.wins, one.points) == (2, 1, 20.0)
+    assert (two.alerts, two.wins, list(two.recent)) == (1, 0, ["ES SHORT @ 6,000.00"])
+
+
+def test_first_bias_of_the_session_is_kept():
+    cog = make_cog(now=MORNING)
+
+    async def events():
+        await cog.on_bias_posted("BULLISH", {'spy_price': 600.0}, MORNING, None)
+        await cog.on_bias_posted("BEARISH", {'spy_price': 601.0}, MORNING.replace(hour=11), 1)
+
+    asyncio.run(events())
+    assert cog.current(1, MORNING).bias['bias'] == "BULLISH"
+    assert cog.current(1, MORNING).bias['price'] == 600.0
+
+
+def test_rollover_starts_fresh_digests_and_refreshes_tomorrow():
+    cog = make_cog(now=MORNING)
+    cog.current(1, MORNING).record_alert("NQ", "BUY", 21500.0)
+    assert cog.current(1, MORNING).tomorrow == ["2026-02-13", cog.bot.get_cog("Calendar").events]
+
+    rolled = cog.current(1, EVENING)
+    assert rolled.trade_date == date(2026, 2, 13)
+    assert rolled.alerts == 0
+    assert cog.digests.keys() == {1}
+    # Friday's next session is Monday
+    assert rolled.tomorrow[0] == "2026-02-16"
+
+
+def test_snapshot_restores_only_the_same_trade_date():
+    cog = make_cog(now=MORNING)
+    cog.current(2, MORNING).record_alert("NQ", "BUY", 21500.0)
+    state = cog.snapshot_state()
+
+    same_day = make_cog(now=MORNING)
+    same_day.restore_state(state)
+    assert same_day.digests[2].alerts == 1
+
+    next_day = make_cog(now=EVENING)
+    next_day.restore_state(state)
+    assert next_day.digests == {}
+
+
+def test_to_state_is_detached_from_the_live_digest():
+    digest = DayDigest(date(2026, 2, 12))
+    digest.observe("NQ", 100.0, 99.0)
+    digest.record_alert("NQ", "BUY", 100.0)
+    digest.record_bias("BULLISH", 600.0, MORNING)
+    state = digest.to_state()
+
+    digest.observe("NQ", 105.0)
+    digest.record_close("NQ", "WIN", 5.0)
+    digest.bias['bias'] = "changed"
+    assert state['moves']["NQ"]['high'] == 100.0
+    assert state['by_symbol']["NQ"] == [1, 0, 0.0]
+    assert state['recent'] == ["NQ LONG @ 100.00"]
+    assert state['bias']['bias'] == "BULLISH"
+
+    restored = DayDigest.from_state(state)
+    assert restored.bias_outcome() is None  # no SPY samples yet
+    assert restored.moves["NQ"]['last'] == 100.0
+
+
+def test_bias_outcome():
+    digest = DayDigest(date(2026, 2, 12))
+    digest.record_bias("BULLISH", 600.0, MORNING)
+    digest.observe("SPY", 600.0)
+    digest.observe("SPY", 604.0)
+    assert digest.bias_outcome() == ("Correct", 4.0)
@@ -0,0 +1,97 @@
+import asyncio
+
+import discord
+from aiohttp import web
+
+import utils.fanout
+from utils.fanout import WebhookFanout, valid_webhook_url
+
+
+async def with_stub(respond, test):
+    """Run `test(base_url, received)` against a stub webhook host; respond(dest, attempt) -> Response"""
+    received = {}
+    attempts = {}
+
+    async def handler(request):
+        dest = request.match_info['id']
+        attempts[dest] = attempts.get(dest, 0) + 1
+        response = await respond(dest, attempts[dest])
+        if response.status < 300:
+            payload = await request.json()
+            received.setdefault(dest, []).extend(e['title'] for e in payload['embeds'])
+        return response
+
+    app = web.Application()
+    app.router.add_post("/hook/{id}/{token}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    try:
+        return await test(f"http://127.0.0.1:{runner.addresses[0][1]}", received)
+    finally:
+        await runner.cleanup()
+
+
+def run_fanout(respond, destinations, titles, retries=3):
+    async def test(base, received):
+        fanout = WebhookFanout([f"{base}/hook/{i}/token" for i in range(destinations)], retries=retries)
+        fanout.start()
+        try:
+            for title in titles:
+                fanout.publish(discord.Embed(title=title))
+            await asyncio.wait_for(fanout.join(), 10)
+            return received, fanout.stats()
+        finally:
+            await fanout.stop()
+
+    return asyncio.run(with_stub(respond, test))
+
+
+def test_each_destination_gets_every_post_in_order():
+    async def respond(dest, attempt):
+        # Uneven latency per destination must not reorder anything
+        await asyncio.sleep(0.01 * (int(dest) % 3))
+        return web.Response(status=204)
+
+    titles = [f"alert {i}" for i in range(12)]
+    received, stats = run_fanout(respond, 5, titles)
+    assert received == {str(i): titles for i in range(5)}
+    assert all(s['sent'] == 12 and s['failed'] == 0 for s in stats)
+
+
+def test_server_errors_and_rate_limits_are_retried(monkeypatch):
+    monkeypatch.setattr(utils.fanout, "RETRY_BACKOFF", 0.01)
+
+    async def respond(dest, attempt):
+        if dest == "0" and attempt == 1:
+            return web.json_response({"retry_after": 0.01}, status=429)
+        if dest == "1" and attempt <= 2:
+            return web.Response(status=502)
+        return web.Response(status=204)
+
+    received, stats = run_fanout(respond, 2, ["a", "b"])
+    assert received == {"0": ["a", "b"], "1": ["a", "b"]}
+    assert [s['failed'] for s in stats] == [0, 0]
+
+
+def test_rejected_and_exhausted_posts_are_counted_and_skipped(monkeypatch):
+    monkeypatch.setattr(utils.fanout, "RETRY_BACKOFF", 0.01)
+
+    async def respond(dest, attempt):
+        if dest == "0":
+            return web.Response(status=404)   # not retried
+        if dest == "1" and attempt <= 3:
+            return web.Response(status=500)   # first post gives up after retries
+        return web.Response(status=204)
+
+    received, stats = run_fanout(respond, 2, ["a", "b"], retries=2)
+    assert received == {"1": ["b"]}
+    assert [(s['sent'], s['failed']) for s in stats] == [(0, 2), (1, 1)]
+
+
+def test_malformed_urls_are_skipped():
+    assert valid_webhook_url("https://discord.com/api/webhooks/1/abc")
+    assert not valid_webhook_url("discord.com/api/webhooks/1/abc")
+    assert not valid_webhook_url("https://discord.com/")
+    fanout = WebhookFanout(["https://discord.com/api/webhooks/1/abc", "not a url"])
+    assert [d.name for d in fanout.destinations] == ["webhook-1"]
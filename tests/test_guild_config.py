@@ -0,0 +1,105 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+from utils.guild_config import GuildConfig
+
+
+class FakeChannel:
+    def __init__(self, channel_id, guild_id, fail=False):
+        self.id = channel_id
+        self.name = f"ch{channel_id}"
+        self.guild = types.SimpleNamespace(id=guild_id, name=f"g{guild_id}")
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, **kwargs):
+        if self.fail:
+            raise RuntimeError("missing permissions")
+        self.sent.append(kwargs)
+
+
+def make_config(tmp_path, channels):
+    by_id = {c.id: c for c in channels}
+    bot = types.SimpleNamespace(get_channel=by_id.get)
+    return GuildConfig(bot, path=str(tmp_path / "guilds.json")), by_id
+
+
+def test_set_unset_and_lookups(tmp_path):
+    config, channels = make_config(tmp_path, [FakeChannel(10, 1), FakeChannel(20, 2)])
+    config.set(1, 'daily_bias', 10)
+    config.set(2, 'daily_bias', 20)
+    assert config.channel(1, 'daily_bias') is channels[10]
+    assert config.channel(None, 'daily_bias') is None
+    assert {c.id for c in config.channels('daily_bias')} == {10, 20}
+
+    assert config.unset(2, 'daily_bias')
+    assert not config.unset(2, 'daily_bias')
+    assert [c.id for c in config.channels('daily_bias')] == [10]
+    assert 2 not in config.guilds
+
+    with pytest.raises(ValueError):
+        config.set(1, 'not_a_role', 10)
+
+
+def test_invalidate_channel_drops_cached_lookups(tmp_path):
+    config, channels = make_config(tmp_path, [FakeChannel(10, 1)])
+    config.set(1, 'trade_alerts', 10)
+    assert config.channels('trade_alerts') == (channels[10],)
+
+    # Channel deleted: the bot no longer resolves it
+    del channels[10]
+    config.invalidate_channel(10)
+    assert config.channel(1, 'trade_alerts') is None
+    assert config.channels('trade_alerts') == ()
+
+
+def test_broadcast_counts_deliveries(tmp_path):
+    config, channels = make_config(tmp_path, [FakeChannel(10, 1), FakeChannel(20, 2, fail=True)])
+    config.set(1, 'daily_bias', 10)
+    config.set(2, 'daily_bias', 20)
+    assert asyncio.run(config.broadcast('daily_bias', content="hi")) == 1
+    assert channels[10].sent == [{'content': "hi"}]
+
+
+def test_persist_round_trip_and_dirty_flag(tmp_path):
+    config, _ = make_config(tmp_path, [])
+    config.set(1, 'daily_bias', 10)
+    config.allow_channel(1, 99)
+
+    async def persist_while_editing():
+        task = asyncio.create_task(config.persist())
+        await asyncio.sleep(0)
+        # Lands while the write runs in a thread: stays dirty for the next save
+        config.set(2, 'trade_alerts', 20)
+        await task
+
+    asyncio.run(persist_while_editing())
+    assert config.dirty
+
+    with open(config.path) as f:
+        assert json.load(f) == {'guilds': {'1': {'daily_bias': 10}}, 'command_channels': {'1': [99]}}
+
+    config.save()
+    loaded = GuildConfig(config.bot, path=config.path).load()
+    assert loaded.guilds == {1: {'daily_bias': 10}, 2: {'trade_alerts': 20}}
+    assert loaded.allowed_channels(1) == {99}
+    assert loaded.allowed_channels(2) is None
+
+
+def test_load_missing_or_corrupt_file(tmp_path):
+    config, _ = make_config(tmp_path, [])
+    assert config.load().guilds == {}
+    with open(config.path, "w") as f:
+        f.write("{not json")
+    assert config.load().guilds == {}
+
+
+def test_allowlist(tmp_path):
+    config, _ = make_config(tmp_path, [])
+    config.allow_channel(1, 5)
+    assert config.disallow_channel(1, 5)
+    assert not config.disallow_channel(1, 5)
+    assert config.allowed_channels(1) is None
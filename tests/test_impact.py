@@ -0,0 +1,78 @@
+import numpy as np
+import pytz
+
+from utils.impact import event_epochs, event_type, impact_stats, measure_moves
+
+T0 = 1_770_000_000 // 60 * 60
+
+
+def flat_bars(count=200, price=100.0):
+    return {
+        'time': T0 + np.arange(count, dtype=np.int64) * 60,
+        'open': np.full(count, price),
+        'high': np.full(count, price),
+        'low': np.full(count, price),
+    }
+
+
+def test_measure_moves_max_excursion_per_horizon():
+    bars = flat_bars()
+    k = 50
+    bars['low'][k + 2] = 97.0    # inside every horizon
+    bars['high'][k + 10] = 110.0  # only inside 15 and 60 minutes
+
+    # A release mid-bar is measured from that bar's open
+    moves = measure_moves(bars, np.array([T0 + k * 60 + 30]), 60)
+    assert moves.tolist() == [[3.0, 10.0, 10.0]]
+
+
+def test_measure_moves_without_bars_is_nan():
+    bars = flat_bars()
+    epochs = np.array([
+        T0 - 600,             # before stored history
+        T0 + 170 * 60,        # 60-minute window runs past the last bar
+        T0 + 500 * 60,        # long after the last bar (market closed)
+    ])
+    moves = measure_moves(bars, epochs, 60)
+    assert np.isnan(moves[0]).all()
+    assert not np.isnan(moves[1, :2]).any() and np.isnan(moves[1, 2])
+    assert np.isnan(moves[2]).all()
+
+
+def test_measure_moves_with_coarser_bars():
+    bars = flat_bars()
+    bars['time'] = T0 + np.arange(200, dtype=np.int64) * 300
+    bars['high'][11] = 104.0  # second 5m bar after the release
+    moves = measure_moves(bars, np.array([T0 + 10 * 300]), 300)
+    assert moves.tolist() == [[0.0, 4.0, 4.0]]
+
+
+def test_impact_stats_groups_by_type_and_skips_incomplete():
+    bars = flat_bars()
+    bars['high'][20] = 102.0
+    bars['high'][80] = 106.0
+    epochs = {
+        "CPI": np.array([T0 + 20 * 60, T0 + 80 * 60]),
+        "NFP": np.array([T0 - 3600]),
+    }
+    stats = impact_stats(bars, epochs, 60)
+    assert list(stats) == ["CPI"]
+    assert stats["CPI"]['count'] == 2
+    assert stats["CPI"]['avg'] == {5: 4.0, 15: 4.0, 60: 4.0}
+    assert stats["CPI"]['worst'] == {5: 6.0, 15: 6.0, 60: 6.0}
+    assert impact_stats(None, epochs, 60) == {}
+
+
+def test_event_epochs_groups_and_skips_unparseable():
+    ct = pytz.timezone('America/Chicago')
+    events = [
+        {'event': "CPI m/m", 'date': "2026-02-11", 'time': "07:30"},
+        {'event': "Consumer Price Index (YoY)", 'date': "2026-02-11", 'time': "07:30"},
+        {'event': "Nonfarm Payrolls", 'date': "2026-02-06", 'time': "07:30"},
+        {'event': "Fed Chair Speaks", 'date': "2026-02-10", 'time': "TBD"},
+    ]
+    epochs = event_epochs(events, ct)
+    assert set(epochs) == {"CPI", "NFP"}
+    assert len(epochs["CPI"]) == 1
+    assert event_type("FOMC Statement") == "FOMC"
+    assert event_type("  Retail Sales ") == "retail sales"
@@ -0,0 +1,117 @@
+import asyncio
+from collections import OrderedDict
+
+import aiohttp
+
+from utils.ingest import IngestServer, parse_alert
+
+TOKEN = "secret"
+
+
+def alert_body(**overrides):
+    body = {"symbol": "NQ", "side": "BUY", "entry": 21500, "stop": 21480, "target": 21560, "passphrase": TOKEN}
+    body.update(overrides)
+    return body
+
+
+async def with_server(test, handler=None, **kwargs):
+    batches = []
+
+    async def record(batch):
+        batches.append(batch)
+
+    server = IngestServer(handler or record, TOKEN, host="127.0.0.1", port=0, **kwargs)
+    await server.start()
+    url = f"http://127.0.0.1:{server.runner.addresses[0][1]}/webhook"
+    try:
+        async with aiohttp.ClientSession() as session:
+            async def post(body, **headers):
+                async with session.post(url, json=body, headers=headers) as resp:
+                    return resp.status, await resp.json()
+            await test(post, server)
+    finally:
+        await server.stop()
+    return server, batches
+
+
+def test_validation_and_auth():
+    async def test(post, server):
+        assert (await post(alert_body(passphrase="wrong")))[0] == 401
+        assert (await post(alert_body(side="HOLD")))[0] == 422
+        assert (await post(alert_body(entry="nan")))[0] == 422
+        assert (await post(alert_body(passphrase=None), **{"X-Ingest-Token": TOKEN}))[0] == 202
+
+    server, batches = asyncio.run(with_server(test, batch_window=0.01))
+    assert server.counts["unauthorized"] == 1 and server.counts["rejected"] == 2
+    assert sum(len(b) for b in batches) == 1
+
+
+def test_ids_dedupe_for_the_long_window():
+    async def test(post, server):
+        assert (await post(alert_body(id="a1")))[0] == 202
+        assert await post(alert_body(id="a1")) == (200, {"status": "duplicate", "id": "a1"})
+        assert (await post(alert_body(entry=21501), **{"Idempotency-Key": "a1"}))[1]["status"] == "duplicate"
+        assert (await post(alert_body(id="a2")))[0] == 202
+
+    server, batches = asyncio.run(with_server(test, batch_window=0.01))
+    assert server.counts["accepted"] == 2 and server.counts["duplicate"] == 2
+
+
+def test_identical_payloads_without_id_only_dedupe_briefly():
+    async def test(post, server):
+        assert (await post(alert_body()))[0] == 202
+        assert (await post(alert_body()))[1]["status"] == "duplicate"
+        await asyncio.sleep(0.15)
+        # A real repeat of the same alert later on goes through
+        assert (await post(alert_body()))[0] == 202
+
+    server, batches = asyncio.run(with_server(test, batch_window=0.01, content_dedupe_seconds=0.1))
+    assert server.counts["accepted"] == 2
+
+
+def test_full_queue_returns_503_and_can_be_retried():
+    release = asyncio.Event()
+
+    async def blocked(batch):
+        await release.wait()
+
+    async def test(post, server):
+        assert (await post(alert_body(id="0")))[0] == 202
+        await asyncio.sleep(0.05)  # consumer takes it and blocks in the handler
+        assert (await post(alert_body(id="1")))[0] == 202
+        assert (await post(alert_body(id="2")))[0] == 202
+        status, _ = await post(alert_body(id="3"))
+        assert status == 503
+        release.set()
+        await asyncio.sleep(0.05)
+        # The rejected id wasn't remembered, so the sender's retry is accepted
+        assert (await post(alert_body(id="3")))[0] == 202
+
+    server, _ = asyncio.run(with_server(test, handler=blocked, queue_size=2, batch_window=0))
+    assert server.counts["queue_full"] == 1
+    assert server.counts["accepted"] == 4
+
+
+def test_batches_hold_at_most_batch_size():
+    async def test(post, server):
+        await asyncio.gather(*(post(alert_body(id=str(i))) for i in range(25)))
+        await asyncio.sleep(0.3)
+
+    server, batches = asyncio.run(with_server(test, batch_size=10, batch_window=0.1))
+    assert sorted(a["entry"] for b in batches for a in b) == [21500.0] * 25
+    assert max(len(b) for b in batches) == 10
+
+
+def test_remember_keeps_oldest_first():
+    seen = OrderedDict()
+    IngestServer._remember(seen, "a", 60)
+    IngestServer._remember(seen, "b", 60)
+    IngestServer._remember(seen, "a", 60)
+    assert list(seen) == ["b", "a"]
+
+
+def test_parse_alert_aliases():
+    alert, error = parse_alert({"ticker": "es", "action": "short", "price": "6000", "stop": 6010, "target": 5980})
+    assert error is None
+    assert (alert["symbol"], alert["side"], alert["entry"]) == ("ES", "SELL", 6000.0)
+    assert parse_alert([1, 2])[1] == "body must be a JSON object"
@@ -0,0 +1,74 @@
+import asyncio
+import importlib
+import types
+
+from utils.guild_config import GuildConfig
+from utils.intake import CommandIntake
+
+
+def test_parse_caches_remembered_commands_only():
+    intake = CommandIntake("!")
+    invoker, view = intake.parse("!price NQ")
+    assert invoker == "price"
+    assert intake.counts['cache_hits'] == 0
+    intake.remember("!price NQ", invoker, view)
+    assert view.read_rest().strip() == "NQ"
+
+    invoker, view = intake.parse("!price NQ")
+    assert (invoker, view.read_rest().strip()) == ("price", "NQ")
+    assert intake.counts['cache_hits'] == 1
+
+
+def test_parse_cache_is_bounded_lru():
+    intake = CommandIntake("!", cache_size=2)
+    for content in ("!a", "!b"):
+        intake.remember(content, *intake.parse(content))
+    intake.parse("!a")                        # touch: !b is now the oldest
+    intake.remember("!c", *intake.parse("!c"))
+    assert list(intake.cache) == ["!a", "!c"]
+
+
+def test_stats_drop_rate():
+    intake = CommandIntake("!")
+    intake.counts.update(seen=10, not_prefixed=6, dispatched=4)
+    stats = intake.stats()
+    assert stats['dropped'] == 6 and stats['dropped_pct'] == 60.0
+
+
+def message(content, author_bot=False, guild=None):
+    return types.SimpleNamespace(content=content, author=types.SimpleNamespace(bot=author_bot),
+                                 guild=guild, channel=types.SimpleNamespace(id=5, parent_id=None))
+
+
+def test_on_message_counts(tmp_path, monkeypatch):
+    monkeypatch.setenv("DISCORD_BOT_TOKEN", "test")  # bot.py refuses to import without one
+    bot_module = importlib.import_module("bot")
+    client = bot_module.JustTradesBot()
+    client.guild_config = GuildConfig(client, path=str(tmp_path / "guilds.json"))
+    invoked = []
+
+    async def invoke(ctx):
+        invoked.append(ctx.command.name)
+
+    monkeypatch.setattr(client, "invoke", invoke)
+    monkeypatch.setattr(bot_module.commands, "Context", lambda **kwargs: types.SimpleNamespace(**kwargs))
+
+    @client.command(name="ping")
+    async def ping(ctx):
+        pass
+
+    client.guild_config.allow_channel(1, 99)
+    guild = types.SimpleNamespace(id=1)
+
+    async def feed():
+        await client.on_message(message("!ping", author_bot=True))   # bots are not counted at all
+        await client.on_message(message("hello"))
+        await client.on_message(message("!nope"))
+        await client.on_message(message("!ping", guild=guild))         # channel 5 not on the allowlist
+        await client.on_message(message("!ping"))                      # DM
+
+    asyncio.run(feed())
+    counts = client.intake.counts
+    assert (counts['seen'], counts['not_prefixed'], counts['unknown_command'],
+            counts['channel_blocked'], counts['dispatched']) == (4, 1, 1, 1, 1)
+    assert invoked == ["ping"]
@@ -0,0 +1,90 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from utils.levels import RANGE_DAYS, compute_levels, session_cutoffs
+
+CT = pytz.timezone('America/Chicago')
+ET = pytz.timezone('America/New_York')
+NOW = CT.localize(datetime(2026, 2, 12, 10, 0))
+
+
+def daily_bars(days):
+    """`days` completed daily bars up to yesterday plus today's partial bar, stamped at NY midnight"""
+    stamps = [ET.localize(datetime(2026, 2, 12) - timedelta(days=days - i)) for i in range(days + 1)]
+    base = np.arange(days + 1, dtype=np.float64) * 10 + 100
+    return {
+        'time': np.array([int(s.timestamp()) for s in stamps]),
+        'high': base + 5,
+        'low': base - 5,
+        'close': base,
+    }
+
+
+def intraday_bars(start, end, minutes=30):
+    times = np.arange(int(start.timestamp()), int(end.timestamp()), minutes * 60)
+    prices = np.arange(len(times), dtype=np.float64) + 1000
+    return {'time': times, 'high': prices + 1, 'low': prices - 1}
+
+
+def test_session_cutoffs():
+    day_cutoff, overnight_start, overnight_end = session_cutoffs(NOW)
+    assert day_cutoff == int(ET.localize(datetime(2026, 2, 12)).timestamp())
+    assert overnight_start == int(CT.localize(datetime(2026, 2, 11, 17)).timestamp())
+    assert overnight_end == int(CT.localize(datetime(2026, 2, 12, 8, 30)).timestamp())
+
+
+def test_session_cutoffs_roll_at_globex_open():
+    before = CT.localize(datetime(2026, 2, 12, 16, 59))
+    after = CT.localize(datetime(2026, 2, 12, 17, 0))
+    assert session_cutoffs(before)[0] == int(ET.localize(datetime(2026, 2, 12)).timestamp())
+
+    day_cutoff, overnight_start, overnight_end = session_cutoffs(after)
+    # Today's finished session is now the prior day and the new overnight starts now
+    assert day_cutoff == int(ET.localize(datetime(2026, 2, 13)).timestamp())
+    assert overnight_start == int(after.timestamp())
+    assert overnight_end == int(after.timestamp())
+
+
+def test_prior_day_after_the_roll_is_today():
+    daily = daily_bars(30)
+    evening = CT.localize(datetime(2026, 2, 12, 18, 0))
+    levels = compute_levels(["NQ"], [daily], [None], evening)["NQ"]
+    assert levels['pdc'] == daily['close'][-1]
+    assert compute_levels(["NQ"], [daily], [None], NOW)["NQ"]['pdc'] == daily['close'][-2]
+
+
+def test_compute_levels_uses_completed_days_and_overnight_session():
+    daily = daily_bars(30)
+    # Bars from before the Globex open through the cash session; only 5:00 PM - 8:30 AM counts
+    intraday = intraday_bars(CT.localize(datetime(2026, 2, 11, 15)), NOW)
+    levels = compute_levels(["NQ", "ES"], [daily, None], [intraday, None], NOW)
+
+    nq = levels["NQ"]
+    # Yesterday is the last completed bar; today's partial bar is ignored
+    pdh, pdl, pdc = daily['high'][-2], daily['low'][-2], daily['close'][-2]
+    pivot = (pdh + pdl + pdc) / 3
+    assert (nq['pdh'], nq['pdl'], nq['pdc']) == (pdh, pdl, pdc)
+    assert nq['pivot'] == pivot
+    assert nq['r1'] == 2 * pivot - pdl
+    assert nq['s1'] == 2 * pivot - pdh
+    assert nq['r2'] == pivot + (pdh - pdl)
+    assert nq['s2'] == pivot - (pdh - pdl)
+    assert nq['high_20'] == daily['high'][-2]
+    assert nq['low_20'] == daily['low'][-1 - RANGE_DAYS]
+
+    mask = ((intraday['time'] >= int(CT.localize(datetime(2026, 2, 11, 17)).timestamp()))
+            & (intraday['time'] < int(CT.localize(datetime(2026, 2, 12, 8, 30)).timestamp())))
+    assert nq['onh'] == intraday['high'][mask].max()
+    assert nq['onl'] == intraday['low'][mask].min()
+
+    assert all(math.isnan(value) for value in levels["ES"].values())
+
+
+def test_compute_levels_with_short_history():
+    levels = compute_levels(["CL"], [daily_bars(3)], [None], NOW)["CL"]
+    assert levels['low_20'] == 95.0
+    assert levels['high_20'] == 125.0
+    assert math.isnan(levels['onh']) and math.isnan(levels['onl'])
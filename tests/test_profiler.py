@@ -0,0 +1,69 @@
+import asyncio
+import time
+import tracemalloc
+from collections import Counter
+
+from utils.profiler import IDLE, format_cpu_report, profile_cpu, profile_memory
+
+
+def test_format_cpu_report_percentages():
+    result = {
+        'seconds': 1, 'interval': 0.005, 'samples': 10, 'idle': 6,
+        'self': Counter({"spin (bot.py:10)": 4}),
+        'cumulative': Counter({"spin (bot.py:8)": 4, "main (bot.py:1)": 2}),
+        'tasks': Counter({IDLE: 6, "digest-loop": 4}),
+    }
+    report = format_cpu_report(result)
+    assert "Event loop busy: 40.0% of samples" in report
+    assert "60.0%  " + IDLE in report
+    assert "40.0%  digest-loop" in report
+    # Hot lines are relative to busy samples, not all samples
+    assert "100.0%  spin (bot.py:10)" in report
+    assert "50.0%  main (bot.py:1)" in report
+
+
+def test_format_cpu_report_without_samples():
+    result = {'seconds': 0, 'interval': 0.005, 'samples': 0, 'idle': 0,
+              'self': Counter(), 'cumulative': Counter(), 'tasks': Counter()}
+    assert "Event loop busy: 0.0% of samples" in format_cpu_report(result)
+
+
+def busy_spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_profile_cpu_attributes_samples_to_the_busy_task():
+    async def spinner():
+        await asyncio.sleep(0.05)
+        busy_spin(0.2)
+
+    async def main():
+        task = asyncio.create_task(spinner(), name="spinner")
+        report = await profile_cpu(0.4, interval=0.002)
+        await task
+        return report
+
+    report = asyncio.run(main())
+    assert "spinner" in report
+    assert "busy_spin (test_profiler.py" in report
+
+
+def test_profile_memory_reports_growth_and_stops_tracing():
+    kept = []
+
+    async def allocate():
+        await asyncio.sleep(0.02)
+        kept.append([bytearray(1024) for _ in range(2000)])
+
+    async def main():
+        task = asyncio.create_task(allocate())
+        report = await profile_memory(0.1)
+        await task
+        return report
+
+    report = asyncio.run(main())
+    assert report.startswith("Memory profile: 0.1s window")
+    assert "test_profiler.py" in report
+    assert not tracemalloc.is_tracing()
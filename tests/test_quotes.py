@@ -0,0 +1,77 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from utils.quotes import QuoteClient, parse_quote
+
+
+def chart(price, prev=None):
+    return {'chart': {'result': [{'meta': {'regularMarketPrice': price, 'previousClose': prev}}]}}
+
+
+async def stub_response(symbol):
+    """Local stand-in for the v8 chart endpoint; the symbol picks the response"""
+    if symbol == "NQ=F":
+        return web.json_response(chart(21500.25, 21400.0))
+    if symbol == "ERR":
+        return web.json_response({'chart': {'error': 'boom'}}, status=500)
+    if symbol == "HTML":
+        return web.Response(text="<html>rate limited</html>", content_type="text/html")
+    if symbol == "EMPTY":
+        return web.json_response({'chart': {'result': []}})
+    if symbol == "SLOW":
+        await asyncio.sleep(0.5)
+    return web.json_response(chart(None))
+
+
+async def with_stub(test):
+    hits = []
+
+    async def handler(request):
+        hits.append(request.match_info['symbol'])
+        return await stub_response(request.match_info['symbol'])
+
+    app = web.Application()
+    app.router.add_get("/v8/finance/chart/{symbol}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = QuoteClient(session, f"http://127.0.0.1:{port}/", timeout=aiohttp.ClientTimeout(total=0.3))
+            return await test(client, hits)
+    finally:
+        await runner.cleanup()
+
+
+def test_quote_success_is_parsed_and_cached():
+    async def test(client, hits):
+        first = await client.quote("NQ=F")
+        second = await client.quote("NQ=F")
+        return first, second, hits
+
+    first, second, hits = asyncio.run(with_stub(test))
+    assert first == {'lastPrice': 21500.25, 'previousClose': 21400.0}
+    assert second == first
+    assert hits == ["NQ=F"]
+
+
+def test_failures_return_none_and_are_not_cached():
+    async def test(client, hits):
+        quotes = await client.quotes(["ERR", "HTML", "EMPTY", "NOPRICE", "SLOW"])
+        return quotes, client.cache
+
+    quotes, cache = asyncio.run(with_stub(test))
+    assert quotes == {"ERR": None, "HTML": None, "EMPTY": None, "NOPRICE": None, "SLOW": None}
+    assert cache == {}
+
+
+def test_parse_quote():
+    assert parse_quote(chart(10.0)) == {'lastPrice': 10.0, 'previousClose': 10.0}
+    assert parse_quote({'chart': {'result': [{'meta': {'regularMarketPrice': 5, 'chartPreviousClose': 4}}]}}) == \
+        {'lastPrice': 5.0, 'previousClose': 4.0}
+    assert parse_quote(None) is None
+    assert parse_quote({'chart': {'result': None}}) is None
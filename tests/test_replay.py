@@ -0,0 +1,84 @@
+import copy
+from datetime import date, timedelta
+
+import numpy as np
+import pytz
+
+from utils.replay import ReplayBars, SimClock, at_time, compare, resample, run_days, synthetic_day
+
+CT = pytz.timezone('America/Chicago')
+DAY = date(2026, 2, 12)
+
+
+def minute_bars(start, count):
+    times = start + np.arange(count, dtype=np.int64) * 60
+    close = np.arange(count, dtype=np.float64) + 100
+    return {'time': times, 'open': close - 0.5, 'high': close + 1, 'low': close - 1, 'close': close,
+            'volume': np.ones(count)}
+
+
+def test_at_time():
+    moment = at_time(DAY, "08:30")
+    assert (moment.date(), moment.hour, moment.minute) == (DAY, 8, 30)
+    assert moment.utcoffset() == timedelta(hours=-6)
+    assert at_time(DAY, "08:30:15").second == 15
+    assert at_time(DAY, "2026-02-11T17:00:00").day == 11
+
+
+def test_resample_to_five_minutes():
+    bars = minute_bars(1_770_000_000 // 300 * 300, 12)
+    five = resample(bars, 300)
+    assert list(five['time']) == list(bars['time'][[0, 5, 10]])
+    assert list(five['open']) == [99.5, 104.5, 109.5]
+    assert list(five['close']) == [104.0, 109.0, 111.0]
+    assert list(five['high']) == [105.0, 110.0, 112.0]
+    assert list(five['volume']) == [5.0, 5.0, 2.0]
+
+
+def test_replay_bars_never_show_the_future():
+    start = int(at_time(DAY, "08:30").timestamp())
+    clock = SimClock(start + 7 * 60 + 30)  # 08:37:30
+    recorded = {"NQ=F|1m": {name: column.tolist() for name, column in minute_bars(start, 60).items()}}
+    bars = ReplayBars(recorded, clock)
+
+    minutes = bars.peek("NQ=F", "1m", "1d")
+    # 08:36 closed at 08:37; the 08:37 bar is still forming
+    assert minutes['time'][-1] == start + 6 * 60
+
+    five = bars.peek("NQ=F", "5m", "1d")
+    # One closed 5m bar plus the forming one built from the closed 1m bars inside it
+    assert list(five['time']) == [start, start + 300]
+    assert five['close'][-1] == minutes['close'][-1]
+    assert five['high'][-1] == minutes['high'][-2:].max()
+
+
+def test_compare_flags_content_errors_and_latency():
+    results = {
+        'sends': [{'at': "2026-02-12T08:30:00", 'channel': "daily_bias", 'content': "BULLISH", 'embeds': [],
+                   'files': [], 'step': "Analysis.daily_bias_post"}],
+        'errors': [],
+        'timings': {"!market": {'p95': 10.0}},
+    }
+    assert compare(results, copy.deepcopy(results)) == []
+
+    changed = copy.deepcopy(results)
+    changed['sends'][0]['content'] = "BEARISH"
+    changed['errors'].append({'at': "2026-02-12T09:00:00", 'step': "!chart", 'error': "boom"})
+    changed['timings']["!market"]['p95'] = 40.0
+    problems = compare(changed, results)
+    assert [p.split(":")[0] for p in problems] == ["content", "error", "latency"]
+
+
+def test_synthetic_day_replays_cleanly_and_matches_itself(tmp_path):
+    path = synthetic_day(DAY, str(tmp_path / "days"))
+    first = list(run_days([path], str(tmp_path / "a"), workers=1))[0]
+    assert 'failed' not in first
+    assert first['errors'] == []
+    steps = {send['step'] for send in first['sends']}
+    assert "Digest.publish_digest" in steps and "!digest" in steps
+
+    second = list(run_days([path], str(tmp_path / "b"), workers=1))[0]
+    # Same recording, same content; latency is left out (wall-clock timing varies)
+    for name in second['timings']:
+        second['timings'][name]['p95'] = first['timings'][name]['p95']
+    assert compare(second, first) == []
@@ -0,0 +1,76 @@
+from datetime import date, datetime, time
+
+import pytz
+
+from utils import sessions
+from utils.sessions import (CLOSED, EARLY, SHORT, holidays, is_open, is_trading_day, market_for_symbol,
+                            session_for, session_state)
+
+CT = pytz.timezone('America/Chicago')
+
+
+def at(*args):
+    return CT.localize(datetime(*args))
+
+
+def test_holidays_2026():
+    days = holidays(2026)
+    assert days[date(2026, 1, 1)] == (CLOSED, "New Year's Day")
+    assert days[date(2026, 1, 19)][0] == EARLY      # MLK
+    assert days[date(2026, 4, 3)][0] == CLOSED      # Good Friday
+    assert days[date(2026, 7, 3)][0] == EARLY       # July 4th on a Saturday, observed Friday
+    assert days[date(2026, 11, 27)][0] == SHORT     # day after Thanksgiving
+    assert days[date(2026, 12, 24)][0] == SHORT
+    assert days[date(2026, 12, 25)][0] == CLOSED
+
+
+def test_saturday_new_year_is_not_observed_friday():
+    assert date(2021, 12, 31) not in holidays(2022)
+    assert date(2022, 1, 1) not in holidays(2022)
+
+
+def test_federal_holidays_close_stocks_but_not_cme():
+    mlk = date(2026, 1, 19)
+    assert not is_trading_day("stocks", mlk)
+    assert is_trading_day("equity", mlk)
+    assert session_for("equity", mlk)[1] == at(2026, 1, 19, 12, 0)
+    assert not is_trading_day("equity", date(2026, 4, 3))
+    assert not is_trading_day("stocks", date(2026, 2, 14))  # Saturday
+
+
+def test_short_sessions():
+    start, end, note = session_for("stocks", date(2026, 11, 27))
+    assert (start, end) == (at(2026, 11, 27, 8, 30), at(2026, 11, 27, 12, 0))
+    assert note == "Day after Thanksgiving - early close"
+    assert session_for("metals", date(2026, 12, 24))[1].time() == time(12, 45)
+
+
+def test_futures_sessions_open_the_evening_before():
+    assert session_for("equity", date(2026, 2, 16))[0] == at(2026, 2, 15, 17, 0)  # Sunday evening
+    assert is_open("equity", at(2026, 2, 15, 18, 0))
+    assert not is_open("equity", at(2026, 2, 14, 12, 0))   # Saturday
+    assert not is_open("equity", at(2026, 2, 12, 16, 30))  # daily maintenance break
+    assert is_open("equity", at(2026, 2, 12, 17, 0))
+
+
+def test_session_state_next_open_over_a_holiday_weekend():
+    # Thursday before Good Friday, after the stock close: next open is Monday
+    state = session_state("stocks", at(2026, 4, 2, 15, 30))
+    assert not state['open']
+    assert state['next_open'] == at(2026, 4, 6, 8, 30)
+
+    state = session_state("stocks", at(2026, 4, 2, 10, 0))
+    assert state['open'] and state['next_close'] == at(2026, 4, 2, 15, 0)
+
+
+def test_overrides(monkeypatch):
+    monkeypatch.setattr(sessions, "_overrides", lambda: {"2026-02-12": "closed", "2026-02-13": "11:00"})
+    assert not is_trading_day("equity", date(2026, 2, 12))
+    start, end, note = session_for("stocks", date(2026, 2, 13))
+    assert end == at(2026, 2, 13, 11, 0) and note == "Special hours"
+
+
+def test_market_for_symbol():
+    assert market_for_symbol("NQ=F") == "equity"
+    assert market_for_symbol("GC=F") == "metals"
+    assert market_for_symbol("AAPL") == "stocks"
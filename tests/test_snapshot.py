@@ -0,0 +1,100 @@
+import struct
+import time
+import types
+
+import numpy as np
+
+from utils import snapshot
+from utils.bars import BarCache, BarRing
+from utils.quotes import QuoteClient
+
+
+class StatefulCog:
+    def __init__(self, state=None):
+        self.state = state or {}
+
+    def snapshot_state(self):
+        return dict(self.state)
+
+    def restore_state(self, state):
+        self.state = state
+
+
+class BrokenCog:
+    def snapshot_state(self):
+        raise RuntimeError("boom")
+
+    def restore_state(self, state):
+        raise RuntimeError("boom")
+
+
+def ring_of(closes):
+    ring = BarRing(16)
+    closes = np.asarray(closes, dtype=np.float64)
+    ring.extend({'time': np.arange(len(closes)), 'open': closes, 'high': closes, 'low': closes,
+                 'close': closes, 'volume': np.ones(len(closes))})
+    return ring
+
+
+def make_bot(cogs):
+    return types.SimpleNamespace(bars=BarCache(), quotes=QuoteClient(None), cogs=cogs, get_cog=cogs.get)
+
+
+def save(bot, path):
+    snapshot.write(path, snapshot.compress(snapshot.serialize(snapshot.collect(bot))))
+
+
+def test_round_trip_restores_caches_and_cog_state(tmp_path):
+    path = str(tmp_path / "snap.bin")
+    bot = make_bot({"Watch": StatefulCog({'last_price': {"NQ=F": 21500.0}}), "Broken": BrokenCog()})
+    bot.bars._rings[("SPY", "1d")] = ring_of(range(5))
+    bot.bars._fetched[("SPY", "1d")] = (time.monotonic(), 86400 * 31)
+    bot.quotes.cache["NQ=F"] = (time.time(), {'lastPrice': 1.0, 'previousClose': 1.0})
+    save(bot, path)
+
+    payload = snapshot.read(path)
+    assert "Broken" not in payload['cogs']
+
+    fresh = make_bot({"Watch": StatefulCog(), "Broken": BrokenCog()})
+    snapshot.restore_caches(fresh, payload)
+    snapshot.restore_cogs(fresh, payload)
+    assert list(fresh.bars.peek("SPY", "1d", "1mo")['close']) == [0, 1, 2, 3, 4]
+    assert fresh.quotes.cache["NQ=F"][1]['lastPrice'] == 1.0
+    assert fresh.cogs["Watch"].state == {'last_price': {"NQ=F": 21500.0}}
+
+
+def test_restored_bars_are_aged_by_the_downtime(tmp_path):
+    path = str(tmp_path / "snap.bin")
+    bot = make_bot({})
+    bot.bars._rings[("SPY", "1d")] = ring_of(range(3))
+    bot.bars._fetched[("SPY", "1d")] = (time.monotonic(), 86400)
+    payload = snapshot.collect(bot)
+    payload['saved_at'] -= 3600
+
+    fresh = make_bot({})
+    snapshot.restore_caches(fresh, payload)
+    fetched_at, _ = fresh.bars._fetched[("SPY", "1d")]
+    assert time.monotonic() - fetched_at >= 3600
+    assert not fresh.bars._is_fresh(("SPY", "1d"), "1d")
+
+
+def test_other_versions_and_corrupt_files_are_ignored(tmp_path):
+    path = tmp_path / "snap.bin"
+    assert snapshot.read(str(path)) is None
+
+    blob = snapshot.compress(snapshot.serialize({'cogs': {}}))
+    header = struct.Struct(">6sH")
+    path.write_bytes(header.pack(snapshot.SNAPSHOT_MAGIC, snapshot.SNAPSHOT_VERSION + 1) + blob[header.size:])
+    assert snapshot.read(str(path)) is None
+
+    path.write_bytes(header.pack(b"OTHERS", snapshot.SNAPSHOT_VERSION) + blob[header.size:])
+    assert snapshot.read(str(path)) is None
+
+    path.write_bytes(blob[:header.size] + b"not zlib")
+    assert snapshot.read(str(path)) is None
+
+    path.write_bytes(b"JT")
+    assert snapshot.read(str(path)) is None
+
+    path.write_bytes(blob)
+    assert snapshot.read(str(path)) == {'cogs': {}}
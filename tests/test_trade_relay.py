@@ -0,0 +1,51 @@
+import asyncio
+import types
+
+import pytest
+import pytz
+
+from cogs.trade_relay import TradeRelayCog
+
+ALERT = {"symbol": "NQ", "side": "BUY", "entry": 21500.0, "stop": 21480.0, "target": 21560.0,
+         "notes": "", "received_at": 1_770_000_000}
+
+
+def make_cog(channels, delivered):
+    """Relay cog whose broadcasts reach `delivered` of `channels` servers"""
+    dispatched = []
+
+    async def broadcast(role, **kwargs):
+        return delivered
+
+    async def wait_until_ready():
+        pass
+
+    bot = types.SimpleNamespace(
+        wait_until_ready=wait_until_ready,
+        dispatch=lambda *args: dispatched.append(args),
+        guild_config=types.SimpleNamespace(channels=lambda role: (object(),) * channels, broadcast=broadcast),
+    )
+    cog = TradeRelayCog.__new__(TradeRelayCog)
+    cog.bot, cog.fanout, cog.ct = bot, None, pytz.timezone('America/Chicago')
+    return cog, dispatched
+
+
+@pytest.mark.parametrize("channels,delivered", [(2, 2), (2, 1)])
+def test_delivered_batches_do_not_raise(channels, delivered):
+    cog, dispatched = make_cog(channels, delivered)
+    asyncio.run(cog.relay_ingested([ALERT, ALERT]))
+    # Webhook alerts count for every server's digest
+    assert dispatched == [("trade_alert", "NQ", "BUY", 21500.0, None)] * 2
+
+
+@pytest.mark.parametrize("channels,message", [(0, "no trade_alerts channel"), (2, "failed in every server")])
+def test_undelivered_batches_raise(channels, message):
+    cog, _ = make_cog(channels, 0)
+    with pytest.raises(RuntimeError, match=message):
+        asyncio.run(cog.relay_ingested([ALERT]))
+
+
+def test_mirrored_batch_does_not_raise_without_channels():
+    cog, _ = make_cog(0, 0)
+    cog.fanout = types.SimpleNamespace(publish_many=lambda embeds, username=None: 3)
+    asyncio.run(cog.relay_ingested([ALERT]))
@@ -0,0 +1,86 @@
+from utils.watch import ABOVE, BELOW, WatchIndex
+
+
+def make_index():
+    index = WatchIndex()
+    for threshold in (100, 105, 110):
+        index.add("NQ", ABOVE, threshold, user_id=1, channel_id=2)
+    for threshold in (90, 95):
+        index.add("NQ", BELOW, threshold, user_id=1, channel_id=2)
+    return index
+
+
+def thresholds(alerts):
+    return sorted(alert['threshold'] for alert in alerts)
+
+
+def test_first_price_only_seeds():
+    index = make_index()
+    assert index.update("NQ", 120) == []
+
+
+def test_rising_fires_above_alerts_in_between():
+    index = make_index()
+    index.update("NQ", 99)
+    # Threshold equal to the new price fires; equal to the old one doesn't
+    assert thresholds(index.update("NQ", 105)) == [100, 105]
+    assert index.update("NQ", 105) == []
+
+
+def test_falling_fires_below_alerts_in_between():
+    index = make_index()
+    index.update("NQ", 100)
+    assert thresholds(index.update("NQ", 95)) == [95]
+    assert thresholds(index.update("NQ", 80)) == [90]
+
+
+def test_crossed_alerts_stay_until_removed():
+    index = make_index()
+    index.update("NQ", 99)
+    fired = index.update("NQ", 101)
+    assert thresholds(fired) == [100]
+    assert len(index) == 5
+
+    index.update("NQ", 99)
+    assert thresholds(index.update("NQ", 101)) == [100]
+
+    index.remove(fired[0]['id'])
+    index.update("NQ", 99)
+    assert index.update("NQ", 101) == []
+    assert len(index) == 4
+
+
+def test_remove_with_duplicate_thresholds():
+    index = WatchIndex()
+    first = index.add("ES", ABOVE, 5000, user_id=1, channel_id=2)
+    second = index.add("ES", ABOVE, 5000, user_id=3, channel_id=2)
+    assert index.remove(first['id']) is first
+    assert index.remove(first['id']) is None
+
+    index.update("ES", 4990)
+    assert index.update("ES", 5010) == [second]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = make_index()
+    path = tmp_path / "watches.json"
+    index.save(str(path))
+
+    loaded = WatchIndex.load(str(path))
+    assert len(loaded) == 5
+    assert loaded.symbols() == ["NQ"]
+    loaded.update("NQ", 99)
+    assert thresholds(loaded.update("NQ", 111)) == [100, 105, 110]
+
+
+def test_changes_after_dumps_stay_dirty(tmp_path):
+    index = make_index()
+    text = index.dumps()
+    assert not index.dirty
+    # A !watch landing while the write runs in a thread must still be saved later
+    index.add("ES", ABOVE, 6000, user_id=1, channel_id=2)
+    assert index.dirty
+
+    path = str(tmp_path / "watches.json")
+    WatchIndex.write(path, text)
+    assert len(WatchIndex.load(path)) == 5
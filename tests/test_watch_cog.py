@@ -0,0 +1,43 @@
+import asyncio
+import math
+import types
+
+import pytest
+
+from cogs.watch import WatchCog
+from utils.watch import WatchIndex
+
+
+class FakeContext:
+    def __init__(self):
+        self.author = types.SimpleNamespace(id=1)
+        self.channel = types.SimpleNamespace(id=2)
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+
+
+def make_cog():
+    cog = WatchCog.__new__(WatchCog)
+    cog.index = WatchIndex()
+    return cog
+
+
+def watch(cog, *args):
+    ctx = FakeContext()
+    asyncio.run(WatchCog.watch_command.callback(cog, ctx, *args))
+    return ctx.sent[-1]
+
+
+@pytest.mark.parametrize("price", [math.nan, math.inf, -math.inf, None])
+def test_watch_rejects_non_finite_prices(price):
+    cog = make_cog()
+    assert watch(cog, "NQ", "above", price).startswith("**Usage:**")
+    assert len(cog.index) == 0
+
+
+def test_watch_accepts_zero():
+    cog = make_cog()
+    assert watch(cog, "CL", "below", 0.0).startswith("Watch #1")
+    assert cog.index.alerts[1]['threshold'] == 0.0
@@ -0,0 +1 @@
+# JustTrades Bot Utilities
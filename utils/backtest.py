@@ -0,0 +1,168 @@
+"""
+Bias Backtest - Vectorized replay of the determine_bias rule over daily bars
+
+CLI: python -m utils.backtest [--years 20] [--symbol SPY]
+"""
+import argparse
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# determine_bias parameters (shared with AnalysisCog so live and backtest never drift)
+RANGE_THRESHOLD = 0.3
+VIX_CUTOFF = 25
+LEVEL_WINDOW = 20
+
+BULLISH, BEARISH, NEUTRAL, CAUTIOUS = 1, -1, 0, 2
+BIAS_LABELS = {BULLISH: "BULLISH", BEARISH: "BEARISH", NEUTRAL: "NEUTRAL", CAUTIOUS: "CAUTIOUS"}
+
+# Sensitivity grid around the live parameters
+THRESHOLD_GRID = (0.1, 0.2, 0.3, 0.4, 0.5)
+VIX_GRID = (20, 25, 30, 35)
+
+
+def bias_codes(price, change, support, resistance, vix,
+               range_threshold=RANGE_THRESHOLD, vix_cutoff=VIX_CUTOFF):
+    """The determine_bias rule on scalars or arrays (all inputs broadcast)"""
+    range_size = resistance - support
+    mid_point = support + (range_size / 2)
+    upper = price > mid_point + (range_size * range_threshold)
+    lower = price < mid_point - (range_size * range_threshold)
+
+    return np.select(
+        [vix > vix_cutoff, upper, lower],
+        [CAUTIOUS, np.where(change > 0, BULLISH, NEUTRAL), np.where(change < 0, BEARISH, NEUTRAL)],
+        # A NaN change (missing bar, zero prior close) is NEUTRAL, like the scalar rule
+        default=np.where(np.isfinite(change), np.sign(change), NEUTRAL).astype(np.int64),
+    )
+
+
+def calendar_days(times):
+    """Day number of each daily bar; yfinance stamps them at the exchange's local midnight (UTC-12..+12)"""
+    return (np.asarray(times, dtype=np.int64) + 12 * 3600) // 86400
+
+
+def align_daily(spy, vix):
+    """Inner-join two daily bar dicts on calendar date"""
+    _, spy_idx, vix_idx = np.intersect1d(calendar_days(spy['time']), calendar_days(vix['time']),
+                                         assume_unique=True, return_indices=True)
+    return ({name: col[spy_idx] for name, col in spy.items()},
+            vix['close'][vix_idx])
+
+
+def hit_rate(codes, next_move):
+    """Share of directional calls (BULLISH/BEARISH) where the next day agreed"""
+    directional = (codes == BULLISH) | (codes == BEARISH)
+    hits = ((codes == BULLISH) & (next_move > 0)) | ((codes == BEARISH) & (next_move < 0))
+    calls = directional.sum(axis=-1)
+    return np.divide(hits.sum(axis=-1), calls, out=np.zeros(calls.shape), where=calls > 0)
+
+
+def run_backtest(spy, vix, years=20):
+    """Backtest determine_bias over daily SPY and VIX bars, returns a dict report
+
+    None when SPY and VIX don't share enough days (20-day levels plus a next day).
+    """
+    if not 0 < years < float("inf"):
+        raise ValueError("years must be a positive number")
+    started = time.perf_counter()
+    bars, vix_close = align_daily(spy, vix)
+    if len(bars['time']) <= LEVEL_WINDOW:
+        return None
+
+    cutoff = bars['time'][-1] - int(years * 365.25 * 86400)
+    start = max(int(np.searchsorted(bars['time'], cutoff)), LEVEL_WINDOW - 1)
+    if start >= len(bars['time']) - 1:
+        return None
+
+    close = bars['close']
+    # Same inputs get_market_data builds: 20-day low/high including today, change vs prior close
+    support = sliding_window_view(bars['low'], LEVEL_WINDOW).min(axis=1)[start - LEVEL_WINDOW + 1:]
+    resistance = sliding_window_view(bars['high'], LEVEL_WINDOW).max(axis=1)[start - LEVEL_WINDOW + 1:]
+    change = np.diff(close)[start - 1:]
+    price = close[start:]
+    vix_close = vix_close[start:]
+
+    # Drop the last day: it has no next-day outcome yet
+    next_move = (close[start + 1:] / price[:-1] - 1) * 100
+    price, change, support, resistance, vix_close = (
+        price[:-1], change[:-1], support[:-1], resistance[:-1], vix_close[:-1])
+
+    codes = bias_codes(price, change, support, resistance, vix_close)
+    by_bias = {}
+    for code, label in BIAS_LABELS.items():
+        mask = codes == code
+        count = int(mask.sum())
+        by_bias[label] = {
+            'days': count,
+            'avg_move': float(next_move[mask].mean()) if count else 0.0,
+            'up_pct': float((next_move[mask] > 0).mean() * 100) if count else 0.0,
+        }
+
+    # Whole grid in one broadcast: (thresholds, cutoffs, days)
+    grid = bias_codes(price, change, support, resistance, vix_close,
+                      np.array(THRESHOLD_GRID)[:, None, None], np.array(VIX_GRID)[None, :, None])
+    sensitivity = hit_rate(grid, next_move) * 100
+
+    return {
+        'start': int(bars['time'][start]),
+        'end': int(bars['time'][start + len(price) - 1]),
+        'days': len(price),
+        'hit_rate': float(hit_rate(codes, next_move) * 100),
+        'by_bias': by_bias,
+        'thresholds': THRESHOLD_GRID,
+        'vix_cutoffs': VIX_GRID,
+        'sensitivity': sensitivity,
+        'elapsed_ms': (time.perf_counter() - started) * 1000,
+    }
+
+
+def format_sensitivity(report):
+    """Hit-rate grid as a fixed-width table (rows: range threshold, cols: VIX cutoff)"""
+    header = "thr  " + "".join(f"VIX>{c:<5}" for c in report['vix_cutoffs'])
+    rows = [header]
+    for i, threshold in enumerate(report['thresholds']):
+        rows.append(f"{threshold:<5}" + "".join(f"{rate:>5.1f}%   " for rate in report['sensitivity'][i]))
+    return "\n".join(rows)
+
+
+def format_report(report):
+    """Plain-text report for the CLI"""
+    lines = [
+        f"determine_bias backtest: {report['days']} days "
+        f"({time.strftime('%Y-%m-%d', time.gmtime(report['start']))} to "
+        f"{time.strftime('%Y-%m-%d', time.gmtime(report['end']))})",
+        f"Hit rate (BULLISH/BEARISH calls): {report['hit_rate']:.1f}%",
+        "",
+        "Next-day move by bias:",
+    ]
+    for label, stats in report['by_bias'].items():
+        lines.append(f"  {label:<9} {stats['days']:>5} days  avg {stats['avg_move']:+.3f}%  up {stats['up_pct']:.1f}%")
+    lines += ["", "Hit rate sensitivity:", format_sensitivity(report), "",
+              f"Computed in {report['elapsed_ms']:.1f} ms"]
+    return "\n".join(lines)
+
+
+def main():
+    from utils.bars import fetch_bars
+
+    parser = argparse.ArgumentParser(description="Backtest the daily determine_bias rule")
+    parser.add_argument("--years", type=float, default=20)
+    parser.add_argument("--symbol", default="SPY")
+    args = parser.parse_args()
+
+    spy = fetch_bars(args.symbol, "1d", "max")
+    vix = fetch_bars("^VIX", "1d", "max")
+    if spy is None or vix is None:
+        raise SystemExit("Unable to download daily bars")
+    if not 0 < args.years < float("inf"):
+        raise SystemExit("--years must be a positive number")
+    report = run_backtest(spy, vix, args.years)
+    if report is None:
+        raise SystemExit("No overlapping SPY/VIX history to backtest")
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Bar Cache - OHLCV bars shared across cogs
+Bars are fetched off the event loop and kept per (symbol, interval) in
+fixed-capacity ring buffers of contiguous typed arrays.
+
+Memory benchmark vs per-call DataFrames: python -m utils.bars --bench
+"""
+import argparse
+import asyncio
+import re
+import time
+
+import numpy as np
+
+try:
+    import yfinance as yf
+    YFINANCE_AVAILABLE = True
+except ImportError:
+    YFINANCE_AVAILABLE = False
+
+# Short futures roots members type (NQ, ES, ...) mapped to Yahoo continuous contracts
+FUTURES_ROOTS = {"NQ", "ES", "YM", "RTY", "GC", "SI", "CL", "NG", "ZB", "ZN"}
+
+# How long fetched bars stay fresh, in seconds, by interval
+BAR_TTL = {
+    "1m": 30, "2m": 60, "5m": 120, "15m": 300, "30m": 600,
+    "60m": 900, "1h": 900, "1d": 900, "1wk": 3600,
+}
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+
+# float64: the cache also holds stocks, ^VIX, crypto and volume, which float32 can't store exactly
+PRICE_DTYPE = np.float64
+
+# Periods yfinance accepts, smallest first; used to pick the cheapest incremental refresh
+REFRESH_PERIODS = ("1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max")
+PERIOD_UNITS = {"d": 86400, "wk": 7 * 86400, "mo": 31 * 86400, "y": 366 * 86400}
+
+
+def resolve_symbol(symbol):
+    """Map NQ -> NQ=F etc, leave everything else as typed"""
+    symbol = symbol.upper()
+    if symbol in FUTURES_ROOTS:
+        return f"{symbol}=F"
+    return symbol
+
+
+def period_seconds(period):
+    """Approximate span of a yfinance period string ('5d', '3mo', 'max', ...)"""
+    if period == "max":
+        return float("inf")
+    if period == "ytd":
+        return 366 * 86400
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unknown period '{period}'")
+    return int(match.group(1)) * PERIOD_UNITS[match.group(2)]
+
+
+def interval_seconds(interval):
+    """Bar length of a yfinance interval string ('1m', '60m', '1h', '1d', '1wk')"""
+    match = re.fullmatch(r"(\d+)(m|h|d|wk)", interval)
+    if not match:
+        raise ValueError(f"Unknown interval '{interval}'")
+    return int(match.group(1)) * {"m": 60, "h": 3600, "d": 86400, "wk": 7 * 86400}[match.group(2)]
+
+
+def fetch_bars(symbol, interval="1d", period="3mo"):
+    """Download bars as a dict of NumPy arrays (blocking, run in a thread)"""
+    if not YFINANCE_AVAILABLE:
+        return None
+
+    hist = yf.Ticker(symbol).history(period=period, interval=interval)
+    if hist.empty:
+        return None
+    return history_columns(hist)
+
+
+def history_columns(hist):
+    """yfinance history DataFrame -> dict of NumPy arrays"""
+    return {
+        'time': hist.index.asi8 // 1_000_000_000,  # epoch seconds (UTC)
+        'open': hist['Open'].to_numpy(dtype=np.float64),
+        'high': hist['High'].to_numpy(dtype=np.float64),
+        'low': hist['Low'].to_numpy(dtype=np.float64),
+        'close': hist['Close'].to_numpy(dtype=np.float64),
+        'volume': hist['Volume'].to_numpy(dtype=np.float64),
+    }
+
+
+class BarRing:
+    """Fixed-capacity bars in contiguous typed column arrays
+
+    Each column is one buffer of capacity + slack rows. Appends write at the
+    end; once the slack is used up the newest rows are copied to the front
+    of fresh buffers (amortized O(1)). The live window is therefore always a
+    single slice, so view() hands out NumPy views with no copying.
+
+    Views stay valid across extend(): appends only write past the end of the
+    live window and compaction never reuses the old buffers, so a caller can
+    hold a view across an await. The one in-place write is a refreshed last
+    bar (same timestamp), which views see as the bar updating.
+    """
+
+    def __init__(self, capacity, slack=None):
+        self.capacity = capacity
+        self._allocate(capacity + (slack if slack is not None else max(capacity // 4, 16)))
+        self.start = 0
+        self.end = 0
+
+    def _allocate(self, size):
+        """Fresh column buffers; the old ones stay alive for any views into them"""
+        self.time = np.zeros(size, dtype=np.int64)
+        for name in COLUMNS[1:]:
+            setattr(self, name, np.zeros(size, dtype=PRICE_DTYPE))
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    def last_time(self):
+        return int(self.time[self.end - 1]) if len(self) else None
+
+    def extend(self, bars):
+        """Append bars newer than the last stored one; a bar with the same time replaces it"""
+        times = bars['time']
+        if len(self):
+            last = self.time[self.end - 1]
+            first_new = np.searchsorted(times, last, side='left')
+            if first_new < len(times) and times[first_new] == last:
+                for name in COLUMNS:
+                    getattr(self, name)[self.end - 1] = bars[name][first_new]
+                first_new += 1
+        else:
+            first_new = 0
+
+        count = len(times) - first_new
+        if count <= 0:
+            return
+        if count >= self.capacity:
+            first_new = len(times) - self.capacity
+            count = self.capacity
+            self._allocate(len(self.time))
+            self.start = self.end = 0
+        elif self.end + count > len(self.time):
+            # Out of slack: copy the rows we keep to the front of new buffers
+            keep = min(len(self), self.capacity - count)
+            old = {name: getattr(self, name) for name in COLUMNS}
+            self._allocate(len(self.time))
+            for name in COLUMNS:
+                getattr(self, name)[:keep] = old[name][self.end - keep:self.end]
+            self.start, self.end = 0, keep
+
+        for name in COLUMNS:
+            getattr(self, name)[self.end:self.end + count] = bars[name][first_new:]
+        self.end += count
+        self.start = max(self.start, self.end - self.capacity)
+
+    def view(self, since=None):
+        """Columns as zero-copy views, optionally only bars at/after `since`"""
+        start = self.start
+        if since is not None:
+            start += int(np.searchsorted(self.time[self.start:self.end], since, side='left'))
+        return {name: getattr(self, name)[start:self.end] for name in COLUMNS}
+
+
+class BarCache:
+    """In-memory bar store keyed by (symbol, interval)"""
+
+    def __init__(self):
+        self._rings = {}    # key -> BarRing
+        self._fetched = {}  # key -> (fetched_at monotonic, seconds of history covered)
+        self._locks = {}    # key -> asyncio.Lock, so concurrent misses fetch once
+
+    def ring(self, symbol, interval="1d"):
+        return self._rings.get((symbol, interval))
+
+    def _window(self, ring, period):
+        span = period_seconds(period)
+        if span == float("inf"):
+            return ring.view()
+        return ring.view(since=ring.last_time() - span)
+
+    def peek(self, symbol, interval="1d", period="3mo"):
+        """Return cached bars (fresh or stale) without fetching"""
+        ring = self._rings.get((symbol, interval))
+        return self._window(ring, period) if ring is not None and len(ring) else None
+
+    def _is_fresh(self, key, period):
+        fetched = self._fetched.get(key)
+        return (fetched is not None
+                and time.monotonic() - fetched[0] < BAR_TTL.get(key[1], 300)
+                and fetched[1] >= period_seconds(period))
+
+    async def get(self, symbol, interval="1d", period="3mo"):
+        """Return bars as column views, fetching in a worker thread when missing or stale
+
+        A stale ring that already covers the period is topped up with the
+        smallest period that reaches its last bar, not re-downloaded.
+        """
+        key = (symbol, interval)
+        if self._is_fresh(key, period):
+            return self._window(self._rings[key], period)
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if self._is_fresh(key, period):
+                return self._window(self._rings[key], period)
+
+            ring = self._rings.get(key)
+            covered = self._fetched.get(key, (0, 0))[1]
+            incremental = ring is not None and len(ring) and covered >= period_seconds(period)
+            if incremental:
+                gap = time.time() - ring.last_time()
+                fetch_period = next(p for p in REFRESH_PERIODS if period_seconds(p) > gap)
+            else:
+                fetch_period = period
+
+            try:
+                bars = await asyncio.to_thread(fetch_bars, symbol, interval, fetch_period)
+            except Exception as e:
+                print(f"Error fetching bars for {symbol} {interval}: {e}")
+                bars = None
+
+            if bars is None:
+                # Stale data beats no data
+                return self._window(ring, period) if ring is not None and len(ring) else None
+
+            if not incremental:
+                # A full fetch replaces the ring: extend() keeps only bars newer than the last
+                # stored one, so the older history a longer period adds would be dropped
+                ring = BarRing(max(len(bars['time']) + len(bars['time']) // 10, 256))
+                self._rings[key] = ring
+                covered = period_seconds(period)
+            ring.extend(bars)
+            if len(ring) == ring.capacity:
+                # A full ring has pushed out its oldest bars; it only covers what it still holds
+                covered = min(covered, ring.last_time() - int(ring.time[ring.start]))
+            self._fetched[key] = (time.monotonic(), covered)
+            return self._window(ring, period)
+
+    def snapshot(self):
+        """Rings with their age and coverage, for warm restarts"""
+        now = time.monotonic()
+        return {key: (now - self._fetched[key][0], self._fetched[key][1], ring)
+                for key, ring in self._rings.items() if key in self._fetched}
+
+    def restore(self, saved, downtime=0.0):
+        """Load rings from snapshot(), ageing them by however long the bot was down"""
+        now = time.monotonic()
+        for key, (age, covered, ring) in saved.items():
+            if key not in self._rings:
+                self._rings[key] = ring
+                self._fetched[key] = (now - age - downtime, covered)
+
+
+def benchmark(symbols=500, bars_per_day=1380):
+    """Peak/retained memory for one day of 1m bars: yfinance-style DataFrames vs BarRings"""
+    import tracemalloc
+    import pandas as pd
+
+    start = 1_760_000_000
+    index = pd.date_range(pd.Timestamp(start, unit="s", tz="America/New_York"), periods=bars_per_day, freq="1min")
+    base = np.random.default_rng(0).normal(0, 1, bars_per_day).cumsum() + 20000
+    columns = {"Open": base, "High": base + 2, "Low": base - 2, "Close": base + 0.5,
+               "Volume": np.full(bars_per_day, 1000.0), "Dividends": 0.0, "Stock Splits": 0.0}
+
+    def measure(build):
+        tracemalloc.start()
+        store = build()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return store, retained, peak
+
+    frames, df_retained, df_peak = measure(
+        lambda: [pd.DataFrame(columns, index=index) for _ in range(symbols)])
+
+    def build_rings():
+        rings = []
+        for frame in frames:
+            ring = BarRing(bars_per_day)
+            ring.extend({
+                'time': frame.index.asi8 // 1_000_000_000,
+                'open': frame['Open'].to_numpy(), 'high': frame['High'].to_numpy(),
+                'low': frame['Low'].to_numpy(), 'close': frame['Close'].to_numpy(),
+                'volume': frame['Volume'].to_numpy(),
+            })
+            rings.append(ring)
+        return rings
+
+    rings, ring_retained, ring_peak = measure(build_rings)
+
+    print(f"{symbols} symbols x {bars_per_day} 1m bars")
+    print(f"  DataFrames: {df_retained / 2**20:7.1f} MiB retained, {df_peak / 2**20:7.1f} MiB peak")
+    print(f"  BarRings:   {ring_retained / 2**20:7.1f} MiB retained, {ring_peak / 2**20:7.1f} MiB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bar storage memory benchmark")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.symbols)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Cross-Asset Correlation - Return correlation and relative strength across symbols
+Bars are aligned onto one (times, symbols) close matrix, then the whole
+correlation matrix is a single standardized matrix product.
+
+Benchmark: python -m utils.correlation --bench [--symbols 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils.backtest import calendar_days
+
+MIN_BARS = 20       # symbols with fewer aligned bars than this are dropped
+MIN_COVERAGE = 0.8  # a symbol must have bars on this share of the board's timestamps
+
+
+def bucket_times(times, bar_seconds):
+    """Bar times floored to the bar size so exchanges line up
+
+    Daily+ bars use the backtest's calendar_days, so both agree on which
+    day a bar stamped at an exchange's local midnight belongs to.
+    """
+    if bar_seconds >= 86400:
+        return calendar_days(times)
+    return times // bar_seconds
+
+
+def align_closes(bars_by_symbol, bar_seconds):
+    """Put every symbol's closes on one shared timeline
+
+    The timeline is every bar time at least half the symbols traded. A
+    symbol with bars at less than MIN_COVERAGE of it (more than 20%
+    missing: different exchange holidays, a new listing) is dropped;
+    smaller gaps carry the previous close forward rather than shrinking
+    the timeline for everyone.
+    Returns (symbols kept, bucket times, closes[times, symbols], dropped).
+    """
+    symbols = [s for s, bars in bars_by_symbol.items() if bars is not None and len(bars['close']) >= MIN_BARS]
+    dropped = [s for s in bars_by_symbol if s not in symbols]
+    if not symbols:
+        return [], np.empty(0, dtype=np.int64), np.empty((0, 0)), dropped
+
+    # Scatter every symbol's closes into one (times, symbols) grid with NaN holes
+    keys = np.concatenate([bucket_times(bars_by_symbol[s]['time'], bar_seconds) for s in symbols])
+    column = np.repeat(np.arange(len(symbols)), [len(bars_by_symbol[s]['close']) for s in symbols])
+    times, row = np.unique(keys, return_inverse=True)
+    grid = np.full((len(times), len(symbols)), np.nan)
+    grid[row, column] = np.concatenate([bars_by_symbol[s]['close'] for s in symbols])
+
+    present = ~np.isnan(grid)
+    board = present.sum(axis=1) >= max(2, len(symbols) // 2)
+    keep = present[board].mean(axis=0) >= MIN_COVERAGE if board.any() else np.zeros(len(symbols), dtype=bool)
+    dropped += [s for s, ok in zip(symbols, keep) if not ok]
+    if not keep.any():
+        return [], np.empty(0, dtype=np.int64), np.empty((0, 0)), dropped
+
+    # Forward-fill holes with each symbol's previous close, then start once every symbol has printed
+    grid, present = grid[:, keep], present[:, keep]
+    last = np.maximum.accumulate(np.where(present, np.arange(len(times))[:, None], 0), axis=0)
+    grid = grid[last, np.arange(grid.shape[1])]
+    board &= present.cumsum(axis=0).min(axis=1) > 0
+    return [s for s, ok in zip(symbols, keep) if ok], times[board], grid[board], dropped
+
+
+def correlation_matrix(closes):
+    """Pearson correlation of log returns for every pair of columns, as one matmul"""
+    returns = np.diff(np.log(closes), axis=0)
+    returns -= returns.mean(axis=0)
+    std = returns.std(axis=0)
+    z = np.divide(returns, std, out=np.zeros_like(returns), where=std > 0)
+    corr = (z.T @ z) / max(len(z), 1)
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def relative_strength(closes):
+    """Return over the window for each column, minus the board's median return (percent)"""
+    total = (closes[-1] / closes[0] - 1) * 100
+    return total - np.median(total)
+
+
+def heatmap_stats(bars_by_symbol, bar_seconds):
+    """Align bars and compute everything !heatmap shows"""
+    symbols, times, closes, dropped = align_closes(bars_by_symbol, bar_seconds)
+    if len(symbols) < 2 or len(times) < MIN_BARS:
+        return None
+    return {
+        'symbols': symbols,
+        'bars': len(times),
+        'corr': correlation_matrix(closes),
+        'strength': relative_strength(closes),
+        'dropped': dropped,
+    }
+
+
+def benchmark(symbols=200, bars=1000, rounds=20):
+    """Time alignment + correlation for a synthetic board"""
+    rng = np.random.default_rng(0)
+    times = 1_760_000_000 + np.arange(bars, dtype=np.int64) * 300
+    factor = rng.normal(0, 1e-3, bars)
+    board = {}
+    for i in range(symbols):
+        returns = factor * rng.uniform(-1, 1) + rng.normal(0, 1e-3, bars)
+        keep = np.sort(rng.choice(bars, size=bars - bars // 50, replace=False))  # a few missing bars each
+        board[f"SYM{i}"] = {'time': times[keep], 'close': (100 * np.exp(returns.cumsum()))[keep]}
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        stats = heatmap_stats(board, 300)
+        timings.append(time.perf_counter() - started)
+
+    print(f"{symbols} symbols x {bars} bars -> {len(stats['symbols'])}x{len(stats['symbols'])} matrix "
+          f"over {stats['bars']} aligned bars")
+    print(f"  median {np.median(timings) * 1000:.1f}ms, worst {max(timings) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlation matrix benchmark")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=1000)
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.symbols, args.bars)
+
+
+if __name__ == "__main__":
+    main()
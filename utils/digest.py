@@ -0,0 +1,108 @@
+"""
+Day Digest - Running session state for the end-of-day recap
+
+Everything is folded in as it happens (quote samples, the morning bias
+call, trade alerts/closes), so the recap is built from a fixed amount of
+state no matter how busy the session was.
+"""
+from collections import deque
+from datetime import time, timedelta
+
+RECENT_TRADES = 10
+SESSION_ROLL = time(17, 0)  # CME sessions after 5 PM CT belong to the next trade date
+
+
+def trade_date_for(now):
+    """Trade date a CT timestamp belongs to (evenings roll to the next day)"""
+    return (now + timedelta(days=1)).date() if now.time() >= SESSION_ROLL else now.date()
+
+
+class DayDigest:
+    def __init__(self, trade_date):
+        self.trade_date = trade_date
+        self.moves = {}      # symbol -> {'prev': prior settle, 'first', 'high', 'low', 'last'}
+        self.bias = None     # {'bias', 'price', 'time'} from the session's first call
+        self.alerts = 0
+        self.updates = 0
+        self.wins = 0
+        self.losses = 0
+        self.points = 0.0
+        self.by_symbol = {}  # symbol -> [alerts, closes, points]
+        self.recent = deque(maxlen=RECENT_TRADES)
+        self.tomorrow = []   # (date, events) for the next trading day
+
+    def observe(self, symbol, price, prev_close=None):
+        """Fold one quote sample into the running open/high/low/last"""
+        move = self.moves.get(symbol)
+        if move is None:
+            self.moves[symbol] = {'prev': prev_close, 'first': price, 'high': price, 'low': price, 'last': price}
+            return
+        if price > move['high']:
+            move['high'] = price
+        elif price < move['low']:
+            move['low'] = price
+        move['last'] = price
+        if prev_close:
+            move['prev'] = prev_close
+
+    def record_bias(self, bias, price, when):
+        """Keep the session's first call; later manual !dailybias posts don't replace it"""
+        if self.bias is None:
+            self.bias = {'bias': bias, 'price': price, 'time': when.timestamp()}
+
+    def _symbol(self, symbol):
+        return self.by_symbol.setdefault(symbol.upper(), [0, 0, 0.0])
+
+    def record_alert(self, symbol, side, entry):
+        self.alerts += 1
+        self._symbol(symbol)[0] += 1
+        self.recent.append(f"{symbol.upper()} {'LONG' if side.upper() == 'BUY' else 'SHORT'} @ {entry:,.2f}")
+
+    def record_close(self, symbol, result, pnl):
+        if result.upper() == "WIN":
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.points += pnl
+        stats = self._symbol(symbol)
+        stats[1] += 1
+        stats[2] += pnl
+        self.recent.append(f"{symbol.upper()} closed {result.upper()} {pnl:+,.2f} pts")
+
+    def record_update(self):
+        self.updates += 1
+
+    def bias_outcome(self, symbol="SPY"):
+        """(label, move since the call) for the morning bias, None if unknown"""
+        move = self.moves.get(symbol)
+        if not self.bias or not move or not self.bias['price']:
+            return None
+        change = move['last'] - self.bias['price']
+        call = self.bias['bias']
+        if call == "BULLISH":
+            label = "Correct" if change > 0 else "Missed"
+        elif call == "BEARISH":
+            label = "Correct" if change < 0 else "Missed"
+        elif call == "NEUTRAL":
+            label = "Correct" if abs(change) <= (move['high'] - move['low']) * 0.3 else "Trend day"
+        else:
+            # CAUTIOUS only warns about volatility; report how wide the day was
+            label = f"{(move['high'] - move['low']) / move['last'] * 100:.1f}% range"
+        return label, change
+
+    def to_state(self):
+        """Detached copy for the snapshot; call on the loop thread so nothing mutates it mid-copy"""
+        state = dict(self.__dict__)
+        state['moves'] = {symbol: dict(move) for symbol, move in self.moves.items()}
+        state['bias'] = dict(self.bias) if self.bias else None
+        state['by_symbol'] = {symbol: list(stats) for symbol, stats in self.by_symbol.items()}
+        state['recent'] = list(self.recent)
+        state['tomorrow'] = [self.tomorrow[0], [dict(e) for e in self.tomorrow[1]]] if self.tomorrow else []
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        digest = cls(state['trade_date'])
+        digest.__dict__.update({k: v for k, v in state.items() if k != 'recent'})
+        digest.recent.extend(state.get('recent', []))
+        return digest
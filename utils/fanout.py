@@ -0,0 +1,157 @@
+"""
+Webhook Fan-out - Mirror relay posts to many webhook destinations
+One worker per destination keeps per-destination ordering. The workers
+share one keep-alive session with its own connector, sized to the number
+of destinations: every Discord webhook is on the same host, so the bot's
+per-host connection limit would cap how many post at once.
+"""
+import asyncio
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import aiohttp
+
+SEND_TIMEOUT = aiohttp.ClientTimeout(total=10)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+LATENCY_WINDOW = 200
+
+
+class Destination:
+    """A single webhook URL with its own FIFO queue and delivery stats"""
+
+    def __init__(self, url, name=None):
+        self.url = url
+        # Discord webhook URLs end in /<id>/<token>; never show the token
+        self.name = name or f"webhook-{url.rstrip('/').split('/')[-2]}"
+        self.queue = asyncio.Queue()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # ms from publish to delivery
+        self.sent = 0
+        self.failed = 0
+        self.task = None
+
+
+def valid_webhook_url(url):
+    """http(s) URL whose path ends in /<id>/<token> like Discord webhooks"""
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and bool(parts.netloc) and len(parts.path.strip('/').split('/')) >= 2
+
+
+async def retry_delay(resp):
+    """Seconds to wait after a 429; proxies and Cloudflare can answer without a JSON body"""
+    retry_after = resp.headers.get("Retry-After", 1)
+    try:
+        data = await resp.json(content_type=None)
+        if isinstance(data, dict):
+            retry_after = data.get("retry_after", retry_after)
+    except ValueError:
+        pass
+    try:
+        return min(max(float(retry_after), 0.0), 60.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class WebhookFanout:
+    def __init__(self, urls, retries=MAX_RETRIES):
+        self.session = None
+        self.retries = retries
+        self.destinations = []
+        for i, url in enumerate(urls, 1):
+            if valid_webhook_url(url):
+                self.destinations.append(Destination(url))
+            else:
+                # Don't echo the entry, it may hold a token
+                print(f"Skipping malformed fan-out webhook URL #{i}")
+
+    def start(self):
+        if not self.destinations:
+            return
+        # One connection per destination, no per-host cap (all webhooks share discord.com)
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            limit=len(self.destinations), limit_per_host=0, ttl_dns_cache=300))
+        for dest in self.destinations:
+            dest.task = asyncio.create_task(self._worker(dest), name=f"fanout:{dest.name}")
+
+    async def stop(self):
+        for dest in self.destinations:
+            if dest.task:
+                dest.task.cancel()
+        await asyncio.gather(*(d.task for d in self.destinations if d.task), return_exceptions=True)
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def publish(self, embed, username=None):
+        """Queue an embed for every destination, returns the number of destinations"""
+        return self.publish_many([embed], username)
+
+    def publish_many(self, embeds, username=None):
+        """Queue embeds for every destination, up to 10 per webhook post (Discord's limit)"""
+        enqueued = time.perf_counter()
+        for start in range(0, len(embeds), 10):
+            payload = {"embeds": [embed.to_dict() for embed in embeds[start:start + 10]]}
+            if username:
+                payload["username"] = username
+            for dest in self.destinations:
+                dest.queue.put_nowait((enqueued, payload))
+        return len(self.destinations)
+
+    async def join(self):
+        """Wait until every destination has drained its queue"""
+        await asyncio.gather(*(d.queue.join() for d in self.destinations))
+
+    async def _send(self, dest, payload):
+        """POST once, returns True on success and raises on retryable errors"""
+        async with self.session.post(dest.url, json=payload, timeout=SEND_TIMEOUT) as resp:
+            if resp.status == 429:
+                await asyncio.sleep(await retry_delay(resp))
+                raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=429)
+            if resp.status >= 500:
+                raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+            if resp.status >= 400:
+                print(f"Fan-out to {dest.name} rejected: HTTP {resp.status}")
+                return False
+            return True
+
+    async def _worker(self, dest):
+        while True:
+            enqueued, payload = await dest.queue.get()
+            delivered = False
+            for attempt in range(self.retries + 1):
+                try:
+                    delivered = await self._send(dest, payload)
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.retries:
+                        print(f"Fan-out to {dest.name} failed after {attempt + 1} attempts: {e}")
+                        break
+                    await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+                except Exception as e:
+                    # Anything else drops this payload, never the worker (its queue would grow forever)
+                    print(f"Fan-out to {dest.name} failed: {e!r}")
+                    break
+
+            if delivered:
+                dest.sent += 1
+                dest.latencies.append((time.perf_counter() - enqueued) * 1000)
+            else:
+                dest.failed += 1
+            dest.queue.task_done()
+
+    def stats(self):
+        """Per-destination delivery counts and latency (ms)"""
+        results = []
+        for dest in self.destinations:
+            latencies = sorted(dest.latencies)
+            results.append({
+                'name': dest.name,
+                'sent': dest.sent,
+                'failed': dest.failed,
+                'queued': dest.queue.qsize(),
+                'last': dest.latencies[-1] if dest.latencies else 0.0,
+                'avg': sum(latencies) / len(latencies) if latencies else 0.0,
+                'p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+            })
+        return results
@@ -0,0 +1,206 @@
+"""
+Guild Config - Per-guild channel roles (daily_bias, trade_alerts, ...)
+
+Each guild maps a role to one of its channels; the registry is a JSON file
+at GUILD_CONFIG_PATH. Resolved channel objects are cached per (guild, role)
+and the per-role fan-out lists are cached too, so scheduled posts to every
+guild do no lookups. The bot drops cache entries on channel delete/update
+and guild removal.
+
+A guild can also restrict which channels accept ! commands (empty means all).
+
+The CHANNEL_* environment variables still work: on first connect each one
+is assigned to the guild its channel belongs to, unless that guild already
+configured the role.
+"""
+import asyncio
+import json
+import os
+
+GUILD_CONFIG_PATH = os.environ.get('GUILD_CONFIG_PATH', 'data/guild_config.json')
+
+# Role -> default channel ID (the original single-server setup)
+DEFAULT_CHANNELS = {
+    'news_headlines': int(os.environ.get('CHANNEL_NEWS_HEADLINES', '1420078847629590608')),
+    'daily_bias': int(os.environ.get('CHANNEL_DAILY_BIAS', '1358534746879037642')),
+    'breaking_news': int(os.environ.get('CHANNEL_BREAKING_NEWS', '1347337500380893296')),
+    'live_trades': int(os.environ.get('CHANNEL_LIVE_TRADES', '1347337979751829659')),
+    'trade_setups': int(os.environ.get('CHANNEL_TRADE_SETUPS', '1347337927637602365')),
+    'chart_setups': int(os.environ.get('CHANNEL_CHART_SETUPS', '1367383497689268286')),
+    'trading_glossary': int(os.environ.get('CHANNEL_TRADING_GLOSSARY', '1358534448332935420')),
+    'economic_calendar': int(os.environ.get('CHANNEL_ECONOMIC_CALENDAR', '1359875411470716959')),
+    'trade_alerts': int(os.environ.get('CHANNEL_TRADE_ALERTS', '1358534900780630067')),
+}
+ROLES = tuple(DEFAULT_CHANNELS)
+
+
+class GuildConfig:
+    def __init__(self, bot, path=GUILD_CONFIG_PATH):
+        self.bot = bot
+        self.path = path
+        self.guilds = {}         # guild_id -> {role: channel_id}
+        self.command_channels = {}  # guild_id -> set of channel IDs where commands are accepted
+        self._resolved = {}      # (guild_id, role) -> channel object
+        self._fanout = {}        # role -> tuple of channel objects across guilds
+        self._keys = {}          # channel_id -> set of (guild_id, role) using it
+        self.dirty = False
+
+    def load(self):
+        """Read the registry, empty if missing or unreadable"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            print(f"Could not read guild config {self.path}: {e}")
+            return self
+        # JSON object keys are strings
+        self.guilds = {int(guild_id): {role: int(channel_id) for role, channel_id in roles.items()}
+                       for guild_id, roles in data.get('guilds', {}).items()}
+        self.command_channels = {int(guild_id): set(channel_ids)
+                                 for guild_id, channel_ids in data.get('command_channels', {}).items() if channel_ids}
+        return self
+
+    def dumps(self):
+        """Serialize the registry and clear the dirty flag; call on the loop, the dicts are live"""
+        self.dirty = False
+        return json.dumps({
+            'guilds': {str(g): roles for g, roles in self.guilds.items()},
+            'command_channels': {str(g): sorted(ids) for g, ids in self.command_channels.items()},
+        }, indent=2)
+
+    @staticmethod
+    def write(path, text):
+        """Write a dumps() string atomically (blocking, fine in a thread)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def save(self):
+        """Write the registry atomically (blocking)"""
+        self.write(self.path, self.dumps())
+
+    async def persist(self):
+        """Serialize on the loop, write the file in a thread"""
+        text = self.dumps()
+        await asyncio.to_thread(self.write, self.path, text)
+
+    def seed_defaults(self):
+        """Assign each default channel to its guild when that guild hasn't set the role"""
+        for role, channel_id in DEFAULT_CHANNELS.items():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None or getattr(channel, 'guild', None) is None:
+                continue
+            roles = self.guilds.setdefault(channel.guild.id, {})
+            if role not in roles:
+                roles[role] = channel_id
+                self.dirty = True
+        self.reset()
+
+    def get(self, guild_id, role):
+        """Configured channel ID for a guild's role, or None"""
+        return self.guilds.get(guild_id, {}).get(role)
+
+    def set(self, guild_id, role, channel_id):
+        if role not in ROLES:
+            raise ValueError(f"Unknown channel role '{role}'. Roles: {', '.join(ROLES)}")
+        self.guilds.setdefault(guild_id, {})[role] = channel_id
+        self._forget((guild_id, role))
+        self.dirty = True
+
+    def unset(self, guild_id, role):
+        roles = self.guilds.get(guild_id, {})
+        if roles.pop(role, None) is None:
+            return False
+        if not roles:
+            self.guilds.pop(guild_id, None)
+        self._forget((guild_id, role))
+        self.dirty = True
+        return True
+
+    def allowed_channels(self, guild_id):
+        """Channel IDs that accept commands in a guild, None when unrestricted"""
+        return self.command_channels.get(guild_id)
+
+    def allow_channel(self, guild_id, channel_id):
+        self.command_channels.setdefault(guild_id, set()).add(channel_id)
+        self.dirty = True
+
+    def disallow_channel(self, guild_id, channel_id):
+        """Remove a channel from the allowlist; returns False if it wasn't on it"""
+        allowed = self.command_channels.get(guild_id)
+        if not allowed or channel_id not in allowed:
+            return False
+        allowed.discard(channel_id)
+        if not allowed:
+            del self.command_channels[guild_id]
+        self.dirty = True
+        return True
+
+    def clear_allowlist(self, guild_id):
+        if self.command_channels.pop(guild_id, None):
+            self.dirty = True
+
+    def channel(self, guild, role):
+        """Resolved channel for a guild (object or ID) and role; None in DMs or when unset/missing"""
+        if guild is None:
+            return None
+        guild_id = getattr(guild, 'id', guild)
+        key = (guild_id, role)
+        channel = self._resolved.get(key)
+        if channel is not None:
+            return channel
+
+        channel_id = self.get(guild_id, role)
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if channel is not None:
+            # Misses aren't cached: the guild may just not be available yet
+            self._resolved[key] = channel
+            self._keys.setdefault(channel.id, set()).add(key)
+        return channel
+
+    def channels(self, role):
+        """Every guild's channel for a role, for scheduled fan-out posts"""
+        cached = self._fanout.get(role)
+        if cached is None:
+            resolved = (self.channel(guild_id, role) for guild_id, roles in self.guilds.items() if role in roles)
+            cached = tuple(channel for channel in resolved if channel is not None)
+            self._fanout[role] = cached
+        return cached
+
+    async def broadcast(self, role, **kwargs):
+        """Send the same message to every guild's channel for a role; returns how many were delivered"""
+        channels = self.channels(role)
+        results = await asyncio.gather(*(channel.send(**kwargs) for channel in channels), return_exceptions=True)
+        for channel, result in zip(channels, results):
+            if isinstance(result, Exception):
+                print(f"Could not post {role} to {channel.guild.name}/#{channel.name}: {result}")
+        return sum(not isinstance(result, Exception) for result in results)
+
+    def _forget(self, key):
+        channel = self._resolved.pop(key, None)
+        if channel is not None:
+            self._keys.get(channel.id, set()).discard(key)
+        self._fanout.pop(key[1], None)
+
+    def invalidate_channel(self, channel_id):
+        """Drop cached lookups that resolved to this channel (deleted/updated)"""
+        for key in self._keys.pop(channel_id, ()):
+            self._resolved.pop(key, None)
+            self._fanout.pop(key[1], None)
+
+    def invalidate_guild(self, guild_id):
+        """Drop cached lookups for a guild the bot joined, left, or that changed availability"""
+        for key in [k for k in self._resolved if k[0] == guild_id]:
+            self._forget(key)
+        # A guild coming back can fill gaps in any role's fan-out list
+        self._fanout.clear()
+
+    def reset(self):
+        """Forget every resolved channel (e.g. after reconnecting)"""
+        self._resolved.clear()
+        self._fanout.clear()
+        self._keys.clear()
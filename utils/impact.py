@@ -0,0 +1,88 @@
+"""
+Event Impact - Measured NQ/ES moves after past economic releases
+All past releases are aligned against intraday bars in one vectorized pass.
+"""
+import re
+from datetime import datetime
+
+import numpy as np
+
+IMPACT_HORIZONS = (5, 15, 60)  # minutes after the release
+
+# Event names vary ("CPI (Consumer Price Index)", "CPI m/m", ...) so group by type
+EVENT_TYPES = (
+    ("CPI", re.compile(r"\bCPI\b|consumer price", re.I)),
+    ("NFP", re.compile(r"\bNFP\b|non-?farm|payroll", re.I)),
+    ("FOMC", re.compile(r"\bFOMC\b|interest rate decision", re.I)),
+    ("PCE", re.compile(r"\bPCE\b", re.I)),
+    ("GDP", re.compile(r"\bGDP\b", re.I)),
+)
+
+
+def event_type(name):
+    """Group key for an event name: CPI/NFP/FOMC/... or the lowercased name"""
+    for key, pattern in EVENT_TYPES:
+        if pattern.search(name):
+            return key
+    return name.strip().lower()
+
+
+def event_epochs(events, tz):
+    """Epoch seconds per event type for events with a parseable date and time"""
+    epochs = {}
+    for event in events:
+        try:
+            when = tz.localize(datetime.strptime(f"{event['date']} {event['time']}", '%Y-%m-%d %H:%M'))
+        except (KeyError, ValueError):
+            continue
+        epochs.setdefault(event_type(event['event']), []).append(int(when.timestamp()))
+    return {key: np.unique(np.array(values, dtype=np.int64)) for key, values in epochs.items()}
+
+
+def measure_moves(bars, epochs, bar_seconds, horizons=IMPACT_HORIZONS):
+    """Max excursion (points) from the release price within each horizon
+
+    Returns an (events, horizons) array; rows for releases with no bar at
+    the release time (market closed / outside stored history) are NaN.
+    """
+    times = bars['time']
+    steps = [max(1, -(-h * 60 // bar_seconds)) for h in horizons]  # ceil(minutes / bar size)
+    width = max(steps)
+
+    start = np.searchsorted(times, epochs, side='right') - 1
+    valid = (start >= 0) & (epochs - times[np.clip(start, 0, None)] < bar_seconds)
+    window = np.clip(start[:, None] + np.arange(width), 0, len(times) - 1)
+
+    price = bars['open'][np.clip(start, 0, None)]
+    highs = np.maximum.accumulate(bars['high'][window], axis=1)
+    lows = np.minimum.accumulate(bars['low'][window], axis=1)
+    excursion = np.maximum(highs - price[:, None], price[:, None] - lows)
+
+    # Don't let a window run past the end of the stored bars
+    complete = start[:, None] + np.array(steps) - 1 < len(times)
+    moves = excursion[:, [s - 1 for s in steps]]
+    moves[~(valid[:, None] & complete)] = np.nan
+    return moves
+
+
+def impact_stats(bars, epochs_by_type, bar_seconds, horizons=IMPACT_HORIZONS):
+    """{event type: {'count': n, 'avg': {h: pts}, 'worst': {h: pts}}} for one symbol"""
+    if bars is None or not epochs_by_type:
+        return {}
+
+    keys = list(epochs_by_type)
+    epochs = np.concatenate([epochs_by_type[k] for k in keys])
+    labels = np.concatenate([np.full(len(epochs_by_type[k]), i) for i, k in enumerate(keys)])
+    moves = measure_moves(bars, epochs, bar_seconds, horizons)
+
+    stats = {}
+    for i, key in enumerate(keys):
+        rows = moves[(labels == i) & ~np.isnan(moves).any(axis=1)]
+        if not len(rows):
+            continue
+        stats[key] = {
+            'count': len(rows),
+            'avg': {h: float(v) for h, v in zip(horizons, rows.mean(axis=0))},
+            'worst': {h: float(v) for h, v in zip(horizons, rows.max(axis=0))},
+        }
+    return stats
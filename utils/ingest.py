@@ -0,0 +1,296 @@
+"""
+Alert Ingest - Embedded HTTP endpoint for strategy webhooks (TradingView style)
+
+POST /webhook with a JSON body:
+    {"symbol": "NQ", "side": "BUY", "entry": 21500, "stop": 21480, "target": 21560,
+     "notes": "optional", "id": "optional idempotency key", "passphrase": "<INGEST_TOKEN>"}
+The token can also be sent as an X-Ingest-Token header (TradingView cannot set
+headers, hence the body field) and the key as an Idempotency-Key header.
+Without a key, identical payloads a few seconds apart count as retries; a
+genuine repeat of the same alert later on is relayed again.
+
+Requests are validated and acknowledged immediately (202); a single consumer
+drains the bounded queue in batches so bursts become few Discord posts.
+
+Local testing:
+    python -m utils.ingest --serve --token test
+    python -m utils.ingest --loadgen --token test --count 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import random
+import time
+from collections import OrderedDict
+
+import aiohttp
+from aiohttp import web
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 10        # Discord allows 10 embeds per message
+BATCH_WINDOW = 0.5     # seconds to keep filling a batch once the first alert arrives
+DEDUPE_SECONDS = 3600          # for sender-supplied ids
+CONTENT_DEDUPE_SECONDS = 10    # for content hashes: long enough for client retries, short enough for real repeats
+DEDUPE_MAX_KEYS = 100_000
+MAX_BODY_BYTES = 16 * 1024
+
+SIDES = {"BUY": "BUY", "LONG": "BUY", "SELL": "SELL", "SHORT": "SELL"}
+
+
+def parse_alert(payload):
+    """Validate a webhook body into the fields !alert takes; returns (alert, error)"""
+    if not isinstance(payload, dict):
+        return None, "body must be a JSON object"
+
+    symbol = str(payload.get("symbol") or payload.get("ticker") or "").strip().upper()
+    if not symbol or len(symbol) > 20:
+        return None, "symbol is required"
+
+    side = SIDES.get(str(payload.get("side") or payload.get("action") or "").strip().upper())
+    if side is None:
+        return None, "side must be BUY/SELL (or LONG/SHORT)"
+
+    prices = {}
+    for field, aliases in (("entry", ("entry", "price")), ("stop", ("stop",)), ("target", ("target",))):
+        raw = next((payload[a] for a in aliases if payload.get(a) is not None), None)
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            return None, f"{field} must be a number"
+        if not math.isfinite(value) or value <= 0:
+            return None, f"{field} must be a positive number"
+        prices[field] = value
+
+    notes = str(payload.get("notes") or "")[:1024]
+    return {"symbol": symbol, "side": side, **prices, "notes": notes}, None
+
+
+def payload_key(alert):
+    """Content hash used as the idempotency key when the sender doesn't supply one"""
+    raw = json.dumps(alert, sort_keys=True).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+class IngestServer:
+    """aiohttp app + bounded queue + batching consumer
+
+    `handler(batch)` is awaited with up to batch_size alert dicts at a time.
+    """
+
+    def __init__(self, handler, token, host="0.0.0.0", port=8080, queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, batch_window=BATCH_WINDOW, dedupe_seconds=DEDUPE_SECONDS,
+                 content_dedupe_seconds=CONTENT_DEDUPE_SECONDS):
+        if not token:
+            raise ValueError("IngestServer needs a token; refusing to accept unauthenticated alerts")
+        self.handler = handler
+        self.token = token.encode()
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.dedupe_seconds = dedupe_seconds
+        self.content_dedupe_seconds = content_dedupe_seconds
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        # idempotency key -> expiry (monotonic), oldest first; one store per TTL keeps each ordered
+        self.seen = OrderedDict()
+        self.seen_content = OrderedDict()
+        self.runner = None
+        self.task = None
+        self.counts = {"received": 0, "accepted": 0, "duplicate": 0, "rejected": 0,
+                       "unauthorized": 0, "queue_full": 0, "relayed": 0, "batches": 0, "failed": 0}
+
+    async def start(self):
+        app = web.Application(client_max_size=MAX_BODY_BYTES)
+        app.router.add_post("/webhook", self.handle)
+        app.router.add_get("/health", self.health)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        self.task = asyncio.create_task(self._consumer(), name="ingest:consumer")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+        if self.task:
+            # Flush what was already acknowledged before shutting down
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                print(f"Ingest stopped with {self.queue.qsize()} alerts still queued")
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def _authorized(self, request, payload):
+        supplied = request.headers.get("X-Ingest-Token") or (
+            payload.get("passphrase") or payload.get("token") if isinstance(payload, dict) else None)
+        return bool(supplied) and hmac.compare_digest(str(supplied).encode(), self.token)
+
+    @staticmethod
+    def _remember(seen, key, ttl):
+        """Record a key in one TTL's store, expiring old ones (a shared TTL keeps the oldest first)"""
+        now = time.monotonic()
+        while seen:
+            expiry = next(iter(seen.values()))
+            if expiry > now and len(seen) < DEDUPE_MAX_KEYS:
+                break
+            seen.popitem(last=False)
+        seen[key] = now + ttl
+        # A re-used key that had expired but not yet been evicted must move to the back
+        seen.move_to_end(key)
+
+    async def health(self, request):
+        return web.json_response({"ok": True, "queued": self.queue.qsize()})
+
+    async def handle(self, request):
+        self.counts["received"] += 1
+        try:
+            payload = await request.json()
+        except ValueError:
+            self.counts["rejected"] += 1
+            return web.json_response({"error": "invalid JSON"}, status=400)
+
+        if not self._authorized(request, payload):
+            self.counts["unauthorized"] += 1
+            return web.json_response({"error": "unauthorized"}, status=401)
+
+        alert, error = parse_alert(payload)
+        if error:
+            self.counts["rejected"] += 1
+            return web.json_response({"error": error}, status=422)
+
+        key = request.headers.get("Idempotency-Key") or payload.get("id")
+        if key:
+            key, seen, ttl = str(key)[:200], self.seen, self.dedupe_seconds
+        else:
+            key, seen, ttl = payload_key(alert), self.seen_content, self.content_dedupe_seconds
+        if key in seen and seen[key] > time.monotonic():
+            self.counts["duplicate"] += 1
+            return web.json_response({"status": "duplicate", "id": key})
+
+        if self.queue.full():
+            self.counts["queue_full"] += 1
+            return web.json_response({"error": "queue full"}, status=503, headers={"Retry-After": "1"})
+
+        # Only remember the key once the alert is queued, so a 503 can be retried
+        self._remember(seen, key, ttl)
+        alert["received_at"] = time.time()
+        self.queue.put_nowait(alert)
+        self.counts["accepted"] += 1
+        return web.json_response({"status": "queued", "id": key}, status=202)
+
+    async def _consumer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if self.queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            try:
+                await self.handler(batch)
+                self.counts["relayed"] += len(batch)
+            except Exception as e:
+                self.counts["failed"] += len(batch)
+                print(f"Ingest handler failed for a batch of {len(batch)}: {e}")
+            self.counts["batches"] += 1
+            for _ in batch:
+                self.queue.task_done()
+
+    def stats(self):
+        return {**self.counts, "queued": self.queue.qsize(), "maxsize": self.queue.maxsize,
+                "avg_batch": self.counts["relayed"] / self.counts["batches"] if self.counts["batches"] else 0.0}
+
+
+async def serve(args):
+    """Run the server standalone with a handler that just counts batches"""
+    async def handler(batch):
+        lag = (time.time() - batch[0]["received_at"]) * 1000
+        print(f"batch of {len(batch):2d}  first {batch[0]['symbol']} {batch[0]['side']}  lag {lag:.0f}ms")
+
+    server = IngestServer(handler, args.token, args.host, args.port, batch_window=args.batch_window)
+    await server.start()
+    print(f"Listening on http://{args.host}:{args.port}/webhook (Ctrl+C to stop)")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(server.stats())
+    finally:
+        await server.stop()
+
+
+async def load_generator(args):
+    """Fire `count` alerts at `concurrency` with a share of deliberate duplicate retries"""
+    statuses = {}
+    latencies = []
+    sent_ids = []
+    rng = random.Random(0)
+    queue = asyncio.Queue()
+    for i in range(args.count):
+        if sent_ids and rng.random() < args.duplicates:
+            queue.put_nowait(rng.choice(sent_ids))
+        else:
+            sent_ids.append(f"load-{i}")
+            queue.put_nowait(sent_ids[-1])
+
+    async def worker(session):
+        while not queue.empty():
+            alert_id = queue.get_nowait()
+            entry = 21500 + rng.randint(-100, 100)
+            body = {"symbol": rng.choice(["NQ", "ES", "YM", "RTY", "GC", "CL"]), "side": rng.choice(["BUY", "SELL"]),
+                    "entry": entry, "stop": entry - 20, "target": entry + 60,
+                    "id": alert_id, "passphrase": args.token}
+            started = time.perf_counter()
+            try:
+                async with session.post(args.url, json=body) as resp:
+                    await resp.read()
+                    statuses[resp.status] = statuses.get(resp.status, 0) + 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(worker(session) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{args.count} requests in {elapsed:.2f}s ({args.count / elapsed * 60:,.0f}/min) at concurrency {args.concurrency}")
+    print(f"  status counts: {statuses}")
+    print(f"  latency p50 {latencies[len(latencies) // 2]:.1f}ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert ingest server / load generator")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--serve", action="store_true", help="run a standalone server that prints batches")
+    mode.add_argument("--loadgen", action="store_true", help="send test alerts to a running server")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW)
+    parser.add_argument("--url", default="http://127.0.0.1:8080/webhook")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of requests that retry an earlier id")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args) if args.serve else load_generator(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Command Intake - Cheap pre-filter in front of discord.py's command parser
+
+With message_content enabled every message in every channel reaches
+on_message. Messages that don't start with the prefix are dropped with a
+single startswith; the rest skip get_prefix() and the invoker scan on
+repeats via a small LRU of content -> (invoker, argument offset).
+Arguments are still converted per invocation, since converters depend on
+the guild and author.
+"""
+from collections import Counter, OrderedDict
+
+from discord.ext.commands.view import StringView
+
+PARSE_CACHE_SIZE = 512
+COUNTERS = ('seen', 'not_prefixed', 'unknown_command', 'channel_blocked', 'dispatched', 'cache_hits')
+
+
+class CommandIntake:
+    def __init__(self, prefix, cache_size=PARSE_CACHE_SIZE):
+        self.prefix = prefix
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.counts = Counter()
+
+    def parse(self, content):
+        """(invoker, view positioned at the arguments) for a prefixed message"""
+        parsed = self.cache.get(content)
+        if parsed is not None:
+            self.counts['cache_hits'] += 1
+            self.cache.move_to_end(content)
+            invoker, index = parsed
+            view = StringView(content)
+            view.index = view.previous = index
+            return invoker, view
+
+        view = StringView(content)
+        view.skip_string(self.prefix)
+        invoker = view.get_word()
+        return invoker, view
+
+    def remember(self, content, invoker, view):
+        """Cache a parse that resolved to a real command (unknown ones would just churn the LRU)"""
+        if content in self.cache:
+            return
+        self.cache[content] = (invoker, view.index)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def stats(self):
+        seen = self.counts['seen']
+        dropped = seen - self.counts['dispatched']
+        return {**{name: self.counts[name] for name in COUNTERS}, 'dropped': dropped,
+                'dropped_pct': dropped / seen * 100 if seen else 0.0,
+                'cached': len(self.cache)}
@@ -0,0 +1,114 @@
+"""
+Auto Levels - Floor pivots, prior day, overnight and 20-day range
+Computed for many symbols at once from cached bars
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from utils.digest import trade_date_for
+
+RANGE_DAYS = 20
+
+LEVEL_FIELDS = ("pivot", "r1", "r2", "s1", "s2", "pdh", "pdl", "pdc", "onh", "onl", "high_20", "low_20")
+
+
+def session_cutoffs(now):
+    """Epoch cutoffs for the current session: (prior-day cutoff, overnight start, overnight end)
+
+    The session's trade date rolls at 5:00 PM CT like the digest's, so after
+    the close the day that just finished counts as the prior day. Daily bars
+    for futures/ETFs are stamped at midnight New York time, so any bar before
+    the trade date's NY midnight is a completed day. The overnight session
+    runs from the prior 5:00 PM CT Globex open to the 8:30 AM CT cash open.
+    """
+    ct = pytz.timezone('America/Chicago')
+    et = pytz.timezone('America/New_York')
+    now = now.astimezone(ct)
+    trade_date = trade_date_for(now)
+
+    day_cutoff = et.localize(datetime.combine(trade_date, datetime.min.time()))
+    cash_open = ct.localize(datetime.combine(trade_date, datetime.min.time()).replace(hour=8, minute=30))
+    overnight_end = min(now, cash_open)
+    overnight_start = ct.localize(
+        datetime.combine(trade_date - timedelta(days=1), datetime.min.time()).replace(hour=17)
+    )
+    return int(day_cutoff.timestamp()), int(overnight_start.timestamp()), int(overnight_end.timestamp())
+
+
+def stack_completed(daily, day_cutoff, window=RANGE_DAYS):
+    """Stack the last `window` completed daily bars of each symbol into (symbols, window) matrices"""
+    highs = np.full((len(daily), window), np.nan)
+    lows = np.full((len(daily), window), np.nan)
+    closes = np.full((len(daily), window), np.nan)
+
+    for row, bars in enumerate(daily):
+        if bars is None:
+            continue
+        end = np.searchsorted(bars['time'], day_cutoff)
+        start = max(end - window, 0)
+        count = end - start
+        if count:
+            highs[row, window - count:] = bars['high'][start:end]
+            lows[row, window - count:] = bars['low'][start:end]
+            closes[row, window - count:] = bars['close'][start:end]
+
+    return highs, lows, closes
+
+
+def overnight_range(intraday, start, end):
+    """Overnight high/low per symbol from concatenated intraday bars (NaN when no bars)"""
+    present = [(row, bars) for row, bars in enumerate(intraday) if bars is not None]
+    onh = np.full(len(intraday), -np.inf)
+    onl = np.full(len(intraday), np.inf)
+    if not present:
+        return np.full(len(intraday), np.nan), np.full(len(intraday), np.nan)
+
+    ids = np.concatenate([np.full(len(bars['time']), row) for row, bars in present])
+    times = np.concatenate([bars['time'] for _, bars in present])
+    highs = np.concatenate([bars['high'] for _, bars in present])
+    lows = np.concatenate([bars['low'] for _, bars in present])
+
+    mask = (times >= start) & (times < end)
+    np.fmax.at(onh, ids[mask], highs[mask])
+    np.fmin.at(onl, ids[mask], lows[mask])
+    onh[np.isinf(onh)] = np.nan
+    onl[np.isinf(onl)] = np.nan
+    return onh, onl
+
+
+def compute_levels(symbols, daily, intraday, now):
+    """Levels for every symbol in one vectorized pass
+
+    daily/intraday are lists of bar dicts (or None) aligned with symbols.
+    Returns {symbol: {field: value}} with NaN for anything unavailable.
+    """
+    day_cutoff, overnight_start, overnight_end = session_cutoffs(now)
+    highs, lows, closes = stack_completed(daily, day_cutoff)
+
+    pdh, pdl, pdc = highs[:, -1], lows[:, -1], closes[:, -1]
+    pivot = (pdh + pdl + pdc) / 3
+    day_range = pdh - pdl
+    high_20 = np.fmax.reduce(highs, axis=1)
+    low_20 = np.fmin.reduce(lows, axis=1)
+    onh, onl = overnight_range(intraday, overnight_start, overnight_end)
+
+    columns = {
+        "pivot": pivot,
+        "r1": 2 * pivot - pdl,
+        "r2": pivot + day_range,
+        "s1": 2 * pivot - pdh,
+        "s2": pivot - day_range,
+        "pdh": pdh,
+        "pdl": pdl,
+        "pdc": pdc,
+        "onh": onh,
+        "onl": onl,
+        "high_20": high_20,
+        "low_20": low_20,
+    }
+    return {
+        symbol: {field: float(columns[field][row]) for field in LEVEL_FIELDS}
+        for row, symbol in enumerate(symbols)
+    }
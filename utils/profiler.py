@@ -0,0 +1,143 @@
+"""
+Live Profiler - Sampled CPU stacks and tracemalloc allocation reports
+
+The CPU sampler runs in a separate thread and reads the event-loop
+thread's stack every few milliseconds, so overhead is bounded by the
+sample rate no matter what the bot is doing. Each sample is attributed to
+the asyncio task that was running (tasks.loop jobs and commands carry
+readable task names).
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+MAX_DEPTH = 64
+TOP_N = 25
+IDLE = "<idle: event loop waiting>"
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _function_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_cpu(loop, thread_id, seconds, interval=SAMPLE_INTERVAL):
+    """Sample the loop thread's stack for `seconds` (blocking; run in another thread)"""
+    self_counts = Counter()
+    cumulative = Counter()
+    tasks = Counter()
+    samples = idle = 0
+
+    # Without a short GIL switch interval the sampler only wakes once the loop thread
+    # releases the GIL (i.e. goes idle), which would hide short busy bursts
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch_interval, interval / 20))
+    try:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            task = asyncio.current_task(loop)
+            samples += 1
+            if task is None:
+                idle += 1
+                tasks[IDLE] += 1
+            elif frame is not None:
+                tasks[task.get_name()] += 1
+                self_counts[_frame_label(frame)] += 1
+                seen = set()
+                depth = 0
+                while frame is not None and depth < MAX_DEPTH:
+                    label = _function_label(frame)
+                    if label not in seen:
+                        seen.add(label)
+                        cumulative[label] += 1
+                    frame = frame.f_back
+                    depth += 1
+            time.sleep(interval)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    return {'seconds': seconds, 'interval': interval, 'samples': samples, 'idle': idle,
+            'self': self_counts, 'cumulative': cumulative, 'tasks': tasks}
+
+
+def format_cpu_report(result):
+    busy = result['samples'] - result['idle']
+    lines = [
+        f"CPU profile: {result['seconds']}s, {result['samples']} samples every {result['interval'] * 1000:.0f}ms",
+        f"Event loop busy: {busy / max(result['samples'], 1) * 100:.1f}% of samples",
+        "",
+        "Time by task (all samples):",
+    ]
+    for name, count in result['tasks'].most_common(TOP_N):
+        lines.append(f"  {count / max(result['samples'], 1) * 100:6.1f}%  {name}")
+
+    for title, counter in (("Hot lines (self, % of busy samples):", result['self']),
+                           ("Hot functions (cumulative, % of busy samples):", result['cumulative'])):
+        lines += ["", title]
+        for label, count in counter.most_common(TOP_N):
+            lines.append(f"  {count / max(busy, 1) * 100:6.1f}%  {label}")
+    return "\n".join(lines)
+
+
+def format_memory_report(before, after, seconds, current, peak):
+    """Diff two snapshots into a text report (blocking; run in a thread)"""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>")]
+    before = before.filter_traces(ignore)
+    after = after.filter_traces(ignore)
+
+    lines = [
+        f"Memory profile: {seconds}s window",
+        f"Traced during window: {current / 2**20:.1f} MiB current, {peak / 2**20:.1f} MiB peak",
+        "",
+        "Top allocation growth (by line):",
+    ]
+    for stat in after.compare_to(before, 'lineno')[:TOP_N]:
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                     f"{os.path.basename(frame.filename)}:{frame.lineno}")
+
+    lines += ["", "Largest live allocation sites (by traceback):"]
+    for stat in after.statistics('traceback')[:10]:
+        lines.append(f"  {stat.size / 1024:10.1f} KiB {stat.count:8d} blocks")
+        for line in stat.traceback.format(limit=4):
+            lines.append(f"      {line}")
+    return "\n".join(lines)
+
+
+async def profile_memory(seconds, frames=10):
+    """Diff two tracemalloc snapshots taken `seconds` apart; returns a text report
+
+    Snapshots and the diff run in a thread so the loop keeps serving meanwhile.
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    try:
+        before = await asyncio.to_thread(tracemalloc.take_snapshot)
+        await asyncio.sleep(seconds)
+        after = await asyncio.to_thread(tracemalloc.take_snapshot)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    return await asyncio.to_thread(format_memory_report, before, after, seconds, current, peak)
+
+
+async def profile_cpu(seconds, interval=SAMPLE_INTERVAL):
+    """Sample the running loop from a helper thread; returns a text report"""
+    loop = asyncio.get_running_loop()
+    thread_id = threading.get_ident()
+    result = await asyncio.to_thread(sample_cpu, loop, thread_id, seconds, interval)
+    return format_cpu_report(result)
@@ -0,0 +1,134 @@
+"""
+Quote Client - Direct async HTTP quotes over the shared keep-alive session
+
+Benchmark vs yfinance fast_info: python -m utils.quotes --bench [--base-url URL]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import aiohttp
+
+QUOTE_BASE_URL = os.environ.get('QUOTE_BASE_URL', 'https://query1.finance.yahoo.com')
+QUOTE_TIMEOUT = aiohttp.ClientTimeout(
+    total=float(os.environ.get('QUOTE_TIMEOUT', '2.5')),
+    connect=1.0,
+)
+# Quotes younger than this are served from memory instead of re-requested
+QUOTE_CACHE_SECONDS = float(os.environ.get('QUOTE_CACHE_SECONDS', '5'))
+QUOTE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (JustTrades Bot)",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+def parse_quote(payload):
+    """Pull lastPrice/previousClose out of a v8 chart response, None if absent"""
+    try:
+        meta = payload['chart']['result'][0]['meta']
+    except (KeyError, IndexError, TypeError):
+        return None
+
+    price = meta.get('regularMarketPrice')
+    if price is None:
+        return None
+    prev_close = meta.get('previousClose') or meta.get('chartPreviousClose') or price
+    return {'lastPrice': float(price), 'previousClose': float(prev_close)}
+
+
+def fast_info_quote(symbol):
+    """The old yfinance fast_info path (blocking), used as fallback and benchmark baseline"""
+    import yfinance as yf
+
+    info = yf.Ticker(symbol).fast_info
+    price = info.get('lastPrice', 0)
+    return {'lastPrice': price, 'previousClose': info.get('previousClose', price)}
+
+
+class QuoteClient:
+    def __init__(self, session, base_url=QUOTE_BASE_URL, timeout=QUOTE_TIMEOUT):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache = {}  # symbol -> (fetched at epoch seconds, quote)
+
+    async def quote(self, symbol):
+        """Fetch one quote, None on any HTTP/timeout/parse failure"""
+        cached = self.cache.get(symbol)
+        if cached and time.time() - cached[0] < QUOTE_CACHE_SECONDS:
+            return cached[1]
+
+        url = f"{self.base_url}/v8/finance/chart/{symbol}"
+        params = {"range": "1d", "interval": "1d", "includePrePost": "false"}
+        try:
+            async with self.session.get(url, params=params, headers=QUOTE_HEADERS, timeout=self.timeout) as resp:
+                if resp.status != 200:
+                    return None
+                quote = parse_quote(await resp.json(content_type=None))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Quote request failed for {symbol}: {e!r}")
+            return None
+
+        if quote:
+            self.cache[symbol] = (time.time(), quote)
+        return quote
+
+    async def quotes(self, symbols):
+        """Fetch many quotes concurrently over the pooled connections"""
+        results = await asyncio.gather(*(self.quote(s) for s in symbols))
+        return dict(zip(symbols, results))
+
+    def snapshot(self):
+        return dict(self.cache)
+
+    def restore(self, saved):
+        for symbol, entry in saved.items():
+            self.cache.setdefault(symbol, entry)
+
+
+async def benchmark(symbols, rounds, base_url):
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20)) as session:
+        client = QuoteClient(session, base_url)
+        await client.quotes(symbols)  # warm the connection pool
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            client.cache.clear()
+            await client.quotes(symbols)
+        direct = (time.perf_counter() - started) / rounds * 1000
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for symbol in symbols:
+            fast_info_quote(symbol)
+    baseline = (time.perf_counter() - started) / rounds * 1000
+
+    print(f"{len(symbols)} symbols x {rounds} rounds")
+    print(f"  QuoteClient (async, pooled): {direct:8.1f} ms/round")
+    print(f"  yfinance fast_info (serial): {baseline:8.1f} ms/round")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quote client benchmark")
+    parser.add_argument("--bench", action="store_true", help="compare against yfinance fast_info")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--base-url", default=QUOTE_BASE_URL)
+    parser.add_argument("symbols", nargs="*", default=["NQ=F", "ES=F", "YM=F", "RTY=F", "GC=F", "CL=F"])
+    args = parser.parse_args()
+
+    if args.bench:
+        asyncio.run(benchmark(args.symbols, args.rounds, args.base_url))
+        return
+
+    async def show():
+        async with aiohttp.ClientSession() as session:
+            for symbol, quote in (await QuoteClient(session, args.base_url).quotes(args.symbols)).items():
+                print(symbol, quote)
+
+    asyncio.run(show())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,696 @@
+"""
+Session Replay - Run recorded trading days through every cog on a simulated clock
+
+A recorded day is one JSON file:
+    {"date": "2026-02-12", "start": "05:00", "end": "16:15",
+     "bars": {"NQ=F|1m": {"time": [...], "open": [...], "high": [...], "low": [...],
+                          "close": [...], "volume": [...]}, "SPY|1d": {...}},
+     "quotes": {"NQ=F": [[epoch, last, previous close], ...]},
+     "events": [{"date": "2026-02-12", "time": "07:30", "event": "CPI", "impact": "HIGH"}],
+     "event_history": [...], "session_overrides": {...},
+     "commands": [{"at": "08:31", "content": "!market", "author": "trader", "channel": "general"}],
+     "alerts": [{"at": "09:45", "body": {"symbol": "NQ", "side": "BUY", "entry": 21500, ...}}]}
+Only "date" is required. Times are CT ("HH:MM[:SS]" on the date, or a full ISO
+timestamp for the prior evening). Quotes default to the last closed bar of
+the finest recorded interval; missing intervals are resampled from it.
+
+The real cogs are loaded into an offline bot whose clock, quotes, bars and
+channels all come from the recording. Their tasks.loop timers are not
+started: each loop is called at the times it would fire and the clock
+jumps straight from one step to the next, so a session replays in seconds.
+Bars only become visible once closed (the forming bar is rebuilt from the
+finest interval), so nothing can see the future.
+
+Every message the bot sends is captured with its embeds, and every step
+(scheduled job, command, webhook alert) is timed in wall-clock ms. Each
+day runs in its own process; results land in <out>/<date>.json and can be
+checked against an earlier run, exiting 1 on content changes, new errors
+or slower steps:
+    python -m utils.replay days/*.json --workers 4 --out replay/new
+    python -m utils.replay days/*.json --out replay/new --baseline replay/old
+    python -m utils.replay --record 2026-02-12 --out days      (yfinance; 1m bars reach back ~30 days)
+    python -m utils.replay --synthetic 2026-02-12 --out days   (random walk with a 7:30 CT release spike)
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import discord
+import numpy as np
+import pytz
+from discord.ext import commands, tasks
+from discord.ext.commands.view import StringView
+
+from utils.bars import COLUMNS, history_columns, interval_seconds, period_seconds
+from utils.guild_config import GuildConfig, ROLES
+from utils.ingest import parse_alert
+
+CT = pytz.timezone('America/Chicago')
+PREFIX = "!"
+
+# Everything bot.py loads except diagnostics (owner-only profiling of the live process)
+REPLAY_EXTENSIONS = ("cogs.market_data", "cogs.education", "cogs.analysis", "cogs.trade_relay",
+                     "cogs.calendar", "cogs.digest", "cogs.charts", "cogs.watch")
+
+DEFAULT_START = "05:00"
+DEFAULT_END = "16:15"
+REPLAY_GUILD_ID = 1
+
+# A step is slower than baseline when its p95 exceeds baseline p95 * tolerance + slack
+LATENCY_TOLERANCE = 1.5
+LATENCY_SLACK_MS = 5.0
+
+# Recording spans in days back from the replayed date, by interval
+RECORD_SPANS = (("1m", 5), ("5m", 59), ("1d", 730))
+
+# Symbols recorded by --record/--synthetic, with rough synthetic starting prices
+SYNTHETIC_PRICES = {"NQ=F": 21500, "ES=F": 6000, "YM=F": 44000, "RTY=F": 2300, "GC=F": 2700, "CL=F": 72,
+                    "SPY": 600, "QQQ": 520, "IWM": 225, "TLT": 90, "^VIX": 16}
+RECORD_SYMBOLS = tuple(SYNTHETIC_PRICES)
+
+# Commands scripted into new recordings; edit the file to taste
+DEFAULT_SCRIPT = [
+    {"at": "07:25", "content": "!calendar 1"},
+    {"at": "07:31", "content": "!market"},
+    {"at": "08:31", "content": "!dailybias"},
+    {"at": "09:00", "content": "!levels NQ auto"},
+    {"at": "10:00", "content": "!chart NQ 5m 1d"},
+    {"at": "12:00", "content": "!heatmap 3mo 1d"},
+    {"at": "15:55", "content": "!digest"},
+]
+
+
+def at_time(day, value):
+    """CT datetime for a recording time: 'HH:MM[:SS]' on `day` or a full ISO timestamp"""
+    if "T" in value:
+        moment = datetime.fromisoformat(value)
+        return moment.astimezone(CT) if moment.tzinfo else CT.localize(moment)
+    parts = [int(p) for p in value.split(":")]
+    return CT.localize(datetime(day.year, day.month, day.day, *parts))
+
+
+def resample(bars, seconds, offset=0):
+    """Aggregate bars into `seconds` buckets; `offset` (UTC offset) aligns daily buckets to local midnight"""
+    times = bars['time']
+    if not len(times):
+        return {name: bars[name][:0] for name in COLUMNS}
+    buckets = (times + offset) // seconds * seconds - offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)]
+    return {
+        'time': buckets[starts],
+        'open': bars['open'][starts],
+        'high': np.maximum.reduceat(bars['high'], starts),
+        'low': np.minimum.reduceat(bars['low'], starts),
+        'close': bars['close'][ends - 1],
+        'volume': np.add.reduceat(bars['volume'], starts),
+    }
+
+
+class SimClock:
+    """Replay time; patched modules see it through datetime.now()"""
+
+    def __init__(self, epoch):
+        self.time = epoch
+        clock = self
+
+        class ReplayDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls.fromtimestamp(clock.time, tz)
+
+            @classmethod
+            def utcnow(cls):
+                return cls.fromtimestamp(clock.time, timezone.utc).replace(tzinfo=None)
+
+        self.datetime = ReplayDatetime
+
+    def now(self):
+        return datetime.fromtimestamp(self.time, CT)
+
+    def patch(self, module):
+        """Point a module's `from datetime import datetime` at the simulated clock"""
+        if getattr(module, 'datetime', None) is datetime:
+            module.datetime = self.datetime
+
+
+class ReplayBars:
+    """BarCache stand-in serving the recording as of the simulated clock"""
+
+    def __init__(self, recorded, clock):
+        self.clock = clock
+        self.series = {}  # (symbol, interval) -> columns, recorded or resampled
+        for key, columns in recorded.items():
+            symbol, interval = key.rsplit("|", 1)
+            self.series[(symbol, interval)] = {
+                name: np.asarray(columns[name], dtype=np.int64 if name == 'time' else np.float64)
+                for name in COLUMNS}
+        # Daily buckets start at CT midnight
+        self.offset = int(clock.now().utcoffset().total_seconds())
+
+    def finest(self, symbol, below=float("inf")):
+        """(bar seconds, columns) of the shortest recorded interval under `below`, or None"""
+        best = None
+        for (recorded_symbol, interval), columns in self.series.items():
+            seconds = interval_seconds(interval)
+            if recorded_symbol == symbol and seconds < below and (best is None or seconds < best[0]):
+                best = (seconds, columns)
+        return best
+
+    def closed(self, symbol, interval):
+        """(columns, number of bars closed by now) for an interval, resampling if it wasn't recorded"""
+        seconds = interval_seconds(interval)
+        series = self.series.get((symbol, interval))
+        if series is None:
+            finest = self.finest(symbol, seconds)
+            if finest is None:
+                return None, 0
+            series = self.series[(symbol, interval)] = resample(finest[1], seconds, self.offset)
+        return series, int(np.searchsorted(series['time'], self.clock.time - seconds, side='right'))
+
+    def peek(self, symbol, interval="1d", period="3mo"):
+        series, closed = self.closed(symbol, interval)
+        if series is None:
+            return None
+        columns = {name: column[:closed] for name, column in series.items()}
+
+        # The bar in progress, built only from finer bars that have already closed
+        finest = self.finest(symbol, interval_seconds(interval))
+        if finest is not None and closed < len(series['time']) and series['time'][closed] <= self.clock.time:
+            seconds, fine = finest
+            lo = int(np.searchsorted(fine['time'], series['time'][closed], side='left'))
+            hi = int(np.searchsorted(fine['time'], self.clock.time - seconds, side='right'))
+            if hi > lo:
+                forming = {'time': series['time'][closed], 'open': fine['open'][lo],
+                           'high': fine['high'][lo:hi].max(), 'low': fine['low'][lo:hi].min(),
+                           'close': fine['close'][hi - 1], 'volume': fine['volume'][lo:hi].sum()}
+                columns = {name: np.append(column, forming[name]) for name, column in columns.items()}
+
+        if not len(columns['time']):
+            return None
+        span = period_seconds(period)
+        if span != float("inf"):
+            start = int(np.searchsorted(columns['time'], columns['time'][-1] - span, side='left'))
+            columns = {name: column[start:] for name, column in columns.items()}
+        return columns
+
+    async def get(self, symbol, interval="1d", period="3mo"):
+        return self.peek(symbol, interval, period)
+
+
+class ReplayQuotes:
+    """QuoteClient stand-in: recorded quotes, else the last closed bar and prior daily close"""
+
+    def __init__(self, recorded, bars, clock):
+        self.bars = bars
+        self.clock = clock
+        self.series = {symbol: np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+                       for symbol, rows in recorded.items()}
+
+    def peek(self, symbol):
+        rows = self.series.get(symbol)
+        if rows is not None:
+            i = int(np.searchsorted(rows[:, 0], self.clock.time, side='right')) - 1
+            return {'lastPrice': float(rows[i, 1]), 'previousClose': float(rows[i, 2])} if i >= 0 else None
+
+        finest = self.bars.finest(symbol, 86400)
+        if finest is None:
+            return None
+        seconds, fine = finest
+        i = int(np.searchsorted(fine['time'], self.clock.time - seconds, side='right')) - 1
+        if i < 0:
+            return None
+        price = float(fine['close'][i])
+        daily, closed = self.bars.closed(symbol, "1d")
+        prev_close = float(daily['close'][closed - 1]) if closed else price
+        return {'lastPrice': price, 'previousClose': prev_close}
+
+    async def quote(self, symbol):
+        return self.peek(symbol)
+
+    async def quotes(self, symbols):
+        return {symbol: self.peek(symbol) for symbol in symbols}
+
+
+class ReplayChannel:
+    """Text channel (or DM) that records what the bot sends instead of calling Discord"""
+
+    def __init__(self, replay, channel_id, name, guild=None):
+        self.replay = replay
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.parent_id = None
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+    async def send(self, content=None, *, embed=None, embeds=None, file=None, files=None, **kwargs):
+        return self.replay.record(self, content, [embed] if embed else embeds or [], [file] if file else files or [])
+
+
+class ReplayUser(ReplayChannel):
+    """Member who runs scripted commands; DMs to them are captured like channel posts"""
+
+    def __init__(self, replay, user_id, name):
+        super().__init__(replay, user_id, f"dm:{name}")
+        self.name = self.display_name = name
+        self.bot = False
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+
+class ReplayContext(commands.Context):
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    def typing(self, *, ephemeral=False):
+        return contextlib.nullcontext()
+
+
+class ReplayBot(commands.Bot):
+    """Offline bot: no gateway, channels and users are the replay's capturing stand-ins"""
+
+    def __init__(self, replay):
+        super().__init__(command_prefix=PREFIX, intents=discord.Intents.none())
+        self.replay = replay
+
+    def get_channel(self, channel_id):
+        return self.replay.channels.get(channel_id)
+
+    def get_user(self, user_id):
+        return self.replay.users.get(user_id)
+
+    async def fetch_user(self, user_id):
+        return self.replay.users[user_id]
+
+    async def wait_until_ready(self):
+        return
+
+    def _schedule_event(self, coro, event_name, *args, **kwargs):
+        # Listeners count toward the step that dispatched them
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+        self.replay.pending.add(task)
+        task.add_done_callback(self.replay.pending.discard)
+        return task
+
+    async def on_command_error(self, ctx, error):
+        error = getattr(error, 'original', error)
+        self.replay.error(f"{type(error).__name__}: {error}")
+
+    async def on_error(self, event_method, *args, **kwargs):
+        error = sys.exc_info()[1]
+        self.replay.error(f"on_{event_method}: {type(error).__name__}: {error}")
+
+
+class DayReplay:
+    def __init__(self, day, workdir):
+        self.day = day
+        self.workdir = workdir
+        self.date = date.fromisoformat(day['date'])
+        self.start = at_time(self.date, day.get('start', DEFAULT_START))
+        self.end = at_time(self.date, day.get('end', DEFAULT_END))
+        self.clock = SimClock(self.start.timestamp())
+        self.channels = {}   # channel_id -> ReplayChannel
+        self.by_name = {}    # channel name -> ReplayChannel
+        self.users = {}      # user_id -> ReplayUser
+        self.pending = set()
+        self.ids = itertools.count(1)
+        self.sends = []
+        self.steps = []
+        self.errors = []
+        self.timings = defaultdict(list)
+        self.step = None
+        self.step_started = 0.0
+        self.bot = None
+
+    def stamp(self):
+        return self.clock.now().isoformat(timespec='seconds')
+
+    def record(self, channel, content, embeds, files):
+        self.sends.append({
+            'at': self.stamp(), 'step': self.step, 'channel': channel.name,
+            'content': content, 'embeds': [embed.to_dict() for embed in embeds],
+            'files': [{'filename': f.filename, 'bytes': f.fp.getbuffer().nbytes if hasattr(f.fp, 'getbuffer') else None}
+                      for f in files],
+            'ms': round((time.perf_counter() - self.step_started) * 1000, 3),
+        })
+        return SimpleNamespace(id=next(self.ids), channel=channel, content=content)
+
+    def error(self, message):
+        self.errors.append({'at': self.stamp(), 'step': self.step, 'error': message})
+
+    def user(self, name):
+        for user in self.users.values():
+            if user.name == name:
+                return user
+        user = ReplayUser(self, 10_000 + len(self.users), name)
+        self.users[user.id] = user
+        return user
+
+    async def setup(self):
+        bot = self.bot = ReplayBot(self)
+        await bot._async_setup_hook()
+        bot.http_session = None  # no webhook destinations or HTTP quotes during a replay
+        bot.bars = ReplayBars(self.day.get('bars', {}), self.clock)
+        bot.quotes = ReplayQuotes(self.day.get('quotes', {}), bot.bars, self.clock)
+
+        guild = self.guild = SimpleNamespace(id=REPLAY_GUILD_ID, name="replay")
+        bot.guild_config = GuildConfig(bot, os.path.join(self.workdir, "guild_config.json"))
+        for i, name in enumerate(("general", *ROLES)):
+            channel = ReplayChannel(self, REPLAY_GUILD_ID * 1000 + i, name, guild)
+            self.channels[channel.id] = self.by_name[name] = channel
+            if name in ROLES:
+                bot.guild_config.set(REPLAY_GUILD_ID, name, channel.id)
+
+        # The replay calls each loop itself; started loops would run on the wall clock
+        tasks.Loop.start = lambda loop, *args, **kwargs: None
+        modules = [importlib.import_module(name) for name in REPLAY_EXTENSIONS]
+        for name, module in list(sys.modules.items()):
+            if name.startswith(("cogs.", "utils.")) and name != __name__:
+                self.clock.patch(module)
+        self.step = "setup"
+        for module in modules:
+            await module.setup(bot)
+
+        if 'events' in self.day:
+            bot.get_cog("Calendar").events = list(self.day['events'])
+            bot.dispatch("calendar_changed")
+        await self.drain()
+
+    def fire_times(self, loop):
+        """Epochs in the replay window at which a tasks.loop would run"""
+        start, end = self.start.timestamp(), self.end.timestamp()
+        if loop.time is None:
+            every = (loop.hours or 0) * 3600 + (loop.minutes or 0) * 60 + (loop.seconds or 0)
+            return np.arange(start, end + 1, every).tolist() if every else [start]
+
+        times = []
+        day = self.start.date()
+        while day <= self.end.date():
+            for t in loop.time:
+                naive = datetime.combine(day, t.replace(tzinfo=None))
+                tz = t.tzinfo or timezone.utc
+                moment = tz.localize(naive) if hasattr(tz, 'localize') else naive.replace(tzinfo=tz)
+                if start <= moment.timestamp() <= end:
+                    times.append(moment.timestamp())
+            day += timedelta(days=1)
+        return times
+
+    def schedule(self):
+        """(epoch, order, kind, name, action) for every loop run, command and alert, in firing order"""
+        steps = []
+        for cog in self.bot.cogs.values():
+            for attr in dir(type(cog)):
+                if isinstance(getattr(type(cog), attr, None), tasks.Loop):
+                    loop = getattr(cog, attr)
+                    for at in self.fire_times(loop):
+                        steps.append((at, len(steps), 'job', f"{cog.qualified_name}.{attr}", loop))
+        for entry in self.day.get('commands', []):
+            steps.append((at_time(self.date, entry['at']).timestamp(), len(steps), 'command',
+                          entry['content'].split()[0], lambda entry=entry: self.command(entry)))
+        for entry in self.day.get('alerts', []):
+            steps.append((at_time(self.date, entry['at']).timestamp(), len(steps), 'alert',
+                          "webhook", lambda entry=entry: self.alert(entry)))
+        return sorted(steps)
+
+    async def command(self, entry):
+        """Run a scripted message through the same parse -> invoke path as on_message"""
+        channel = self.by_name.get(entry.get('channel', 'general'))
+        if channel is None:
+            raise ValueError(f"unknown channel '{entry.get('channel')}'")
+        message = SimpleNamespace(id=next(self.ids), content=entry['content'], author=self.user(entry.get('author', 'replay')),
+                                  channel=channel, guild=self.guild, attachments=[], mentions=[], _state=None)
+        view = StringView(message.content)
+        if not view.skip_string(PREFIX):
+            raise ValueError(f"not a command: {message.content!r}")
+        invoker = view.get_word()
+        ctx = ReplayContext(message=message, bot=self.bot, view=view, prefix=PREFIX,
+                            invoked_with=invoker, command=self.bot.all_commands.get(invoker))
+        await self.bot.invoke(ctx)
+
+    async def alert(self, entry):
+        """Validate webhook bodies like the intake does and relay them as one batch"""
+        batch = []
+        for body in entry['body'] if isinstance(entry['body'], list) else [entry['body']]:
+            alert, error = parse_alert(body)
+            if error:
+                self.error(f"webhook rejected: {error}")
+                continue
+            alert['received_at'] = self.clock.time
+            batch.append(alert)
+        if batch:
+            await self.bot.get_cog("Trade Relay").relay_ingested(batch)
+
+    async def drain(self):
+        while self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+
+    async def run_step(self, kind, name, action):
+        sent, failed = len(self.sends), len(self.errors)
+        self.step = name
+        self.step_started = time.perf_counter()
+        try:
+            await action()
+        except Exception as e:
+            self.error(f"{type(e).__name__}: {e}")
+        await self.drain()
+        ms = (time.perf_counter() - self.step_started) * 1000
+        self.timings[name].append(ms)
+        # Idle loop ticks only show up in the timings
+        if kind != 'job' or len(self.sends) > sent or len(self.errors) > failed:
+            self.steps.append({'at': self.stamp(), 'kind': kind, 'name': name, 'ms': round(ms, 3),
+                               'sends': len(self.sends) - sent})
+
+    async def run(self):
+        started = time.perf_counter()
+        await self.setup()
+        for at, _, kind, name, action in self.schedule():
+            self.clock.time = at
+            await self.run_step(kind, name, action)
+        self.step = "teardown"
+        for name in list(self.bot.cogs):
+            await self.bot.remove_cog(name)
+        await self.drain()
+        wall = time.perf_counter() - started
+        simulated = self.end.timestamp() - self.start.timestamp()
+        return {
+            'date': self.day['date'], 'start': self.start.isoformat(), 'end': self.end.isoformat(),
+            'wall_seconds': round(wall, 3), 'speedup': round(simulated / wall) if wall else None,
+            'steps': self.steps, 'timings': {name: summarize(ms) for name, ms in self.timings.items()},
+            'sends': self.sends, 'errors': self.errors,
+        }
+
+
+def summarize(samples):
+    ordered = np.sort(samples)
+    return {'count': len(ordered), 'p50': round(float(np.percentile(ordered, 50)), 3),
+            'p95': round(float(np.percentile(ordered, 95)), 3), 'max': round(float(ordered[-1]), 3),
+            'total': round(float(ordered.sum()), 3)}
+
+
+def replay_file(path, out_dir):
+    """Replay one recorded day in this (fresh) process, write <out_dir>/<date>.json, return the results"""
+    with open(path) as f:
+        day = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="replay-") as workdir:
+        # Cogs read these at import: keep the replay away from live data, webhooks and ports
+        files = {'WATCH_STORE_PATH': ("watches.json", None),
+                 'EVENT_HISTORY_PATH': ("event_history.json", day.get('event_history')),
+                 'SESSION_OVERRIDES_PATH': ("session_overrides.json", day.get('session_overrides'))}
+        for variable, (name, content) in files.items():
+            os.environ[variable] = os.path.join(workdir, name)
+            if content is not None:
+                with open(os.environ[variable], "w") as f:
+                    json.dump(content, f)
+        for variable in ('INGEST_TOKEN', 'TRADE_RELAY_WEBHOOKS'):
+            os.environ.pop(variable, None)
+        results = asyncio.run(DayReplay(day, workdir).run())
+
+    results['source'] = path
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, f"{day['date']}.json"), "w") as f:
+        json.dump(results, f, indent=1)
+    return results
+
+
+def run_days(paths, out_dir, workers=None):
+    """Replay days in parallel, one fresh process per day; yields results as days finish"""
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    # spawn + one task per child: each day gets clean module state (patched clocks, cog globals)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(replay_file, path, out_dir): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {'source': futures[future], 'failed': f"{type(e).__name__}: {e}"}
+
+
+def _content(send):
+    """What a member would see; file sizes can shift with library versions"""
+    return (send['at'], send['channel'], send['content'], send['embeds'], [f['filename'] for f in send['files']])
+
+
+def compare(results, baseline, tolerance=LATENCY_TOLERANCE, slack_ms=LATENCY_SLACK_MS):
+    """Content, error and latency regressions against an earlier run of the same day"""
+    problems = []
+    new = [_content(s) for s in results['sends']]
+    old = [_content(s) for s in baseline['sends']]
+    if new != old:
+        first = next((i for i, (a, b) in enumerate(zip(new, old)) if a != b), min(len(new), len(old)))
+        where = results['sends'][first] if first < len(new) else baseline['sends'][first]
+        problems.append(f"content: {len(old)} -> {len(new)} messages, first difference at "
+                        f"{where['at'][11:19]} #{where['channel']} ({where['step']})")
+
+    if len(results['errors']) > len(baseline['errors']):
+        known = {(e['step'], e['error']) for e in baseline['errors']}
+        fresh = [e for e in results['errors'] if (e['step'], e['error']) not in known]
+        problems.extend(f"error: {e['at'][11:19]} {e['step']}: {e['error']}" for e in fresh[:5])
+
+    for name, stats in results['timings'].items():
+        before = baseline['timings'].get(name)
+        if before and stats['p95'] > before['p95'] * tolerance + slack_ms:
+            problems.append(f"latency: {name} p95 {before['p95']:.1f} -> {stats['p95']:.1f} ms")
+    return problems
+
+
+def report(results):
+    if 'failed' in results:
+        return f"{results['source']}: replay failed - {results['failed']}"
+    slowest = sorted(results['timings'].items(), key=lambda item: -item[1]['max'])[:3]
+    return (f"{results['date']}  {len(results['steps'])} steps  {len(results['sends'])} messages  "
+            f"{len(results['errors'])} errors  {results['wall_seconds']:.1f}s wall ({results['speedup']:,}x)\n"
+            + "\n".join(f"    {name:<36} n={s['count']:<5} p50 {s['p50']:7.2f}ms  p95 {s['p95']:7.2f}ms  max {s['max']:8.2f}ms"
+                        for name, s in slowest))
+
+
+def record_day(day, out_dir, symbols=RECORD_SYMBOLS):
+    """Write a recording of a past day from yfinance bars (blocking)"""
+    import yfinance as yf
+    from cogs.calendar import DEFAULT_EVENTS
+
+    bars = {}
+    for symbol in symbols:
+        ticker = yf.Ticker(symbol)
+        for interval, days_back in RECORD_SPANS:
+            hist = ticker.history(start=day - timedelta(days=days_back), end=day + timedelta(days=1), interval=interval)
+            if not hist.empty:
+                bars[f"{symbol}|{interval}"] = {name: column.tolist() for name, column in history_columns(hist).items()}
+    events = [e for e in DEFAULT_EVENTS if e['date'] == day.isoformat()]
+    return _write_day(out_dir, {'date': day.isoformat(), 'bars': bars, 'events': events, 'commands': DEFAULT_SCRIPT})
+
+
+def synthetic_day(day, out_dir, seed=0, symbols=RECORD_SYMBOLS):
+    """Write a random-walk recording with a volatility spike after a 7:30 CT release"""
+    rng = np.random.default_rng(seed)
+    start = at_time(day - timedelta(days=4), "17:00").timestamp()
+    times = np.arange(start, at_time(day, DEFAULT_END).timestamp(), 60, dtype=np.int64)
+    release = at_time(day, "07:30").timestamp()
+    spike = np.where((times >= release) & (times < release + 900), 6.0, 1.0)
+    offset = int(at_time(day, "00:00").utcoffset().total_seconds())
+
+    bars = {}
+    for symbol in symbols:
+        base = SYNTHETIC_PRICES.get(symbol, 100)
+        close = base * np.exp(np.cumsum(rng.normal(0, 0.0004, len(times)) * spike))
+        open_ = np.r_[base, close[:-1]]
+        wick = np.abs(rng.normal(0, 0.0002, len(times))) * close
+        minute = {'time': times, 'open': open_, 'high': np.maximum(open_, close) + wick,
+                  'low': np.minimum(open_, close) - wick, 'close': close,
+                  'volume': rng.integers(100, 1000, len(times)).astype(np.float64) * spike}
+
+        # A year of daily history ending where the minute bars begin, then the minute days themselves
+        history = 260
+        drift = np.cumsum(rng.normal(0, 0.01, history))
+        walk = base * np.exp(drift - drift[-1])
+        first = int(times[0] + offset) // 86400 * 86400 - offset
+        daily_times = np.array([first - 86400 * (history - i) for i in range(history)], dtype=np.int64)
+        daily = {'time': daily_times, 'open': walk, 'high': walk * 1.006, 'low': walk * 0.994,
+                 'close': walk, 'volume': np.full(history, 1e6)}
+        recent = resample(minute, 86400, offset)
+        daily = {name: np.r_[daily[name], recent[name]] for name in COLUMNS}
+
+        bars[f"{symbol}|1m"] = {name: column.tolist() for name, column in minute.items()}
+        bars[f"{symbol}|1d"] = {name: column.tolist() for name, column in daily.items()}
+
+    nq = bars["NQ=F|1m"]['close'][int(np.searchsorted(times, release))]
+    return _write_day(out_dir, {
+        'date': day.isoformat(), 'bars': bars,
+        'events': [{"date": day.isoformat(), "time": "07:30", "event": "CPI (Consumer Price Index)", "impact": "HIGH", "forecast": "TBD"},
+                   {"date": (day + timedelta(days=1)).isoformat(), "time": "09:00", "event": "Michigan Consumer Sentiment", "impact": "MEDIUM", "forecast": "TBD"}],
+        'commands': [*DEFAULT_SCRIPT, {"at": "07:29", "content": f"!watch NQ above {nq * 1.002:.2f}", "author": "trader"}],
+        'alerts': [{"at": "07:45", "body": {"symbol": "NQ", "side": "BUY", "entry": round(nq, 2),
+                                           "stop": round(nq - 40, 2), "target": round(nq + 120, 2), "notes": "post-CPI reclaim"}}],
+    })
+
+
+def _write_day(out_dir, recording):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{recording['date']}.json")
+    with open(path, "w") as f:
+        json.dump(recording, f)
+    print(f"Wrote {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded trading days through the cogs")
+    parser.add_argument("days", nargs="*", help="recorded day JSON files")
+    parser.add_argument("--out", default="replay", help="results directory (recordings with --record/--synthetic)")
+    parser.add_argument("--workers", type=int, default=None, help="parallel processes (default: one per day, up to CPUs)")
+    parser.add_argument("--baseline", help="earlier results directory to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=LATENCY_TOLERANCE, help="allowed p95 slowdown factor")
+    parser.add_argument("--record", type=date.fromisoformat, metavar="YYYY-MM-DD", help="record a past day from yfinance")
+    parser.add_argument("--synthetic", type=date.fromisoformat, metavar="YYYY-MM-DD", help="write a synthetic recording")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.record:
+        record_day(args.record, args.out)
+        return
+    if args.synthetic:
+        synthetic_day(args.synthetic, args.out, args.seed)
+        return
+    if not args.days:
+        parser.error("give recorded day files, --record or --synthetic")
+
+    regressions = 0
+    for results in run_days(args.days, args.out, args.workers):
+        print(report(results))
+        if 'failed' in results:
+            regressions += 1
+            continue
+        if args.baseline:
+            try:
+                with open(os.path.join(args.baseline, f"{results['date']}.json")) as f:
+                    baseline = json.load(f)
+            except FileNotFoundError:
+                print("    no baseline for this day")
+                continue
+            problems = compare(results, baseline, args.tolerance)
+            regressions += bool(problems)
+            for problem in problems:
+                print(f"    REGRESSION {problem}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
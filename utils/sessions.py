@@ -0,0 +1,193 @@
+"""
+Session Calendar - CME futures and US stock market hours with holidays
+
+Futures trade Sunday-Friday from 5:00 PM CT to 4:00 PM CT the next day;
+a session belongs to the trade date it ends on. US holidays are computed
+by rule each year: New Year's, Good Friday and Christmas close CME
+entirely, the other federal holidays end the session early. One-off
+closures (e.g. a national day of mourning) can be added with a JSON file
+at SESSION_OVERRIDES_PATH: {"YYYY-MM-DD": "closed" | "HH:MM"}.
+"""
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+import pytz
+
+CT = pytz.timezone('America/Chicago')
+SESSION_OVERRIDES_PATH = os.environ.get('SESSION_OVERRIDES_PATH', 'data/session_overrides.json')
+
+MARKETS = {
+    "equity": {"name": "CME Equity Index", "open": time(17, 0), "close": time(16, 0),
+               "early_close": time(12, 0), "short_close": time(12, 15), "overnight": True},
+    "metals": {"name": "CME Metals", "open": time(17, 0), "close": time(16, 0),
+               "early_close": time(13, 30), "short_close": time(12, 45), "overnight": True},
+    "energy": {"name": "CME Energy", "open": time(17, 0), "close": time(16, 0),
+               "early_close": time(13, 30), "short_close": time(12, 45), "overnight": True},
+    "stocks": {"name": "US Stocks (cash)", "open": time(8, 30), "close": time(15, 0),
+               "early_close": time(12, 0), "short_close": time(12, 0), "overnight": False},
+}
+
+# Futures roots (without =F) by market group; anything else trades on stock hours
+SYMBOL_MARKETS = {
+    "ES": "equity", "NQ": "equity", "YM": "equity", "RTY": "equity",
+    "MES": "equity", "MNQ": "equity", "MYM": "equity", "M2K": "equity",
+    "GC": "metals", "SI": "metals", "HG": "metals", "PL": "metals", "MGC": "metals",
+    "CL": "energy", "NG": "energy", "RB": "energy", "HO": "energy", "MCL": "energy",
+}
+
+CLOSED = "closed"
+EARLY = "early"   # federal holiday: early close
+SHORT = "short"   # day after Thanksgiving / Christmas Eve: short session
+
+
+def market_for_symbol(symbol):
+    """Market group for a Yahoo symbol (NQ=F -> equity, AAPL -> stocks)"""
+    root = symbol.upper()
+    if root.endswith("=F"):
+        root = root[:-2]
+    return SYMBOL_MARKETS.get(root, "stocks")
+
+
+def _nth_weekday(year, month, weekday, n):
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year, month, weekday):
+    last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Saturday holidays are observed Friday, Sunday holidays Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=8)
+def holidays(year):
+    """{date: (kind, name)} for US market holidays in a year"""
+    thanksgiving = _nth_weekday(year, 11, 3, 4)
+    days = {
+        _nth_weekday(year, 1, 0, 3): (EARLY, "Martin Luther King Jr. Day"),
+        _nth_weekday(year, 2, 0, 3): (EARLY, "Presidents Day"),
+        _easter(year) - timedelta(days=2): (CLOSED, "Good Friday"),
+        _last_weekday(year, 5, 0): (EARLY, "Memorial Day"),
+        _observed(date(year, 6, 19)): (EARLY, "Juneteenth"),
+        _observed(date(year, 7, 4)): (EARLY, "Independence Day"),
+        _nth_weekday(year, 9, 0, 1): (EARLY, "Labor Day"),
+        thanksgiving: (EARLY, "Thanksgiving"),
+        thanksgiving + timedelta(days=1): (SHORT, "Day after Thanksgiving"),
+        _observed(date(year, 12, 25)): (CLOSED, "Christmas"),
+    }
+    # A Saturday New Year's Day is not observed on the prior Friday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days[_observed(new_year)] = (CLOSED, "New Year's Day")
+
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5 and christmas_eve not in days:
+        days[christmas_eve] = (SHORT, "Christmas Eve")
+    return days
+
+
+@lru_cache(maxsize=1)
+def _overrides():
+    try:
+        with open(SESSION_OVERRIDES_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Could not read session overrides {SESSION_OVERRIDES_PATH}: {e}")
+        return {}
+
+
+def session_for(market, trade_date):
+    """(start, end, note) for the session ending on trade_date, or None if there isn't one"""
+    spec = MARKETS[market]
+    if trade_date.weekday() >= 5:
+        return None
+
+    close = spec['close']
+    note = ""
+    override = _overrides().get(trade_date.isoformat())
+    kind, name = holidays(trade_date.year).get(trade_date, (None, ""))
+    if override == CLOSED:
+        return None
+    if override:
+        close, note = time.fromisoformat(override), "Special hours"
+    elif kind == CLOSED or (kind and market == "stocks" and kind == EARLY):
+        # CME still trades a shortened session on most federal holidays; the stock market does not
+        return None
+    elif kind == EARLY:
+        close, note = spec['early_close'], f"{name} - early close"
+    elif kind == SHORT:
+        close, note = spec['short_close'], f"{name} - early close"
+
+    if spec['overnight']:
+        # Opens the evening before (Sunday evening for Monday's session)
+        start = CT.localize(datetime.combine(trade_date - timedelta(days=1), spec['open']))
+    else:
+        start = CT.localize(datetime.combine(trade_date, spec['open']))
+    end = CT.localize(datetime.combine(trade_date, close))
+    return start, end, note
+
+
+def is_trading_day(market, day):
+    """True if the market has a session ending on this date"""
+    return session_for(market, day) is not None
+
+
+def session_state(market, now=None):
+    """{'open': bool, 'session': (start, end, note) or None, 'next_open': dt, 'next_close': dt}"""
+    now = (now or datetime.now(CT)).astimezone(CT)
+    day = now.date()
+    current = None
+    upcoming = None
+    for offset in range(0, 15):
+        session = session_for(market, day + timedelta(days=offset))
+        if session is None:
+            continue
+        start, end, _ = session
+        if end <= now:
+            continue
+        if start <= now:
+            current = session
+        elif upcoming is None:
+            upcoming = session
+        if upcoming:
+            break
+
+    return {
+        'open': current is not None,
+        'session': current or upcoming,
+        'next_open': upcoming[0] if upcoming else None,
+        'next_close': current[1] if current else (upcoming[1] if upcoming else None),
+    }
+
+
+def is_open(market, now=None):
+    return session_state(market, now)['open']
+
+
+def symbol_is_open(symbol, now=None):
+    return is_open(market_for_symbol(symbol), now)
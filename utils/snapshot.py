@@ -0,0 +1,98 @@
+"""
+Warm Restart Snapshots - Persist cog state and caches across worker restarts
+
+File format: MAGIC (6 bytes) + version (uint16, big endian) + zlib(pickle(payload)).
+A snapshot with another version is ignored rather than half-restored.
+
+Cogs opt in by defining snapshot_state() -> dict and restore_state(state).
+The payload holds live objects (bar rings, cog dicts), so collect() and
+serialize() run on the event loop; only compression and the write go to a
+thread.
+"""
+import os
+import pickle
+import struct
+import time
+import zlib
+
+SNAPSHOT_MAGIC = b"JTSNAP"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct(">6sH")
+
+
+def collect(bot):
+    """Gather a snapshot payload from the bot's shared caches and cogs (run on the event loop)"""
+    cogs = {}
+    for name, cog in bot.cogs.items():
+        snapshot_state = getattr(cog, 'snapshot_state', None)
+        if snapshot_state:
+            try:
+                cogs[name] = snapshot_state()
+            except Exception as e:
+                print(f"Snapshot of {name} failed: {e}")
+
+    return {
+        'saved_at': time.time(),
+        'bars': bot.bars.snapshot(),
+        'quotes': bot.quotes.snapshot(),
+        'cogs': cogs,
+    }
+
+
+def serialize(payload):
+    """Pickle the payload (on the event loop, before anything can mutate it)"""
+    return pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def compress(raw):
+    """Header + zlib of serialize() output; safe to run in a thread"""
+    return HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION) + zlib.compress(raw, 6)
+
+
+def write(path, blob):
+    """Atomically replace the snapshot file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+
+
+def read(path):
+    """Load a snapshot payload, None if missing, corrupt or from another format version"""
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+
+    if len(blob) < HEADER.size:
+        return None
+    magic, version = HEADER.unpack_from(blob)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        print(f"Ignoring snapshot {path}: format {magic!r} v{version}, expected v{SNAPSHOT_VERSION}")
+        return None
+
+    try:
+        return pickle.loads(zlib.decompress(blob[HEADER.size:]))
+    except Exception as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+
+
+def restore_caches(bot, payload):
+    """Restore shared caches; call before cogs are loaded"""
+    bot.bars.restore(payload.get('bars', {}), downtime=time.time() - payload.get('saved_at', time.time()))
+    bot.quotes.restore(payload.get('quotes', {}))
+
+
+def restore_cogs(bot, payload):
+    """Hand each loaded cog its saved state; call after cogs are loaded"""
+    for name, state in payload.get('cogs', {}).items():
+        cog = bot.get_cog(name)
+        restore_state = getattr(cog, 'restore_state', None)
+        if restore_state:
+            try:
+                restore_state(state)
+            except Exception as e:
+                print(f"Restoring {name} from snapshot failed: {e}")
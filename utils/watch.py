@@ -0,0 +1,132 @@
+"""
+Watch Index - Price-threshold alerts stored as sorted arrays per symbol
+A tick from old -> new price fires exactly the thresholds in between,
+found with two bisections instead of scanning every alert.
+"""
+import json
+import os
+from bisect import bisect_left, bisect_right
+
+ABOVE = "above"
+BELOW = "below"
+
+
+class WatchIndex:
+    def __init__(self):
+        self.alerts = {}      # id -> alert dict
+        self.books = {}       # symbol -> {ABOVE: (thresholds, ids), BELOW: (thresholds, ids)}
+        self.last_price = {}  # symbol -> last seen price
+        self.next_id = 1
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def symbols(self):
+        return [symbol for symbol, book in self.books.items() if book[ABOVE][0] or book[BELOW][0]]
+
+    def _insert(self, alert):
+        book = self.books.setdefault(alert['symbol'], {ABOVE: ([], []), BELOW: ([], [])})
+        thresholds, ids = book[alert['direction']]
+        i = bisect_right(thresholds, alert['threshold'])
+        thresholds.insert(i, alert['threshold'])
+        ids.insert(i, alert['id'])
+        self.alerts[alert['id']] = alert
+
+    def add(self, symbol, direction, threshold, user_id, channel_id, dm=False):
+        """Register an alert, returns the stored alert dict"""
+        alert = {
+            'id': self.next_id,
+            'symbol': symbol,
+            'direction': direction,
+            'threshold': float(threshold),
+            'user_id': user_id,
+            'channel_id': channel_id,
+            'dm': dm,
+        }
+        self.next_id += 1
+        self._insert(alert)
+        self.dirty = True
+        return alert
+
+    def remove(self, alert_id):
+        """Remove an alert by id, returns it (or None if unknown)"""
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+
+        thresholds, ids = self.books[alert['symbol']][alert['direction']]
+        i = bisect_left(thresholds, alert['threshold'])
+        j = bisect_right(thresholds, alert['threshold'])
+        k = ids.index(alert_id, i, j)
+        del thresholds[k]
+        del ids[k]
+        self.dirty = True
+        return alert
+
+    def for_user(self, user_id):
+        return [alert for alert in self.alerts.values() if alert['user_id'] == user_id]
+
+    def update(self, symbol, price):
+        """Record a new price and return every alert it crossed since the last one
+
+        Crossed alerts stay registered until remove() is called for them, so a
+        failed notification never loses an alert that was not yet delivered.
+        """
+        old = self.last_price.get(symbol)
+        self.last_price[symbol] = price
+        book = self.books.get(symbol)
+        if old is None or book is None or old == price:
+            return []
+
+        if price > old:
+            # Rising: above-alerts with old < threshold <= price
+            thresholds, ids = book[ABOVE]
+            i = bisect_right(thresholds, old)
+            j = bisect_right(thresholds, price)
+        else:
+            # Falling: below-alerts with price <= threshold < old
+            thresholds, ids = book[BELOW]
+            i = bisect_left(thresholds, price)
+            j = bisect_left(thresholds, old)
+
+        if i == j:
+            return []
+
+        return [self.alerts[alert_id] for alert_id in ids[i:j]]
+
+    def dumps(self):
+        """Serialize alerts and clear the dirty flag (on the loop, so no change slips in mid-write)"""
+        self.dirty = False
+        return json.dumps({'next_id': self.next_id, 'alerts': list(self.alerts.values())})
+
+    @staticmethod
+    def write(path, text):
+        """Write a dumps() string atomically (blocking, fine in a thread)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def save(self, path):
+        """Write alerts to a JSON file atomically"""
+        self.write(path, self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        """Load alerts from a JSON file, empty index if missing or unreadable"""
+        index = cls()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as e:
+            print(f"Could not read watch store {path}: {e}")
+            return index
+
+        for alert in sorted(data.get('alerts', []), key=lambda a: (a['symbol'], a['direction'], a['threshold'])):
+            index._insert(alert)
+        index.next_id = max(data.get('next_id', 1), max(index.alerts, default=0) + 1)
+        return index